@@ -0,0 +1,292 @@
+"""Admission control: bounded concurrency with early load shedding.
+
+A :class:`Limiter` lets ``limit`` holders in at once and queues up to
+``queue_size`` more, each for at most ``queue_timeout`` seconds. Work that
+would wait longer, by that estimate or in fact, is rejected with
+:class:`AdmissionRejected` so it can be answered with ``503`` and
+``Retry-After`` right away instead of piling up latency.
+
+Holders are in one of two lanes. ``priority`` waiters are always let in
+first, and ``bulk`` holders may only take the slots left over once
+``reserved`` of the limit is kept free for the priority lane, so health
+checks and admin traffic get through while dashboards saturate the rest.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Literal
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.metrics import registry
+from app.core.structure import BaseResponse
+
+Lane = Literal["priority", "bulk"]
+LANES: tuple[Lane, ...] = ("priority", "bulk")
+
+# Lane of the work running in this context; the admission middleware sets
+# it per request, and background pollers keep the default.
+current_lane: ContextVar[Lane] = ContextVar("admission_lane", default="priority")
+
+admission_rejected = registry.counter(
+    "rx_admission_rejected_total",
+    "Requests and router operations shed by admission control.",
+    ("scope", "lane", "reason"),
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised instead of waiting when a limiter is saturated."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def rejected_response(error: AdmissionRejected) -> JSONResponse:
+    return JSONResponse(
+        BaseResponse(success=False, error_message=str(error)).model_dump(mode="json"),
+        status_code=503,
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
+class LimiterStats(BaseModel):
+    """Live counters of one limiter, as served by the API."""
+
+    scope: str
+    limit: int
+    active: dict[str, int]
+    queued: dict[str, int]
+    admitted: int
+    rejected: int
+    mean_hold_ms: float | None
+
+
+class Limiter:
+    """Concurrency limit with a bounded, lane-ordered, deadline-bound queue."""
+
+    def __init__(
+        self,
+        scope: str,
+        limit: int,
+        queue_size: int = 0,
+        queue_timeout: float = 1.0,
+        reserved: float = 0.0,
+    ):
+        self.scope = scope
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        # Slots the bulk lane may never take.
+        self.reserved = min(limit - 1, math.ceil(limit * reserved))
+        self.active: dict[Lane, int] = dict.fromkeys(LANES, 0)
+        self._waiters: dict[Lane, deque[asyncio.Future[None]]] = {
+            lane: deque() for lane in LANES
+        }
+        self.admitted = 0
+        self.rejected = 0
+        # Moving average of how long a slot is held, for the wait estimate.
+        self._hold: float | None = None
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @asynccontextmanager
+    async def slot(self, lane: Lane = "priority") -> AsyncIterator[None]:
+        await self.acquire(lane)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(lane, time.monotonic() - started)
+
+    async def acquire(self, lane: Lane = "priority"):
+        if self._may_enter(lane) and not self._queued_ahead(lane):
+            self._enter(lane)
+            return
+        if self.queued >= self.queue_size:
+            self._reject(lane, "queue_full", self._expected_wait())
+        expected = self._expected_wait()
+        if expected > self.queue_timeout:
+            self._reject(lane, "deadline", expected)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject(lane, "deadline", self._expected_wait())
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Let in just as the caller gave up; pass the slot on.
+                self.release(lane)
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                self._waiters[lane].remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self, lane: Lane = "priority", held: float | None = None):
+        self.active[lane] -= 1
+        if held is not None:
+            self._hold = held if self._hold is None else 0.8 * self._hold + 0.2 * held
+        self._wake()
+
+    def stats(self) -> LimiterStats:
+        return LimiterStats(
+            scope=self.scope,
+            limit=self.limit,
+            active=dict(self.active),
+            queued={lane: len(waiters) for lane, waiters in self._waiters.items()},
+            admitted=self.admitted,
+            rejected=self.rejected,
+            mean_hold_ms=None if self._hold is None else self._hold * 1000,
+        )
+
+    def _may_enter(self, lane: Lane) -> bool:
+        total = sum(self.active.values())
+        return total < (
+            self.limit if lane == "priority" else self.limit - self.reserved
+        )
+
+    def _queued_ahead(self, lane: Lane) -> bool:
+        lanes = LANES[: LANES.index(lane) + 1]
+        return any(self._waiters[other] for other in lanes)
+
+    def _enter(self, lane: Lane):
+        self.active[lane] += 1
+        self.admitted += 1
+
+    def _wake(self):
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self._may_enter(lane):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self._enter(lane)
+                    waiter.set_result(None)
+            if waiters:
+                return  # lower lanes wait behind this one
+
+    def _expected_wait(self) -> float:
+        """Time until a newly queued holder would get in, at the current pace."""
+        if self._hold is None:
+            return 0.0
+        return (self.queued + 1) / self.limit * self._hold
+
+    def _reject(self, lane: Lane, reason: str, retry_after: float):
+        self.rejected += 1
+        admission_rejected.inc(scope=self.scope, lane=lane, reason=reason)
+        raise AdmissionRejected(
+            f"Too busy to serve {self.scope} ({reason}), try again later",
+            max(1.0, retry_after),
+        )
+
+
+class AdmissionController:
+    """One global limiter for HTTP requests and one limiter per router.
+
+    The global limiter is applied by ``AdmissionMiddleware`` to whole
+    requests; a router's limiter is applied to every operation on it, by
+    ``MikroTikConnectionManager``, so answers served from cache are never
+    held up by it. Streams that stay open for as long as a client watches,
+    such as live feeds and table streams, take a slot of the router's
+    separate ``router_stream_limit`` instead, which never queues, so they
+    cannot starve the poller and short requests of the router's slots.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def configure(
+        self,
+        enabled: bool = True,
+        limit: int = 256,
+        queue_size: int = 512,
+        queue_timeout: float = 2.0,
+        reserved: float = 0.2,
+        router_limit: int = 4,
+        router_queue_size: int = 16,
+        router_queue_timeout: float = 2.0,
+        router_stream_limit: int = 2,
+        priority_paths: Iterable[str] = (),
+    ):
+        self.enabled = enabled
+        self.priority_paths = tuple(priority_paths)
+        self.requests = Limiter("global", limit, queue_size, queue_timeout, reserved)
+        self._router_limits = (
+            router_limit,
+            router_queue_size,
+            router_queue_timeout,
+            reserved,
+        )
+        self._router_stream_limit = router_stream_limit
+        self._routers: dict[str, Limiter] = {}
+        self._streams: dict[str, Limiter] = {}
+
+    def lane(self, path: str) -> Lane:
+        return "priority" if path.startswith(self.priority_paths) else "bulk"
+
+    def router(self, key: str, stream: bool = False) -> Limiter:
+        if stream:
+            limiter = self._streams.get(key)
+            if limiter is None:
+                # Stream holds last minutes or hours: reject, never queue.
+                limiter = self._streams[key] = Limiter(
+                    f"{key} streams", self._router_stream_limit
+                )
+            return limiter
+        limiter = self._routers.get(key)
+        if limiter is None:
+            limiter = self._routers[key] = Limiter(key, *self._router_limits)
+        return limiter
+
+    @asynccontextmanager
+    async def router_slot(self, key: str, stream: bool = False) -> AsyncIterator[None]:
+        """Hold one of the router's slots, in the current context's lane."""
+        if not self.enabled:
+            yield
+            return
+        async with self.router(key, stream).slot(current_lane.get()):
+            yield
+
+    def stats(self) -> list[LimiterStats]:
+        return [self.requests.stats()] + [
+            limiter.stats()
+            for limiters in (self._routers, self._streams)
+            for limiter in limiters.values()
+        ]
+
+
+admission = AdmissionController()
+
+registry.gauge(
+    "rx_admission_active",
+    "Requests and router operations holding an admission slot, by lane.",
+    ("scope", "lane"),
+    lambda: (
+        ((stats.scope, lane), count)
+        for stats in admission.stats()
+        for lane, count in stats.active.items()
+    ),
+)
+registry.gauge(
+    "rx_admission_queued",
+    "Requests and router operations waiting for an admission slot, by lane.",
+    ("scope", "lane"),
+    lambda: (
+        ((stats.scope, lane), count)
+        for stats in admission.stats()
+        for lane, count in stats.queued.items()
+    ),
+)
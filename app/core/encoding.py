@@ -0,0 +1,122 @@
+"""Content negotiation, compression and validators for API responses.
+
+MessagePack and brotli are offered only when ``msgpack`` and ``brotli``
+are installed, e.g. with the ``encoding`` extra; JSON and gzip are always
+available.
+"""
+
+import hashlib
+import zlib
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None  # type: ignore[assignment]
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore[assignment]
+
+MSGPACK_MEDIA_TYPE = "application/vnd.msgpack"
+_MSGPACK_TYPES = {MSGPACK_MEDIA_TYPE, "application/msgpack", "application/x-msgpack"}
+
+
+def _accepted(header: str | None) -> dict[str, float]:
+    """Tokens of an ``Accept``-style header with their quality values."""
+    accepted: dict[str, float] = {}
+    for item in (header or "").split(","):
+        token, *params = (part.strip() for part in item.split(";"))
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[token.lower()] = quality
+    return accepted
+
+
+def wants_msgpack(accept: str | None) -> bool:
+    """Whether the client prefers MessagePack over JSON and we can send it."""
+    if msgpack is None:
+        return False
+    accepted = _accepted(accept)
+    packed = max((accepted.get(t, 0.0) for t in _MSGPACK_TYPES), default=0.0)
+    json = max(accepted.get("application/json", 0.0), accepted.get("*/*", 0.0))
+    return packed > 0 and packed >= json
+
+
+def pack(value: object) -> bytes:
+    assert msgpack is not None
+    return msgpack.packb(value)
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """Best supported ``Content-Encoding`` for the client, brotli first."""
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and accepted.get("br", 0.0) > 0:
+        return "br"
+    if accepted.get("gzip", 0.0) > 0:
+        return "gzip"
+    return None
+
+
+class StreamCompressor:
+    """Compresses a streamed body chunk by chunk.
+
+    Every chunk is flushed so the client can decode each one as it
+    arrives instead of waiting for the end of the stream.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            assert brotli is not None
+            self._brotli = brotli.Compressor(quality=4)
+        else:
+            self._gzip = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._gzip.compress(chunk) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._gzip.flush()
+
+
+async def compress_stream(
+    chunks: AsyncIterator[bytes], encoding: str
+) -> AsyncIterator[bytes]:
+    compressor = StreamCompressor(encoding)
+    # Closing this stream early must close the one it wraps as well.
+    async with aclosing(chunks):  # pyright: ignore
+        async for chunk in chunks:
+            yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+def make_etag(content: bytes) -> str:
+    """Weak validator: equal data may be wrapped in differing envelopes."""
+    return f'W/"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag``, as for GET."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
@@ -0,0 +1,232 @@
+import asyncio
+import base64
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from app.core.sqlite_log_sink import ARCHIVE_SUFFIX, LogPartition, list_partitions
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_EXTRA_KEY = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class LogRecord(BaseModel):
+    id: int
+    timestamp: str
+    level: str
+    message: str
+    extra: dict
+
+
+class LogPage(BaseModel):
+    items: list[LogRecord]
+    next_cursor: str | None = None
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    raw = json.dumps([timestamp, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(timestamp), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def format_timestamp(value: datetime) -> str:
+    """Format like the sink does: local time without an offset."""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+class ArchiveCache:
+    """Decompressed copies of archived partitions, the most recently used kept.
+
+    An archive is gunzipped into a private temporary directory the first
+    time it is queried, and read from there until ``capacity`` newer ones
+    push it out.
+    """
+
+    def __init__(self, capacity: int = 4):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._files: OrderedDict[Path, tuple[int, Path]] = OrderedDict()
+        self._directory: tempfile.TemporaryDirectory | None = None
+
+    def get(self, archive: Path) -> Path:
+        with self._lock:
+            modified = archive.stat().st_mtime_ns
+            cached = self._files.get(archive)
+            if cached is not None and cached[0] == modified:
+                self._files.move_to_end(archive)
+                return cached[1]
+            if self._directory is None:
+                self._directory = tempfile.TemporaryDirectory(prefix="rx-logs-")
+            target = Path(self._directory.name) / archive.name.removesuffix(
+                ARCHIVE_SUFFIX
+            )
+            partial = target.with_name(target.name + ".tmp")
+            with gzip.open(archive, "rb") as source, open(partial, "wb") as copy:
+                shutil.copyfileobj(source, copy, 1024 * 1024)
+            os.replace(partial, target)
+            self._files[archive] = (modified, target)
+            self._files.move_to_end(archive)
+            while len(self._files) > self.capacity:
+                _, (_, evicted) = self._files.popitem(last=False)
+                evicted.unlink(missing_ok=True)
+            return target
+
+
+class LogQuery:
+    """Read-only queries over the log partitions written by SQLiteLogSink.
+
+    Results are newest first and paginated by keyset on
+    ``(timestamp, id)``, so deep pages cost the same as the first one.
+    Partitions are read newest first until the page is full, skipping
+    days outside the time range or past the cursor; archived ones are
+    searched from a decompressed copy (see :class:`ArchiveCache`).
+    ``search`` goes through each partition's ``rx_logs_fts`` FTS5 table.
+    A legacy ``db_path`` is read too until the retention thread has split
+    it into partitions.
+    """
+
+    def __init__(self, db_path: str = "log.db", archive_cache: int = 4):
+        self.db_path = db_path
+        self.archives = ArchiveCache(archive_cache)
+
+    async def search(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        levels: list[str] | None = None,
+        extra: dict[str, str] | None = None,
+        text: str | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
+    ) -> LogPage:
+        clauses: list[str] = []
+        params: list[object] = []
+        # Partitions hold one day each, named by the date the sink formats.
+        first_day = last_day = None
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(format_timestamp(start))
+            first_day = str(params[-1])[:10]
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(format_timestamp(end))
+            last_day = str(params[-1])[:10]
+        if levels:
+            clauses.append(f"level IN ({', '.join('?' * len(levels))})")
+            params.extend(level.upper() for level in levels)
+        for key, value in (extra or {}).items():
+            if not _EXTRA_KEY.match(key):
+                raise ValueError(f"Invalid extra key: {key}")
+            clauses.append(f"json_extract(extra, '$.\"{key}\"') = ?")
+            params.append(value)
+        if text:
+            clauses.append(
+                "id IN (SELECT rowid FROM rx_logs_fts WHERE rx_logs_fts MATCH ?)"
+            )
+            params.append(text)
+        if cursor:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+            last_day = min(last_day or "9999", str(params[-2])[:10])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT id, timestamp, level, message, extra FROM rx_logs "
+            f"{where} ORDER BY timestamp DESC, id DESC LIMIT ?"
+        )
+        partitions = [
+            partition
+            for partition in list_partitions(self.db_path)
+            if partition.day is None
+            or (
+                (first_day is None or partition.day.isoformat() >= first_day)
+                and (last_day is None or partition.day.isoformat() <= last_day)
+            )
+        ]
+        # Fetch one extra row to know whether another page exists.
+        rows = await asyncio.to_thread(
+            self._fetch_partitions, partitions, sql, params, limit + 1
+        )
+
+        items = [
+            LogRecord(
+                id=row[0],
+                timestamp=row[1],
+                level=row[2],
+                message=row[3],
+                extra=json.loads(row[4] or "{}"),
+            )
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(items[-1].timestamp, items[-1].id)
+        return LogPage(items=items, next_cursor=next_cursor)
+
+    def _fetch_partitions(
+        self,
+        partitions: list[LogPartition],
+        sql: str,
+        params: list[object],
+        limit: int,
+    ) -> list[tuple]:
+        rows: list[tuple] = []
+        for partition in partitions:
+            if len(rows) >= limit:
+                break
+            try:
+                rows += self._fetch(partition, sql, [*params, limit - len(rows)])
+            except sqlite3.OperationalError:
+                archive = partition.path.with_name(partition.path.name + ARCHIVE_SUFFIX)
+                if (
+                    partition.archived
+                    or partition.path.exists()
+                    or not archive.exists()
+                ):
+                    raise
+                # Archived since it was listed.
+                archived = LogPartition(archive, partition.day, archived=True)
+                rows += self._fetch(archived, sql, [*params, limit - len(rows)])
+        return rows
+
+    def _fetch(
+        self, partition: LogPartition, sql: str, params: list[object]
+    ) -> list[tuple]:
+        if partition.archived:
+            uri = f"file:{self.archives.get(partition.path)}?mode=ro&immutable=1"
+        else:
+            uri = f"file:{partition.path}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            if partition.day is None and "rx_logs_fts" in sql:
+                has_index = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'rx_logs_fts'"
+                ).fetchone()
+                if not has_index:
+                    # A legacy file never migrated has no text index; its
+                    # records are searchable once split_legacy moved them.
+                    return []
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,316 @@
+"""Tiered retention for the day partitions written by SQLiteLogSink.
+
+Partitions stay hot, plain SQLite files, for ``archive_after_days``. Then
+they are compacted with ``VACUUM INTO`` and gzipped into a read-only
+archive that LogQuery still searches, and after ``delete_after_days``
+either kind is expired by deleting its file. The current day is never
+touched, so none of this waits on or holds up the sink's writer.
+
+A ``log.db`` written before partitioning is split into day partitions by
+the first pass, after which the policy applies to its days as well.
+"""
+
+import gzip
+import os
+import secrets
+import shutil
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.core.sqlite_log_sink import (
+    ARCHIVE_SUFFIX,
+    LogPartition,
+    list_partitions,
+    open_partition,
+    partition_dir,
+    partition_path,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+def archive_partition(path: Path, compress_level: int = 6) -> Path:
+    """Compact and gzip one hot partition, then remove it; returns the archive."""
+    archive = path.with_name(path.name + ARCHIVE_SUFFIX)
+    compacted = path.with_name(path.name + ".vacuum")
+    partial = archive.with_name(archive.name + ".tmp")
+    compacted.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        # Also folds in whatever is still in the partition's WAL.
+        conn.execute("VACUUM INTO ?", (str(compacted),))
+    finally:
+        conn.close()
+    try:
+        with (
+            open(compacted, "rb") as source,
+            gzip.open(partial, "wb", compresslevel=compress_level) as target,
+        ):
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(partial, archive)
+    finally:
+        compacted.unlink(missing_ok=True)
+        partial.unlink(missing_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+    return archive
+
+
+def delete_partition(partition: LogPartition):
+    paths = [partition.path]
+    if not partition.archived:
+        paths += [
+            partition.path.with_name(partition.path.name + s) for s in ("-wal", "-shm")
+        ]
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+# Suffix of the day files a legacy split writes before moving them in place,
+# and the marker left once every record has been copied into them. The
+# marker holds a token that a merged partition records in the same
+# transaction as the merged rows, so a resumed move never merges twice.
+SPLIT_SUFFIX = ".split"
+SPLIT_MARKER = ".legacy-split"
+
+
+def _remove_database(path: Path):
+    for suffix in ("", "-wal", "-shm"):
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def split_legacy(
+    db_path: str, stopped: threading.Event | None = None, chunk_size: int = 10_000
+) -> int | None:
+    """Move the records of a pre-partitioning ``db_path`` into day partitions.
+
+    Records are copied in one sequential scan into staging files, one per
+    day, which need neither an index nor the FTS table on the legacy file.
+    Only then is each staging file moved in place, or merged into the
+    partition the sink or an earlier archive already has for that day,
+    and the legacy file removed. A copy interrupted, by a crash or by
+    ``stopped``, starts over on the next call, and an interrupted move
+    resumes. Returns the days moved, or None if stopped.
+    """
+    legacy = Path(db_path)
+    directory = partition_dir(db_path)
+    marker = directory / SPLIT_MARKER
+    if not legacy.is_file():
+        marker.unlink(missing_ok=True)
+        return 0
+    if not marker.exists():
+        for stale in directory.glob(f"*{SPLIT_SUFFIX}"):
+            _remove_database(stale)
+        if not _copy_legacy(legacy, db_path, chunk_size, stopped):
+            return None
+        marker.write_text(secrets.token_hex(8))
+    token = marker.read_text() or SPLIT_MARKER
+    moved = 0
+    for staging in sorted(directory.glob(f"*.db{SPLIT_SUFFIX}")):
+        hot = staging.with_name(staging.name.removesuffix(SPLIT_SUFFIX))
+        _move_day(staging, hot, token)
+        moved += 1
+    _remove_database(legacy)
+    marker.unlink(missing_ok=True)
+    return moved
+
+
+def _copy_legacy(
+    legacy: Path, db_path: str, chunk_size: int, stopped: threading.Event | None
+) -> bool:
+    source = sqlite3.connect(f"file:{legacy}?mode=ro", uri=True)
+    targets: dict[str, sqlite3.Connection] = {}
+    try:
+        has_table = source.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rx_logs'"
+        ).fetchone()
+        if not has_table:
+            return True
+        cursor = source.execute(
+            "SELECT timestamp, level, message, extra FROM rx_logs "
+            "WHERE timestamp IS NOT NULL ORDER BY id"
+        )
+        while rows := cursor.fetchmany(chunk_size):
+            if stopped is not None and stopped.is_set():
+                return False
+            by_day: dict[str, list[Any]] = {}
+            for row in rows:
+                by_day.setdefault(str(row[0])[:10], []).append(row)
+            for day, day_rows in by_day.items():
+                conn = targets.get(day)
+                if conn is None:
+                    staging = partition_path(db_path, day)
+                    conn = targets[day] = open_partition(
+                        staging.with_name(staging.name + SPLIT_SUFFIX)
+                    )
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO rx_logs (timestamp, level, message, extra) "
+                        "VALUES (?, ?, ?, ?)",
+                        day_rows,
+                    )
+        return True
+    finally:
+        source.close()
+        for conn in targets.values():
+            conn.close()
+
+
+def _move_day(staging: Path, hot: Path, token: str):
+    archive = hot.with_name(hot.name + ARCHIVE_SUFFIX)
+    if archive.exists():
+        if not hot.exists():
+            # The day was written and archived since partitioning; bring it
+            # back so both halves end up in one partition, archived again
+            # later.
+            partial = hot.with_name(hot.name + ".tmp")
+            with gzip.open(archive, "rb") as source, open(partial, "wb") as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.replace(partial, hot)
+        # Otherwise the hot file already holds everything the archive does.
+        archive.unlink()
+    if not hot.exists():
+        os.replace(staging, hot)
+        return
+    conn = open_partition(hot)
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS legacy_split (token TEXT PRIMARY KEY)")
+        merged = conn.execute(
+            "SELECT 1 FROM legacy_split WHERE token = ?", (token,)
+        ).fetchone()
+        if not merged:
+            conn.execute("ATTACH DATABASE ? AS legacy", (str(staging),))
+            with conn:
+                conn.execute(
+                    "INSERT INTO rx_logs (timestamp, level, message, extra) "
+                    "SELECT timestamp, level, message, extra FROM legacy.rx_logs "
+                    "ORDER BY id"
+                )
+                conn.execute("INSERT INTO legacy_split (token) VALUES (?)", (token,))
+            conn.execute("DETACH DATABASE legacy")
+    finally:
+        conn.close()
+    _remove_database(staging)
+
+
+class LogRetention:
+    """Background thread applying the retention policy every ``interval`` seconds.
+
+    The first pass splits a legacy ``db_path`` first (see
+    :func:`split_legacy`); with neither ``archive_after_days`` nor
+    ``delete_after_days`` set, that is all the thread does. When several
+    workers share the partitions, an exclusive ``flock`` lets one of them
+    run each pass and the others skip it.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "log.db",
+        archive_after_days: int | None = 7,
+        delete_after_days: int | None = 90,
+        interval: float = 3600.0,
+        compress_level: int = 6,
+    ):
+        self.configure(
+            db_path, archive_after_days, delete_after_days, interval, compress_level
+        )
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def configure(
+        self,
+        db_path: str = "log.db",
+        archive_after_days: int | None = 7,
+        delete_after_days: int | None = 90,
+        interval: float = 3600.0,
+        compress_level: int = 6,
+    ):
+        self.db_path = db_path
+        self.archive_after_days = archive_after_days
+        self.delete_after_days = delete_after_days
+        self.interval = interval
+        self.compress_level = compress_level
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="log-retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop after the partition being processed, if any."""
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def apply(self, today: date | None = None) -> tuple[int, int]:
+        """Archive and delete due partitions; returns how many of each."""
+        today = today or date.today()
+        archived = deleted = 0
+        for partition in list_partitions(self.db_path):
+            if self._stopped.is_set():
+                break
+            if partition.day is None or partition.day >= today:
+                continue
+            age = (today - partition.day).days
+            try:
+                if self.delete_after_days is not None and age >= self.delete_after_days:
+                    delete_partition(partition)
+                    deleted += 1
+                elif (
+                    self.archive_after_days is not None
+                    and age >= self.archive_after_days
+                    and not partition.archived
+                ):
+                    archive_partition(partition.path, self.compress_level)
+                    archived += 1
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Log retention failed for {}: {}", partition.path, e)
+        return archived, deleted
+
+    def _run(self):
+        while True:
+            try:
+                self._pass()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Log retention pass failed: {}", e)
+            if self.archive_after_days is None and self.delete_after_days is None:
+                if not Path(self.db_path).is_file():
+                    return  # nothing left to split, and no policy to apply
+            if self._stopped.wait(self.interval):
+                return
+
+    def _pass(self):
+        with open(partition_dir(self.db_path) / ".retention.lock", "a+b") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return  # another worker is running this pass
+            if Path(self.db_path).is_file():
+                days = split_legacy(self.db_path, self._stopped)
+                if days is None:
+                    return
+                logger.info("Split {} into {} day partitions", self.db_path, days)
+            archived, deleted = self.apply()
+        if archived or deleted:
+            logger.info(
+                "Log retention archived {} and deleted {} partitions",
+                archived,
+                deleted,
+            )
+
+
+log_retention = LogRetention()
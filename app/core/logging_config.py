@@ -2,10 +2,44 @@ import sys
 
 from loguru import logger
 
-from app.core.sqlite_log_sink import SQLiteLogSink
+from app.core.metrics import registry
+from app.core.settings import LogSinkConfig
+from app.core.sqlite_log_sink import SQLiteLogSink, list_partitions
 
+sqlite_sink: SQLiteLogSink | None = None
 
-def setup_logging():
+registry.gauge(
+    "rx_log_sink_records",
+    "SQLite log sink records by state (queued, dropped, written).",
+    ("state",),
+    lambda: (
+        ((state,), value)
+        for state, value in (sqlite_sink.stats() if sqlite_sink else {}).items()
+    ),
+)
+
+
+def _storage() -> dict[str, int]:
+    sizes = {"hot": 0, "archived": 0}
+    if sqlite_sink is not None:
+        for partition in list_partitions(sqlite_sink.db_path):
+            if partition.day is not None and partition.path.exists():
+                tier = "archived" if partition.archived else "hot"
+                sizes[tier] += partition.path.stat().st_size
+    return sizes
+
+
+registry.gauge(
+    "rx_log_storage_bytes",
+    "Size of the log partitions by tier (hot, archived).",
+    ("tier",),
+    lambda: (((tier,), size) for tier, size in _storage().items()),
+)
+
+
+def setup_logging(config: LogSinkConfig | None = None):
+    global sqlite_sink
+    config = config or LogSinkConfig()
     logger.remove()
 
     logger.add(
@@ -13,8 +47,9 @@ def setup_logging():
         format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {message} | {name}:{function}:{line}",
         level="INFO",
     )
-    # SQLite log sink
-    sqlite_sink = SQLiteLogSink()
+    # SQLite log sink, one per process however often logging is set up.
+    if sqlite_sink is None:
+        sqlite_sink = SQLiteLogSink(**config.model_dump())
     logger.add(sqlite_sink, serialize=False, level="INFO")
 
     return logger
@@ -1,25 +1,156 @@
 import time
-from collections.abc import Awaitable, Callable
-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-
-class ProcessTimeMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-
-        # Format process time in human-readable format
-        if process_time >= 1:
-            # Show in seconds if >= 1 second
-            formatted_time = f"{process_time:.3f}s"
-        else:
-            # Show in milliseconds if < 1 second
-            formatted_time = f"{process_time * 1000:.2f}ms"
-
-        response.headers["X-Process-Time"] = formatted_time
-        return response
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    current_lane,
+    rejected_response,
+)
+from app.core.metrics import (
+    RequestTiming,
+    current_request_timing,
+    http_request_duration,
+    record_phase,
+    start_request_timing,
+)
+from app.core.profiling import SlowRequestRecorder
+
+
+def format_server_timing(timing: RequestTiming, total: float) -> str:
+    """Render phases and the total as a ``Server-Timing`` header value."""
+    entries = [
+        f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timing.phases.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+class ProcessTimeMiddleware:
+    """Pure ASGI middleware that times requests and their phases.
+
+    Phases recorded through ``app.core.metrics.record_phase`` while the
+    request runs are reported in a ``Server-Timing`` header, and the total
+    is observed in the per-route latency histogram served on ``/metrics``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        timing = start_request_timing(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    format_server_timing(timing, time.perf_counter() - start_time),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - start_time,
+                method=scope["method"],
+                route=timing.route,
+                status=status_code,
+            )
+
+
+class SlowRequestMiddleware:
+    """Pure ASGI middleware reporting every request to a SlowRequestRecorder.
+
+    Add it before ``ProcessTimeMiddleware`` so it runs inside it and sees
+    the request's phase timings. It is not added at all while slow-request
+    recording is disabled.
+    """
+
+    def __init__(self, app: ASGIApp, recorder: SlowRequestRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = self.recorder.begin()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.recorder.end(started, scope, status_code, current_request_timing())
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware holding a global admission slot per request.
+
+    The request's lane is taken from its path and kept in ``current_lane``
+    for the router operations it starts. A request that cannot get a slot
+    in time is answered ``503`` with ``Retry-After`` before any of it runs.
+    The slot is given back once the response starts, so streamed bodies,
+    such as NDJSON tables and live feeds, do not keep it open. Add it
+    before ``ProcessTimeMiddleware`` so the wait shows up as the
+    ``admission_wait`` phase.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.controller.lane(scope["path"])
+        limiter = self.controller.requests
+        started = time.perf_counter()
+        try:
+            await limiter.acquire(lane)
+        except AdmissionRejected as e:
+            await rejected_response(e)(scope, receive, send)
+            return
+        waited = time.perf_counter() - started
+        record_phase("admission_wait", waited)
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                limiter.release(lane, time.perf_counter() - started - waited)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                # The handler is done; a streamed body must not hold the
+                # slot, nor count its duration towards the hold time.
+                release()
+            await send(message)
+
+        token = current_lane.set(lane)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_lane.reset(token)
+            release()
@@ -0,0 +1,226 @@
+"""Stack sampling for on-demand profiles and slow-request capture.
+
+Both work by periodically reading ``sys._current_frames()`` from a
+background thread, so nothing is traced and the code being profiled runs
+unchanged. Stacks are kept in the collapsed format understood by
+flamegraph.pl, speedscope and similar tools: one line per distinct
+stack, root first, frames separated by ``;``, then the sample count.
+"""
+
+import asyncio
+import itertools
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import FrameType
+from typing import Any
+
+from app.core.metrics import RequestTiming
+
+MAX_DEPTH = 128
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{frame.f_globals.get('__name__', '?')}:{name}"
+
+
+def collapse(frame: FrameType | None, root: str | None = None) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    if root is not None:
+        names.append(root)
+    return ";".join(reversed(names))
+
+
+def render_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class _Sampler(threading.Thread):
+    """Daemon thread calling ``sample`` every ``interval`` seconds until stopped."""
+
+    def __init__(self, name: str, interval: float, sample):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self._sample = sample
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self._sample()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class SamplingProfiler:
+    """Samples every thread of the process for a fixed time, on demand.
+
+    Only one profile runs at a time; the sampler thread exists only while
+    it does.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, interval: float = 0.005) -> str:
+        """Sample for ``seconds`` and return the collapsed stacks."""
+        stacks: Counter[str] = Counter()
+
+        def sample():
+            me = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    stacks[collapse(frame, names.get(ident, str(ident)))] += 1
+
+        async with self._lock:
+            sampler = _Sampler("profiler", interval, sample)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                await asyncio.to_thread(sampler.stop)
+        return render_collapsed(stacks)
+
+
+@dataclass
+class SlowRequest:
+    """One request that took longer than the recorder's threshold."""
+
+    id: int
+    method: str
+    path: str
+    route: str
+    status: int
+    started_at: datetime
+    duration_ms: float
+    phases: dict[str, float]
+    samples: int
+    stacks: Counter[str] = field(default_factory=Counter)
+
+
+class SlowRequestRecorder:
+    """Keeps stack samples and phase timings of the slowest requests.
+
+    While started and while any request is in flight, a sampler thread
+    records the event loop thread's stack every ``interval`` seconds into
+    a ring covering the last ``window`` seconds. A request that finishes
+    over ``threshold`` is kept, with the samples taken during its
+    lifetime, in a ring buffer of the last ``capacity`` slow requests.
+
+    The samples show whatever the loop was running meanwhile, the request
+    itself or other work holding it up; time the request spent awaiting
+    I/O is in its phase timings.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 1.0,
+        capacity: int = 100,
+        interval: float = 0.005,
+        window: float = 60.0,
+    ):
+        self.configure(threshold, capacity, interval, window)
+        self._in_flight = 0
+        self._ids = itertools.count(1)
+        self._sampler: _Sampler | None = None
+        self._loop_thread = 0
+
+    def configure(
+        self,
+        threshold: float = 1.0,
+        capacity: int = 100,
+        interval: float = 0.005,
+        window: float = 60.0,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self._requests: deque[SlowRequest] = deque(maxlen=capacity)
+        # (monotonic time, collapsed stack) of the event loop thread.
+        self._samples: deque[tuple[float, str]] = deque(
+            maxlen=max(1, int(window / interval))
+        )
+
+    def start(self):
+        """Start sampling the calling thread, which runs the event loop."""
+        if self._sampler is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._sampler = _Sampler("slow-requests", self.interval, self._sample)
+        self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._sampler.stop()
+            self._sampler = None
+
+    def begin(self) -> float:
+        self._in_flight += 1
+        return time.monotonic()
+
+    def end(
+        self,
+        started: float,
+        scope: dict[str, Any],
+        status: int,
+        timing: RequestTiming | None,
+    ):
+        self._in_flight -= 1
+        finished = time.monotonic()
+        duration = finished - started
+        if duration < self.threshold:
+            return
+        stacks: Counter[str] = Counter(
+            stack for at, stack in list(self._samples) if started <= at <= finished
+        )
+        self._requests.append(
+            SlowRequest(
+                id=next(self._ids),
+                method=scope["method"],
+                path=scope["path"],
+                route=timing.route if timing is not None else "unmatched",
+                status=status,
+                started_at=datetime.now() - timedelta(seconds=duration),
+                duration_ms=round(duration * 1000, 3),
+                phases={
+                    phase: round(seconds * 1000, 3)
+                    for phase, seconds in (timing.phases if timing else {}).items()
+                },
+                samples=stacks.total(),
+                stacks=stacks,
+            )
+        )
+
+    def recent(self, limit: int = 100) -> list[SlowRequest]:
+        """Recorded slow requests, newest first."""
+        return list(reversed(self._requests))[:limit]
+
+    def get(self, request_id: int) -> SlowRequest | None:
+        return next((r for r in self._requests if r.id == request_id), None)
+
+    def clear(self):
+        self._requests.clear()
+
+    def _sample(self):
+        if not self._in_flight:
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is not None:
+            self._samples.append((time.monotonic(), collapse(frame)))
+
+
+profiler = SamplingProfiler()
+slow_requests = SlowRequestRecorder()
@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Any
+
+import anyio
+from pydantic import TypeAdapter
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+
+from app.core.encoding import make_etag, pack
+from app.core.structure import BaseResponse
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that always closes its body iterator.
+
+    Starlette abandons the iterator when the client disconnects, leaving
+    whatever it holds (a leased router session, a live subscription) open
+    until garbage collection. Closing it here, shielded from the
+    cancellation that ended the response, releases those right away.
+    """
+
+    async def stream_response(self, send: Send) -> None:
+        try:
+            await super().stream_response(send)
+        finally:
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                with anyio.CancelScope(shield=True):
+                    await aclose()
+
+
+class RenderedSnapshot:
+    """One snapshot serialized for the API, with its validator.
+
+    The JSON body is rendered up front; the MessagePack one on first use.
+    """
+
+    __slots__ = ("value", "body", "etag", "_envelope", "_packed")
+
+    def __init__(self, value: Any, envelope: BaseResponse[Any], data: bytes):
+        self.value = value
+        self.body = envelope.model_dump_json().encode()
+        self.etag = make_etag(data)
+        self._envelope = envelope
+        self._packed: bytes | None = None
+
+    def packed(self) -> bytes:
+        if self._packed is None:
+            self._packed = pack(self._envelope.model_dump(mode="json"))
+        return self._packed
+
+
+class SnapshotRenderer:
+    """Serializes each snapshot once, however many requests serve it.
+
+    Renderings are remembered per key and reused for as long as the
+    cache hands out the very same value object, so a fresh cache hit
+    costs neither validation nor encoding.
+    """
+
+    def __init__(self, adapter: TypeAdapter[Any]):
+        self._adapter = adapter
+        self._rendered: dict[str, RenderedSnapshot] = {}
+
+    def render(self, key: str, value: Any, timestamp: datetime) -> RenderedSnapshot:
+        rendered = self._rendered.get(key)
+        if rendered is None or rendered.value is not value:
+            envelope = BaseResponse[Any].model_construct(
+                success=True, data=value, error_message=None, timestamp=timestamp
+            )
+            rendered = self._rendered[key] = RenderedSnapshot(
+                value, envelope, self._adapter.dump_json(value)
+            )
+        return rendered
@@ -1,21 +1,217 @@
-from os import environ
+import re
+from functools import lru_cache
+from typing import Literal
 
-from pydantic import AliasChoices, BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-__all__ = ["Settings"]
+__all__ = ["Settings", "get_settings"]
+
+# Router names are path segments of the routeros API, next to these fixed ones.
+ROUTER_NAME_PATTERN = r"^[A-Za-z0-9_.-]+$"
+RESERVED_ROUTER_NAMES = frozenset(
+    {"alerts", "breakers", "collector", "fleet", "routers", "system-resource"}
+)
+
+
+def check_router_name(name: str) -> str:
+    """Return ``name`` if a router may be registered under it."""
+    if not re.match(ROUTER_NAME_PATTERN, name):
+        raise ValueError(f"Router name {name!r} may only use A-Z, a-z, 0-9, _ . -")
+    if name in RESERVED_ROUTER_NAMES:
+        raise ValueError(f"Router name {name!r} is reserved")
+    return name
 
 
 class RouterOSConfig(BaseModel):
-    host: str = environ.get("ROUTEROS_HOST", "")
-    username: str = environ.get("ROUTEROS_USERNAME", "")
-    password: str = environ.get("ROUTEROS_PASSWORD", "")
-    port: int = int(environ.get("ROUTEROS_PORT", "8728"))
+    name: str = "default"
+    host: str = ""
+    username: str = ""
+    password: str = ""
+    port: int = 8728
     use_ssl: bool = False
     ssl_verify: bool = False
     timeout: int = 5
 
 
+class RouterOSPoolConfig(BaseModel):
+    min_size: int = 1
+    max_size: int = 4
+    idle_timeout: float = 300.0
+    keepalive_interval: float = 60.0
+
+
+class BreakerConfig(BaseModel):
+    failure_threshold: int = 5
+    reset_timeout: float = 10.0
+    max_reset_timeout: float = 300.0
+    # Adaptive timeout: timeout_multiplier x observed p99, at least min_timeout
+    # and at most the router's configured timeout.
+    min_timeout: float = 0.5
+    timeout_multiplier: float = 4.0
+    min_samples: int = 20
+    window: int = 200
+    # Race a second session against reads slower than the router's p95.
+    hedge: bool = False
+
+
+class SnapshotCacheConfig(BaseModel):
+    enabled: bool = True
+    default_ttl: float = 1.0
+    stale_ttl: float = 5.0
+    ttl: dict[str, float] = {"/system/resource": 1.0}
+
+
+class CollectorConfig(BaseModel):
+    enabled: bool = True
+    interval: float = 10.0
+    # Poll each router on its own schedule, adapted between min_interval
+    # (default a quarter of interval) and max_interval (default three
+    # times it); off polls the whole fleet every interval.
+    adaptive: bool = True
+    min_interval: float | None = None
+    max_interval: float | None = None
+    # Each poll lands up to this fraction of the interval early or late.
+    jitter: float = Field(default=0.1, ge=0, lt=1)
+    # Polls started per second across the fleet; None is unlimited.
+    rate_limit: float | None = Field(default=None, gt=0)
+    # Adaptive polls are stored in batches this often.
+    flush_interval: float = 1.0
+
+
+class FleetConfig(BaseModel):
+    max_concurrency: int = 32
+    deadline: float = 10.0
+
+
+class LiveConfig(BaseModel):
+    interval: float = 1.0
+    queue_size: int = 8
+    heartbeat: float = 15.0
+
+
+class TrafficConfig(BaseModel):
+    enabled: bool = True
+    interval: float = 10.0
+    # Samples kept per interface; 120 at 10s covers the last 20 minutes.
+    capacity: int = 120
+
+
+class ConfigSnapshotConfig(BaseModel):
+    enabled: bool = True
+    interval: float = 3600.0
+    # Sections come from /export and from a print of each of paths, such
+    # as "/ip/route", minus ignore_fields (default: counters and .id).
+    export: bool = True
+    paths: list[str] = Field(default_factory=list)
+    ignore_fields: list[str] | None = None
+    timeout: float = 60.0
+    max_concurrency: int = 8
+
+
+class SharedCacheConfig(BaseModel):
+    """Share router snapshots between uvicorn workers on one host.
+
+    One worker is elected through a lock file next to ``path`` and runs the
+    pollers; the others serve from the memory-mapped file.
+    """
+
+    enabled: bool = False
+    path: str = "snapshots.shm"
+    slots: int = 512
+    slot_size: int = 65536
+    publish_interval: float = 1.0
+
+
+class HealthRuleConfig(BaseModel):
+    name: str
+    metric: str
+    kind: Literal["threshold", "rate"] = "threshold"
+    op: Literal[">", "<"] = ">"
+    threshold: float
+    clear: float | None = None
+    for_seconds: float = 0.0
+    per: float = 1.0
+    severity: Literal["info", "warning", "critical"] = "warning"
+
+
+class HealthConfig(BaseModel):
+    enabled: bool = True
+    # None keeps the engine's built-in rules.
+    rules: list[HealthRuleConfig] | None = None
+    # Least time between two state changes of one rule on one router.
+    min_transition_interval: float = 60.0
+    history: int = 1000
+
+
+class RouterRegistryConfig(BaseModel):
+    # How often each worker picks up routers registered through the API
+    # by another worker, and their latest RouterInfo.
+    refresh_interval: float = 5.0
+
+
+class ProfilingConfig(BaseModel):
+    # Serve the on-demand profiler and the slow request log under /admin;
+    # off by default.
+    enabled: bool = False
+    sample_interval: float = 0.005
+    max_seconds: float = 60.0
+    # Requests slower than this many seconds are kept with stack samples;
+    # None leaves the recorder out of the middleware stack.
+    slow_request_threshold: float | None = None
+    slow_request_capacity: int = 100
+
+
+class AdmissionConfig(BaseModel):
+    enabled: bool = True
+    # Requests in flight at once, and how many more may wait, for how long.
+    limit: int = Field(default=256, ge=1)
+    queue_size: int = Field(default=512, ge=0)
+    queue_timeout: float = 2.0
+    # Share of every limit the bulk lane may not use.
+    reserved: float = Field(default=0.2, ge=0, lt=1)
+    # Operations on one router at once; past the pool's max_size they would
+    # only wait for a session.
+    router_limit: int = Field(default=4, ge=1)
+    router_queue_size: int = Field(default=16, ge=0)
+    router_queue_timeout: float = 2.0
+    # Long-lived streams open on one router at once, such as live feeds and
+    # table streams; counted apart from router_limit and never queued.
+    router_stream_limit: int = Field(default=2, ge=1)
+    # Requests under these paths go in the priority lane, the rest in bulk.
+    priority_paths: list[str] = [
+        "/admin",
+        "/metrics",
+        "/api/v1/routeros/alerts",
+        "/api/v1/routeros/breakers",
+        "/api/v1/routeros/collector",
+        "/api/v1/routeros/routers",
+    ]
+
+
+class LogSinkConfig(BaseModel):
+    db_path: str = "log.db"
+    max_queue_size: int = 10_000
+    batch_size: int = 500
+    flush_interval: float = 1.0
+    overflow: Literal["block", "drop_oldest", "drop_debug"] = "block"
+
+
+class LogRetentionConfig(BaseModel):
+    enabled: bool = True
+    # Day partitions this many days old are gzipped into read-only
+    # archives; at least 2 so the sink has moved on from them. None keeps
+    # them hot.
+    archive_after_days: int | None = Field(default=7, ge=2)
+    # Partitions, hot or archived, this many days old are deleted; None
+    # keeps them forever.
+    delete_after_days: int | None = Field(default=90, ge=1)
+    interval: float = 3600.0
+    compress_level: int = Field(default=6, ge=1, le=9)
+    # Decompressed archives kept around for queries.
+    archive_cache: int = 4
+
+
 class Settings(BaseSettings):
     app_name: str = "MikroTik Router Monitoring System"
     admin_email: str = "admin@example.com"
@@ -28,7 +224,7 @@ class Settings(BaseSettings):
     allowed_hosts: list[str] = Field(default_factory=list)
     allowed_headers: list[str] = [
         "X-Requested-With",
-        "X-Process-Time",
+        "Server-Timing",
         "Content-Type",
         "Accept",
         "Origin",
@@ -38,5 +234,64 @@ class Settings(BaseSettings):
     sentry_dsn: str = ""
 
     routeros: RouterOSConfig = RouterOSConfig()
+    # ROUTEROS_HOST and friends, read from the environment or .env; they
+    # fill in whatever the ROUTEROS variable leaves unset.
+    routeros_host: str = ""
+    routeros_username: str = ""
+    routeros_password: str = ""
+    routeros_port: int | None = None
+    routeros_pool: RouterOSPoolConfig = RouterOSPoolConfig()
+    breaker: BreakerConfig = BreakerConfig()
+    routers: list[RouterOSConfig] = Field(default_factory=list)
+    fleet: FleetConfig = FleetConfig()
+    cache: SnapshotCacheConfig = SnapshotCacheConfig()
+    collector: CollectorConfig = CollectorConfig()
+    log_sink: LogSinkConfig = LogSinkConfig()
+    log_retention: LogRetentionConfig = LogRetentionConfig()
+    live: LiveConfig = LiveConfig()
+    traffic: TrafficConfig = TrafficConfig()
+    config_snapshots: ConfigSnapshotConfig = ConfigSnapshotConfig()
+    shared_cache: SharedCacheConfig = SharedCacheConfig()
+    health: HealthConfig = HealthConfig()
+    registry: RouterRegistryConfig = RouterRegistryConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
+    admission: AdmissionConfig = AdmissionConfig()
 
     model_config = SettingsConfigDict(env_file=".env")
+
+    @model_validator(mode="after")
+    def _apply_routeros_variables(self) -> "Settings":
+        variables = {
+            "host": self.routeros_host,
+            "username": self.routeros_username,
+            "password": self.routeros_password,
+            "port": self.routeros_port,
+        }
+        updates = {
+            field: value
+            for field, value in variables.items()
+            if value and field not in self.routeros.model_fields_set
+        }
+        if updates:
+            self.routeros = self.routeros.model_copy(update=updates)
+        return self
+
+    @model_validator(mode="after")
+    def _check_router_names(self) -> "Settings":
+        # Routers are registered by name, so a repeated one would silently
+        # replace the router configured before it.
+        names = [check_router_name(self.routeros.name)] if self.routeros.host else []
+        for index, entry in enumerate(self.routers):
+            if "name" not in entry.model_fields_set:
+                raise ValueError(f"routers[{index}] ({entry.host}) needs a name")
+            check_router_name(entry.name)
+            if entry.name in names:
+                raise ValueError(f"Router name {entry.name!r} is configured twice")
+            names.append(entry.name)
+        return self
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Settings parsed once per process and shared by every module."""
+    return Settings()
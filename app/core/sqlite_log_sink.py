@@ -1,68 +1,281 @@
+import atexit
 import json
 import sqlite3
 import threading
-from queue import Empty, Queue
-from typing import TYPE_CHECKING
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import TYPE_CHECKING, Literal
 
 if TYPE_CHECKING:
     from loguru import Message
 
+OverflowPolicy = Literal["block", "drop_oldest", "drop_debug"]
+
+# loguru severity of DEBUG; records at or below it are dropped by "drop_debug".
+DEBUG_SEVERITY = 10
+
+_STOP = object()
+
+PARTITION_PREFIX = "rx_logs_"
+ARCHIVE_SUFFIX = ".gz"
+
+# Schema changes applied to existing log files, keyed by PRAGMA user_version.
+MIGRATIONS: dict[int, list[str]] = {
+    1: [
+        "CREATE INDEX IF NOT EXISTS idx_rx_logs_timestamp ON rx_logs (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_rx_logs_level_timestamp "
+        "ON rx_logs (level, timestamp)",
+    ],
+    2: [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS rx_logs_fts "
+        "USING fts5(message, content='rx_logs', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS rx_logs_fts_insert AFTER INSERT ON rx_logs BEGIN "
+        "INSERT INTO rx_logs_fts (rowid, message) VALUES (new.id, new.message); END",
+        "CREATE TRIGGER IF NOT EXISTS rx_logs_fts_delete AFTER DELETE ON rx_logs BEGIN "
+        "INSERT INTO rx_logs_fts (rx_logs_fts, rowid, message) "
+        "VALUES ('delete', old.id, old.message); END",
+        # Backfill the index for rows written before the table existed.
+        "INSERT INTO rx_logs_fts (rx_logs_fts) VALUES ('rebuild')",
+    ],
+}
+
+
+@dataclass(frozen=True)
+class LogPartition:
+    """One file of log records: a day's partition, hot or archived.
+
+    ``day`` is None for the ``rx_logs`` table of ``db_path`` itself, where
+    records were written before partitioning. It is read, but never
+    written, until :func:`app.core.log_retention.split_legacy` has moved
+    its records into day partitions and removed it.
+    """
+
+    path: Path
+    day: date | None
+    archived: bool = False
+
+
+def partition_dir(db_path: str) -> Path:
+    """Directory holding the partitions of ``db_path``: log.db -> log.d/."""
+    return Path(db_path).with_suffix(".d")
+
+
+def partition_path(db_path: str, day: str) -> Path:
+    """Hot partition file for ``day`` as YYYY-MM-DD."""
+    return partition_dir(db_path) / f"{PARTITION_PREFIX}{day.replace('-', '')}.db"
+
+
+def list_partitions(db_path: str) -> list[LogPartition]:
+    """Every partition of ``db_path``, newest first, the legacy table last.
+
+    A day that is both hot and archived, which only happens while
+    archiving, is listed once, hot.
+    """
+    by_day: dict[date, LogPartition] = {}
+    for path in partition_dir(db_path).glob(f"{PARTITION_PREFIX}*.db*"):
+        name = path.name.removeprefix(PARTITION_PREFIX)
+        archived = name.endswith(ARCHIVE_SUFFIX)
+        stamp, _, extension = name.removesuffix(ARCHIVE_SUFFIX).partition(".")
+        if extension != "db":  # -wal, -shm and unfinished archives
+            continue
+        try:
+            day = datetime.strptime(stamp, "%Y%m%d").date()
+        except ValueError:
+            continue
+        if day not in by_day or by_day[day].archived:
+            by_day[day] = LogPartition(path, day, archived)
+    partitions = [by_day[day] for day in sorted(by_day, reverse=True)]
+    if Path(db_path).is_file():
+        partitions.append(LogPartition(Path(db_path), None))
+    return partitions
+
+
+def open_partition(path: Path) -> sqlite3.Connection:
+    """Connect to a partition file, creating and migrating its schema."""
+    # Every uvicorn worker has its own writer on the same file; wait for
+    # the others' commits instead of dropping the batch as locked.
+    conn = sqlite3.connect(path, timeout=30.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rx_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            level TEXT,
+            message TEXT,
+            extra JSON
+        )
+        """
+    )
+    conn.commit()
+    migrate(conn)
+    return conn
+
+
+def migrate(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for target in sorted(v for v in MIGRATIONS if v > version):
+        try:
+            with conn:
+                for statement in MIGRATIONS[target]:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {target}")
+        except sqlite3.OperationalError:
+            # e.g. SQLite built without FTS5; retried on the next start.
+            return
+
 
 class SQLiteLogSink:
-    def __init__(self, db_path: str = "log.db"):
+    """Loguru sink that writes records to SQLite from a background thread.
+
+    Records are partitioned by day: each goes to the ``rx_logs`` table of
+    its day's file in :func:`partition_dir`, so expiring a day deletes one
+    file and never touches the table being written (see
+    :mod:`app.core.log_retention`).
+
+    Records are buffered in a bounded queue and written over persistent
+    WAL-mode connections in ``executemany`` batches, committed once
+    ``batch_size`` records are pending or ``flush_interval`` seconds have
+    passed. When the queue is full, ``overflow`` decides what happens:
+
+    - ``block``: the logging call waits for room.
+    - ``drop_oldest``: the oldest queued record is discarded.
+    - ``drop_debug``: DEBUG and TRACE records are discarded and more
+      severe records wait for room.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "log.db",
+        max_queue_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        overflow: OverflowPolicy = "block",
+    ):
         self.db_path = db_path
-        self.queue = Queue()
-        self._setup_database()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.queue: Queue = Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.written = 0
+        self._closed = False
+        partition_dir(db_path).mkdir(parents=True, exist_ok=True)
         self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
         self.worker_thread.start()
+        atexit.register(self.close)
 
-    def _setup_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS rx_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                level TEXT,
-                message TEXT,
-                extra JSON
-            )
-            """
-        )
-        conn.commit()
-        conn.close()
+    @property
+    def queued(self) -> int:
+        return self.queue.qsize()
+
+    def stats(self) -> dict[str, int]:
+        return {"queued": self.queued, "dropped": self.dropped, "written": self.written}
+
+    def _connect(self, day: str) -> sqlite3.Connection:
+        return open_partition(partition_path(self.db_path, day))
 
     def _process_queue(self):
-        while True:
+        connections: dict[str, sqlite3.Connection] = {}
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                by_day: dict[str, list[tuple]] = {}
+                for log_entry in batch:
+                    by_day.setdefault(log_entry[0][:10], []).append(log_entry)
+                for day, rows in by_day.items():
+                    conn = connections.get(day)
+                    if conn is None:
+                        try:
+                            conn = connections[day] = self._connect(day)
+                        except sqlite3.Error:
+                            self.dropped += len(rows)
+                            continue
+                    self._insert_logs(conn, rows)
+                # Only the current day stays open, so past partitions can be
+                # archived and deleted from under the writer.
+                if by_day:
+                    for day in set(connections) - set(by_day):
+                        connections.pop(day).close()
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+    def _next_batch(self) -> tuple[list[tuple[str, str, str, str]], bool]:
+        """Collect rows until the batch is full or the flush interval ends."""
+        batch: list[tuple[str, str, str, str]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
             try:
-                log_entry = self.queue.get(timeout=1)
-                if log_entry:
-                    self._insert_log(**log_entry)
+                log_entry = (
+                    self.queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self.queue.get_nowait()
+                )
             except Empty:
-                continue
-
-    def _insert_log(self, time: str, level: str, message: str, extra: dict):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+                break
+            if log_entry is _STOP:
+                return batch, True
+            batch.append(log_entry)
+        return batch, False
 
-        # Serialize extra dict to JSON string
-        extra_json = json.dumps(extra) if extra else "{}"
+    def _insert_logs(self, conn: sqlite3.Connection, batch: list[tuple]):
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO rx_logs (timestamp, level, message, extra) VALUES (?, ?, ?, ?)",
+                    batch,
+                )
+            self.written += len(batch)
+        except sqlite3.Error:
+            self.dropped += len(batch)
 
-        cursor.execute(
-            "INSERT INTO rx_logs (timestamp, level, message, extra) VALUES (?, ?, ?, ?)",
-            (time, level, message, extra_json),
-        )
-        conn.commit()
-        conn.close()
+    def close(self, timeout: float = 5.0):
+        """Flush pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self.queue.put(_STOP)
+        self.worker_thread.join(timeout=timeout)
 
     def __call__(self, log_record: "Message"):
+        if self._closed:
+            self.dropped += 1
+            return
         record = log_record.record
-        self.queue.put(
-            {
-                "time": record["time"].strftime("%Y-%m-%d %H:%M:%S.%f"),
-                "level": record["level"].name,
-                "message": record["message"],
-                "extra": record["extra"],
-            }
+        extra = record["extra"]
+        log_entry = (
+            record["time"].strftime("%Y-%m-%d %H:%M:%S.%f"),
+            record["level"].name,
+            record["message"],
+            # Serialize extra dict to JSON string
+            json.dumps(extra, default=str) if extra else "{}",
         )
+        try:
+            self.queue.put_nowait(log_entry)
+        except Full:
+            self._overflow(log_entry, record["level"].no)
+
+    def _overflow(self, log_entry: tuple, severity: int):
+        if self.overflow == "drop_debug" and severity <= DEBUG_SEVERITY:
+            self.dropped += 1
+            return
+        if self.overflow == "drop_oldest":
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(log_entry)
+                    return
+                except Full:
+                    continue
+        self.queue.put(log_entry)
@@ -0,0 +1,119 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from app.lib.routeros.domain.entities import SystemResource
+from app.lib.routeros.domain.repositories import SystemResourceRepository
+from app.lib.routeros.types import ConnectionConfig
+
+
+@dataclass
+class LiveUpdate:
+    """One pushed system resource update, or the error that replaced it."""
+
+    router: str
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    data: SystemResource | None = None
+    error_message: str | None = None
+
+
+class Subscription:
+    """A subscriber's bounded inbox.
+
+    When the subscriber falls behind, the oldest pending update is dropped
+    so it always catches up to the latest state instead of stalling the
+    upstream or growing without bound.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue[LiveUpdate] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, update: LiveUpdate):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(update)
+
+    async def get(self) -> LiveUpdate:
+        return await self._queue.get()
+
+
+class _Topic:
+    def __init__(self, router: str, config: ConnectionConfig):
+        self.router = router
+        self.config = config
+        self.subscribers: set[Subscription] = set()
+        self.last: LiveUpdate | None = None
+        self.task: asyncio.Task[None] | None = None
+
+    def publish(self, update: LiveUpdate):
+        self.last = update
+        for subscription in self.subscribers:
+            subscription.push(update)
+
+
+class SystemResourceBroadcaster:
+    """Fans one upstream subscription per router out to many subscribers.
+
+    The upstream starts with the first subscriber of a router and is
+    cancelled when the last one leaves.
+    """
+
+    def __init__(
+        self,
+        repo_factory: Callable[[ConnectionConfig], SystemResourceRepository],
+        interval: float = 1.0,
+        queue_size: int = 8,
+    ):
+        self._repo_factory = repo_factory
+        self._interval = interval
+        self._queue_size = queue_size
+        self._topics: dict[str, _Topic] = {}
+
+    @asynccontextmanager
+    async def subscribe(
+        self, router: str, config: ConnectionConfig
+    ) -> AsyncIterator[Subscription]:
+        topic = self._topics.get(router)
+        if topic is None:
+            topic = self._topics[router] = _Topic(router, config)
+        subscription = Subscription(self._queue_size)
+        if topic.last is not None:
+            subscription.push(topic.last)
+        topic.subscribers.add(subscription)
+        if topic.task is None:
+            topic.task = asyncio.create_task(self._upstream(topic))
+        try:
+            yield subscription
+        finally:
+            topic.subscribers.discard(subscription)
+            if not topic.subscribers:
+                del self._topics[router]
+                if topic.task is not None:
+                    topic.task.cancel()
+
+    def stats(self) -> dict[str, int]:
+        return {router: len(t.subscribers) for router, t in self._topics.items()}
+
+    async def _upstream(self, topic: _Topic):
+        repository = self._repo_factory(topic.config)
+        backoff = 1.0
+        while True:
+            try:
+                async for system_resource in repository.watch_system_resource(
+                    self._interval
+                ):
+                    topic.publish(LiveUpdate(router=topic.router, data=system_resource))
+                    backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Live subscription to {} failed: {}", topic.router, e)
+                topic.publish(LiveUpdate(router=topic.router, error_message=str(e)))
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
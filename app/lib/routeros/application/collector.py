@@ -0,0 +1,158 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from app.lib.routeros.application.scheduler import PollScheduler
+from app.lib.routeros.application.use_cases import (
+    FleetSystemResourceResult,
+    FleetSystemResourceUseCase,
+)
+from app.lib.routeros.domain.entities import (
+    RouterInfo,
+    SystemResource,
+    SystemResourceSample,
+)
+from app.lib.routeros.domain.repositories import (
+    RouterInfoRepository,
+    SystemResourceHistoryRepository,
+)
+from app.lib.routeros.types import ConnectionConfig
+
+
+class SystemResourceCollector:
+    """Background task that polls routers and records their system resources.
+
+    Every ``interval`` seconds the routers returned by ``routers`` are
+    queried through ``FleetSystemResourceUseCase`` and all successful
+    snapshots of the cycle are written to the history repository in one
+    batch. ``on_samples``, if given, sees each cycle's samples first, and
+    ``router_info_repo`` gets every answering router's RouterInfo, also in
+    one batch. ``publish``, if given, is handed each snapshot as soon as
+    its router answers, which is how other workers get to serve it
+    without polling themselves.
+
+    With a ``scheduler``, routers are instead polled on their own adaptive
+    schedules (see :class:`PollScheduler`) and whatever answered is
+    stored the same way every ``flush_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        fleet_use_case: FleetSystemResourceUseCase,
+        history_repo: SystemResourceHistoryRepository,
+        routers: Callable[[], dict[str, ConnectionConfig]],
+        interval: float = 10.0,
+        on_samples: Callable[[list[SystemResourceSample]], None] | None = None,
+        router_info_repo: RouterInfoRepository | None = None,
+        scheduler: PollScheduler | None = None,
+        flush_interval: float = 1.0,
+        publish: Callable[[str, SystemResource], None] | None = None,
+    ):
+        self._fleet_use_case = fleet_use_case
+        self._history_repo = history_repo
+        self._routers = routers
+        self._interval = interval
+        self._on_samples = on_samples
+        self._router_info_repo = router_info_repo
+        self._scheduler = scheduler
+        self._flush_interval = flush_interval
+        self._publish = publish
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            run = self._run if self._scheduler is None else self._run_scheduled
+            self._task = asyncio.get_running_loop().create_task(run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def collect_once(self) -> int:
+        """Poll every router once and store the results; returns rows written."""
+        timestamp = datetime.now(timezone.utc)
+        results = []
+        async for result in self._fleet_use_case.execute(self._routers()):
+            if result.data is not None:
+                self._answered(result)
+                results.append((timestamp, result))
+        return await self._store(results)
+
+    def _answered(self, result: FleetSystemResourceResult):
+        if self._publish is not None and result.data is not None:
+            self._publish(result.router, result.data)
+
+    async def _store(
+        self, results: list[tuple[datetime, FleetSystemResourceResult]]
+    ) -> int:
+        samples = [
+            SystemResourceSample.from_resource(result.router, timestamp, result.data)
+            for timestamp, result in results
+            if result.data is not None
+        ]
+        if self._on_samples is not None:
+            self._on_samples(samples)
+        await self._history_repo.add_samples(samples)
+        if self._router_info_repo is not None:
+            await self._router_info_repo.update_many(
+                [
+                    RouterInfo.from_resource(
+                        result.router, result.host, timestamp, result.data
+                    )
+                    for timestamp, result in results
+                    if result.data is not None
+                ]
+            )
+        return len(samples)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                written = await self.collect_once()
+                logger.debug("Recorded {} system resource samples", written)
+            except Exception as e:
+                logger.warning("System resource collection failed: {}", e)
+            await asyncio.sleep(max(0.0, self._interval - (loop.time() - started)))
+
+    async def _run_scheduled(self):
+        assert self._scheduler is not None
+        pending: list[tuple[datetime, FleetSystemResourceResult]] = []
+
+        def answered(result: FleetSystemResourceResult):
+            if result.data is not None:
+                self._answered(result)
+                pending.append((datetime.now(timezone.utc), result))
+
+        polling = asyncio.create_task(
+            self._scheduler.run(self._routers, self._fleet_use_case.query, answered)
+        )
+        try:
+            while not polling.done():
+                await asyncio.sleep(self._flush_interval)
+                batch, pending = pending, []
+                if not batch:
+                    continue
+                try:
+                    written = await self._store(batch)
+                    logger.debug("Recorded {} system resource samples", written)
+                except Exception as e:
+                    logger.warning("System resource collection failed: {}", e)
+            polling.result()
+        finally:
+            polling.cancel()
+            await asyncio.gather(polling, return_exceptions=True)
+            # Store what answered since the last flush instead of dropping it.
+            if pending:
+                try:
+                    await self._store(pending)
+                except Exception as e:
+                    logger.warning("System resource collection failed: {}", e)
@@ -0,0 +1,202 @@
+import asyncio
+import difflib
+import hashlib
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.metrics import registry
+from app.lib.routeros.domain.entities import (
+    ConfigDiff,
+    ConfigSectionDiff,
+    ConfigSnapshot,
+)
+from app.lib.routeros.domain.repositories import (
+    ConfigSnapshotRepository,
+    ConfigSourceRepository,
+)
+from app.lib.routeros.types import ConnectionConfig
+
+config_captures = registry.counter(
+    "rx_config_captures_total",
+    "Router configuration captures, by whether the configuration had changed.",
+    ("outcome",),
+)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def manifest_hash(sections: dict[str, str]) -> str:
+    """Hash of a section-to-hash mapping, independent of its order."""
+    return content_hash(
+        "".join(f"{name}\0{digest}\n" for name, digest in sorted(sections.items()))
+    )
+
+
+class ConfigCapture(BaseModel):
+    """Outcome of one capture: the router's latest snapshot, new or not."""
+
+    changed: bool
+    snapshot: ConfigSnapshot
+
+
+class ConfigSnapshotService:
+    """Captures router configurations and diffs the snapshots on demand.
+
+    A captured configuration is stored only when its manifest hash differs
+    from the router's latest snapshot, so detecting that nothing changed
+    costs one hash comparison and no writes. Sections are stored by the
+    hash of their text, once for every router and capture that shares it.
+
+    :meth:`start` captures every router once per ``interval``, at most
+    ``max_concurrency`` at a time.
+    """
+
+    def __init__(
+        self,
+        repo: ConfigSnapshotRepository,
+        source_factory: Callable[[ConnectionConfig], ConfigSourceRepository],
+        routers: Callable[[], dict[str, ConnectionConfig]],
+        interval: float = 3600.0,
+        max_concurrency: int = 8,
+        deadline: float = 120.0,
+    ):
+        self._repo = repo
+        self._source_factory = source_factory
+        self._routers = routers
+        self._interval = interval
+        self._max_concurrency = max_concurrency
+        self._deadline = deadline
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def capture(self, name: str, config: ConnectionConfig) -> ConfigCapture:
+        """Read a router's configuration and store it if it changed."""
+        try:
+            text = await asyncio.wait_for(
+                self._source_factory(config).get_config_sections(), self._deadline
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"Reading the config of {name} timed out after {self._deadline}s"
+            ) from None
+        sections = {section: content_hash(body) for section, body in text.items()}
+        digest = manifest_hash(sections)
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            previous = await self._repo.get_latest(name)
+            if previous is not None and previous.hash == digest:
+                config_captures.inc(outcome="unchanged")
+                return ConfigCapture(changed=False, snapshot=previous)
+            before = previous.sections if previous is not None else {}
+            snapshot = ConfigSnapshot(
+                router=name,
+                timestamp=datetime.now(timezone.utc),
+                hash=digest,
+                sections=sections,
+                changed=sorted(
+                    section
+                    for section in before.keys() | sections.keys()
+                    if before.get(section) != sections.get(section)
+                ),
+            )
+            snapshot = await self._repo.add_snapshot(
+                snapshot, {sections[section]: body for section, body in text.items()}
+            )
+        config_captures.inc(outcome="changed")
+        return ConfigCapture(changed=True, snapshot=snapshot)
+
+    async def diff(
+        self, source: ConfigSnapshot, target: ConfigSnapshot, context: int = 3
+    ) -> ConfigDiff:
+        """Unified diffs of the sections whose hashes differ, by section name."""
+        names = sorted(
+            section
+            for section in source.sections.keys() | target.sections.keys()
+            if source.sections.get(section) != target.sections.get(section)
+        )
+        content = await self._repo.get_content(
+            digest
+            for section in names
+            for digest in (source.sections.get(section), target.sections.get(section))
+            if digest is not None
+        )
+        sections = []
+        for section in names:
+            before = source.sections.get(section)
+            after = target.sections.get(section)
+            lines = difflib.unified_diff(
+                content.get(before, "").splitlines() if before else [],
+                content.get(after, "").splitlines() if after else [],
+                f"{source.router}@{source.id}",
+                f"{target.router}@{target.id}",
+                lineterm="",
+                n=context,
+            )
+            status = "added" if before is None else "changed" if after else "removed"
+            sections.append(
+                ConfigSectionDiff(section=section, status=status, lines=list(lines))
+            )
+        return ConfigDiff(source=source, target=target, sections=sections)
+
+    async def with_content(self, snapshot: ConfigSnapshot) -> ConfigSnapshot:
+        """The snapshot with the text of each of its sections."""
+        content = await self._repo.get_content(snapshot.sections.values())
+        return snapshot.model_copy(
+            update={
+                "content": {
+                    section: content.get(digest, "")
+                    for section, digest in snapshot.sections.items()
+                }
+            }
+        )
+
+    async def capture_all(self) -> int:
+        """Capture every router once; returns how many had changed."""
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def capture(name: str, config: ConnectionConfig) -> bool:
+            async with semaphore:
+                try:
+                    return (await self.capture(name, config)).changed
+                except Exception as e:
+                    config_captures.inc(outcome="error")
+                    logger.warning("Capturing the config of {} failed: {}", name, e)
+                    return False
+
+        routers = self._routers()
+        self._locks = {
+            name: lock for name, lock in self._locks.items() if name in routers
+        }
+        results = await asyncio.gather(
+            *(capture(name, config) for name, config in routers.items())
+        )
+        return sum(results)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                changed = await self.capture_all()
+                logger.info("Config snapshots: {} routers changed", changed)
+            except Exception as e:
+                logger.warning("Config snapshot collection failed: {}", e)
+            await asyncio.sleep(max(0.0, self._interval - (loop.time() - started)))
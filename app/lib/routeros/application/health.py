@@ -0,0 +1,294 @@
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from app.lib.routeros.domain.entities import (
+    Alert,
+    AlertTransition,
+    HealthRule,
+    SystemResource,
+    SystemResourceSample,
+)
+
+METRICS: dict[str, Callable[[SystemResourceSample], float]] = {
+    "cpu_load": lambda s: s.cpu_load,
+    "memory_usage_percentage": lambda s: s.memory_usage_percentage,
+    "hdd_usage_percentage": lambda s: s.hdd_usage_percentage,
+    "free_memory": lambda s: s.free_memory,
+    "free_hdd_space": lambda s: s.free_hdd_space,
+    "write_sector_total": lambda s: s.write_sector_total,
+    "write_sector_since_reboot": lambda s: s.write_sector_since_reboot,
+    "bad_blocks": lambda s: s.bad_blocks,
+    "uptime_seconds": lambda s: s.uptime_seconds,
+}
+
+DEFAULT_RULES = [
+    HealthRule(
+        name="cpu-high",
+        metric="cpu_load",
+        threshold=90,
+        clear=80,
+        for_seconds=60,
+    ),
+    HealthRule(
+        name="memory-high",
+        metric="memory_usage_percentage",
+        threshold=90,
+        clear=85,
+        for_seconds=60,
+        severity="critical",
+    ),
+    HealthRule(
+        name="disk-high",
+        metric="hdd_usage_percentage",
+        threshold=90,
+        clear=85,
+    ),
+    HealthRule(
+        name="bad-blocks-increasing",
+        metric="bad_blocks",
+        kind="rate",
+        threshold=0,
+        per=3600,
+        severity="critical",
+    ),
+    HealthRule(
+        name="flash-write-rate",
+        metric="write_sector_since_reboot",
+        kind="rate",
+        threshold=100,
+        for_seconds=600,
+    ),
+]
+
+
+class _RuleState:
+    """Where one rule stands for one router between samples."""
+
+    __slots__ = ("pending_since", "firing", "last_transition", "previous")
+
+    def __init__(self):
+        self.pending_since: float | None = None
+        self.firing = False
+        self.last_transition = float("-inf")
+        # (timestamp, raw metric value) of the last sample, for rate rules.
+        self.previous: tuple[float, float] | None = None
+
+
+class HealthRuleEngine:
+    """Evaluates health rules incrementally as snapshots arrive.
+
+    Each sample only advances the per-router, per-rule state it touches:
+    sustained conditions remember when they started, rate rules remember
+    the previous counter value and firing alerts are kept in a dict, so
+    reading the current alert set never goes back to the routers.
+
+    A state change is emitted once, as an :class:`AlertTransition`, and
+    no rule may change state for a router more often than every
+    ``min_transition_interval`` seconds; a change arriving sooner waits
+    for the first sample after the interval that still agrees with it.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[HealthRule] = DEFAULT_RULES,
+        min_transition_interval: float = 60.0,
+        history: int = 1000,
+    ):
+        self._states: dict[str, dict[str, _RuleState]] = {}
+        self._active: dict[str, dict[str, Alert]] = {}
+        self.configure(rules, min_transition_interval, history)
+
+    def configure(
+        self,
+        rules: Iterable[HealthRule] = DEFAULT_RULES,
+        min_transition_interval: float = 60.0,
+        history: int = 1000,
+    ):
+        """Replace the rules; all alert state and history starts over."""
+        rules = list(rules)
+        unknown = {rule.metric for rule in rules} - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown health metrics {sorted(unknown)}")
+        self.rules = rules
+        self.min_transition_interval = min_transition_interval
+        self._states.clear()
+        self._active.clear()
+        self._transitions: deque[AlertTransition] = deque(maxlen=history)
+
+    def evaluate(self, sample: SystemResourceSample) -> list[AlertTransition]:
+        """Advance every rule for the sample's router; returns the changes."""
+        states = self._states.get(sample.router)
+        if states is None:
+            states = self._states[sample.router] = {}
+        timestamp = sample.timestamp.timestamp()
+        changes = []
+        for rule in self.rules:
+            state = states.get(rule.name)
+            if state is None:
+                state = states[rule.name] = _RuleState()
+            value = self._value(rule, state, timestamp, METRICS[rule.metric](sample))
+            if value is None:
+                continue
+            transition = self._advance(rule, state, sample, timestamp, value)
+            if transition is not None:
+                changes.append(transition)
+        return changes
+
+    def evaluate_many(
+        self, samples: Iterable[SystemResourceSample]
+    ) -> list[AlertTransition]:
+        return [change for sample in samples for change in self.evaluate(sample)]
+
+    def check(self, resource: SystemResource) -> list[str]:
+        """Threshold rules breached by one snapshot, ignoring any state.
+
+        ``for_seconds`` is not waited for here, and rate rules, which need
+        two samples, are left to :meth:`evaluate`.
+        """
+        sample = SystemResourceSample.from_resource(
+            "", datetime.now(timezone.utc), resource
+        )
+        return [
+            self._message(rule, METRICS[rule.metric](sample))
+            for rule in self.rules
+            if rule.kind == "threshold" and rule.breached(METRICS[rule.metric](sample))
+        ]
+
+    def pressure(self, resource: SystemResource) -> float:
+        """How close one snapshot is to its nearest threshold, as a ratio.
+
+        1.0 is at the threshold of some rule and anything above is past
+        it; 0.0 means no threshold rule applies.
+        """
+        sample = SystemResourceSample.from_resource(
+            "", datetime.now(timezone.utc), resource
+        )
+        ratios = []
+        for rule in self.rules:
+            if rule.kind != "threshold":
+                continue
+            value = METRICS[rule.metric](sample)
+            if rule.op == ">":
+                ratios.append(value / rule.threshold if rule.threshold > 0 else 0.0)
+            else:
+                ratios.append(rule.threshold / value if value > 0 else 1.0)
+        return max(ratios, default=0.0)
+
+    def active(
+        self, router: str | None = None, severity: str | None = None
+    ) -> list[Alert]:
+        if router is not None:
+            alerts = list(self._active.get(router, {}).values())
+        else:
+            alerts = [a for by_rule in self._active.values() for a in by_rule.values()]
+        if severity is not None:
+            alerts = [alert for alert in alerts if alert.severity == severity]
+        return alerts
+
+    def transitions(self, limit: int = 100) -> list[AlertTransition]:
+        """Most recent state changes, newest first."""
+        return list(reversed(self._transitions))[:limit]
+
+    def retain(self, routers: set[str]):
+        """Forget routers that are no longer polled, alerts included."""
+        for router in set(self._states) - routers:
+            del self._states[router]
+            self._active.pop(router, None)
+
+    def _value(
+        self, rule: HealthRule, state: _RuleState, timestamp: float, value: float
+    ) -> float | None:
+        if rule.kind == "threshold":
+            return value
+        previous, state.previous = state.previous, (timestamp, value)
+        if previous is None or timestamp <= previous[0]:
+            return None
+        if value < previous[1]:
+            # The counter went back: a reboot or reset, not a negative rate.
+            return None
+        return (value - previous[1]) / (timestamp - previous[0]) * rule.per
+
+    def _advance(
+        self,
+        rule: HealthRule,
+        state: _RuleState,
+        sample: SystemResourceSample,
+        timestamp: float,
+        value: float,
+    ) -> AlertTransition | None:
+        router = sample.router
+        if state.firing:
+            alert = self._active[router][rule.name]
+            alert.value, alert.updated_at = value, sample.timestamp
+            if not rule.cleared(value) or not self._may_transition(state, timestamp):
+                return None
+            state.firing = False
+            del self._active[router][rule.name]
+            return self._record(rule, router, "resolved", value, sample.timestamp)
+
+        if not rule.breached(value):
+            state.pending_since = None
+            return None
+        if state.pending_since is None:
+            state.pending_since = timestamp
+        if timestamp - state.pending_since < rule.for_seconds:
+            return None
+        if not self._may_transition(state, timestamp):
+            return None
+        state.firing = True
+        state.pending_since = None
+        self._active.setdefault(router, {})[rule.name] = Alert(
+            router=router,
+            rule=rule.name,
+            severity=rule.severity,
+            metric=rule.metric,
+            value=value,
+            threshold=rule.threshold,
+            message=self._message(rule, value),
+            since=sample.timestamp,
+            updated_at=sample.timestamp,
+        )
+        return self._record(rule, router, "firing", value, sample.timestamp)
+
+    def _may_transition(self, state: _RuleState, timestamp: float) -> bool:
+        if timestamp - state.last_transition < self.min_transition_interval:
+            return False
+        state.last_transition = timestamp
+        return True
+
+    def _record(
+        self,
+        rule: HealthRule,
+        router: str,
+        state: str,
+        value: float,
+        timestamp: datetime,
+    ) -> AlertTransition:
+        transition = AlertTransition(
+            router=router,
+            rule=rule.name,
+            severity=rule.severity,
+            state=state,  # pyright: ignore
+            value=value,
+            message=self._message(rule, value, resolved=state == "resolved"),
+            timestamp=timestamp,
+        )
+        self._transitions.append(transition)
+        log = logger.warning if state == "firing" else logger.info
+        log("Alert {} {} on {}: {}", rule.name, state, router, transition.message)
+        return transition
+
+    @staticmethod
+    def _message(rule: HealthRule, value: float, resolved: bool = False) -> str:
+        subject = rule.metric if rule.kind == "threshold" else f"{rule.metric} rate"
+        unit = "" if rule.kind == "threshold" else f" per {rule.per:g}s"
+        if resolved:
+            op = "<=" if rule.op == ">" else ">="
+            return f"{subject} {value:.1f}{unit} back {op} {rule.clear:g}"
+        return f"{subject} {value:.1f}{unit} {rule.op} {rule.threshold:g}"
+
+
+health_engine = HealthRuleEngine()
@@ -0,0 +1,175 @@
+import math
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from app.lib.routeros.domain.entities import (
+    ROLLUP_METRICS,
+    ROLLUP_RESOLUTIONS,
+    MetricPoint,
+    MetricSeries,
+)
+from app.lib.routeros.domain.repositories import SystemResourceHistoryRepository
+
+Downsample = Literal["lttb", "bucket", "none"]
+
+
+def lttb(points: Sequence[MetricPoint], threshold: int) -> list[MetricPoint]:
+    """Pick ``threshold`` of ``points`` that keep the shape of their averages.
+
+    Largest-Triangle-Three-Buckets: the first and last points are kept,
+    and from each of the buckets in between the point forming the largest
+    triangle with the point kept before it and the next bucket's mean.
+    Spikes survive, and every point returned is one that was measured.
+    """
+    if threshold >= len(points):
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:threshold]
+    xs = [point.timestamp.timestamp() for point in points]
+    ys = [point.avg for point in points]
+    picked = [points[0]]
+    size = (len(points) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * size) + 1
+        stop = int((i + 1) * size) + 1
+        following = slice(stop, min(int((i + 2) * size) + 1, len(points)))
+        if following.start >= following.stop:
+            following = slice(len(points) - 1, len(points))
+        mean_x = sum(xs[following]) / (following.stop - following.start)
+        mean_y = sum(ys[following]) / (following.stop - following.start)
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            area = abs(
+                (xs[a] - mean_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (mean_y - ys[a])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(points[best])
+        a = best
+    picked.append(points[-1])
+    return picked
+
+
+def merge_buckets(points: Sequence[MetricPoint], n: int) -> list[MetricPoint]:
+    """Merge consecutive ``points`` into ``n`` wider buckets, exactly.
+
+    Each merged point starts at its first point and keeps the lowest
+    minimum, the highest maximum, the count-weighted average and the
+    last value of the points it covers.
+    """
+    if n >= len(points):
+        return list(points)
+    merged = []
+    for i in range(n):
+        group = points[i * len(points) // n : (i + 1) * len(points) // n]
+        count = sum(point.count for point in group)
+        merged.append(
+            MetricPoint(
+                timestamp=group[0].timestamp,
+                min=min(point.min for point in group),
+                max=max(point.max for point in group),
+                avg=sum(point.avg * point.count for point in group) / count,
+                last=group[-1].last,
+                count=count,
+            )
+        )
+    return merged
+
+
+class HistoryQueryEngine:
+    """Serves a metric's history at the resolution a chart can show.
+
+    The tier is picked per query: raw samples when a router has at most
+    ``points`` of them in range, otherwise the finest rollup resolution
+    whose buckets fit. A tier that would leave the chart sparse, under a
+    quarter of ``points``, is passed over for the next finer rollup, whose
+    points are then downsampled to ``points``: with ``lttb`` by picking
+    the points that keep its shape, with ``bucket`` by merging them into
+    wider buckets, or not at all with ``none``.
+
+    Fleet series come from rollups only, as there is nothing to aggregate
+    raw samples of different routers by.
+    """
+
+    def __init__(self, repo: SystemResourceHistoryRepository):
+        self._repo = repo
+
+    async def series(
+        self,
+        router: str | None,
+        metric: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        points: int = 500,
+        downsample: Downsample = "lttb",
+    ) -> MetricSeries:
+        if metric not in ROLLUP_METRICS:
+            raise ValueError(
+                f"Unknown metric {metric}, expected one of {', '.join(ROLLUP_METRICS)}"
+            )
+        # Naive bounds are UTC, as the repository stores them.
+        if end is not None and end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        if start is not None and start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=1)
+        if start >= end:
+            raise ValueError("start must be before end")
+        span = (end - start).total_seconds()
+
+        tiers: list[int | None] = [*ROLLUP_RESOLUTIONS]
+        if router is not None:
+            tiers.insert(0, None)
+        estimates = []
+        for resolution in tiers:
+            if resolution is None:
+                estimate = await self._repo.count_samples(
+                    router, start, end, points + 1
+                )
+            else:
+                estimate = math.ceil(span / resolution)
+            estimates.append(estimate)
+            if estimate <= points:
+                break
+        index = len(estimates) - 1
+        # Samples can be far denser than the estimate of the tier above them,
+        # so only rollups are fallen back to.
+        if index > 0 and tiers[index - 1] is not None and estimates[index] < points / 4:
+            index -= 1
+        resolution = tiers[index]
+
+        if resolution is None:
+            samples = await self._repo.get_samples(router, start, end, points)
+            data = [
+                MetricPoint(
+                    timestamp=sample.timestamp,
+                    min=value,
+                    max=value,
+                    avg=value,
+                    last=value,
+                    count=1,
+                )
+                for sample in samples
+                for value in (float(getattr(sample, metric)),)
+            ]
+        else:
+            data = await self._repo.get_rollups(router, metric, resolution, start, end)
+
+        method = None
+        if len(data) > points and downsample != "none":
+            method = downsample
+            data = (
+                lttb(data, points)
+                if downsample == "lttb"
+                else merge_buckets(data, points)
+            )
+        return MetricSeries(
+            router=router,
+            metric=metric,
+            resolution=resolution,
+            downsample=method,
+            points=data,
+        )
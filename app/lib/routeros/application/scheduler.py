@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import heapq
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.metrics import registry
+from app.lib.routeros.application.health import health_engine
+from app.lib.routeros.application.use_cases import FleetSystemResourceResult
+from app.lib.routeros.domain.entities import SystemResource
+from app.lib.routeros.types import ConnectionConfig
+
+poll_lag = registry.histogram(
+    "rx_poll_lag_seconds",
+    "Delay between a router's poll falling due and starting.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+Poll = Callable[[str, ConnectionConfig], Awaitable[FleetSystemResourceResult]]
+
+
+class RouterSchedule(BaseModel):
+    """Where one router stands in the polling schedule, as served by the API."""
+
+    router: str
+    interval: float
+    next_due_in: float
+    in_flight: bool
+    polls: int
+    last_status: str | None
+    last_lag_ms: float | None
+    pressure: float | None
+
+
+class SchedulerStats(BaseModel):
+    """Polling schedule summary; lag percentiles cover the recent polls."""
+
+    routers: int
+    in_flight: int
+    overdue: int
+    polls: int
+    mean_interval: float | None
+    lag_p50_ms: float | None
+    lag_p95_ms: float | None
+    lag_max_ms: float | None
+    schedules: list[RouterSchedule] | None = None
+
+
+def _fraction(*parts: object) -> float:
+    """Deterministic value in [0, 1) for ``parts``, the same in every process."""
+    digest = hashlib.blake2b("/".join(map(str, parts)).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "big") / 2**64
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class _RouterState:
+    """Schedule of one router between polls."""
+
+    __slots__ = (
+        "config",
+        "interval",
+        "due",
+        "in_flight",
+        "polls",
+        "status",
+        "lag",
+        "pressure",
+    )
+
+    def __init__(self, config: ConnectionConfig, interval: float, due: float):
+        self.config = config
+        self.interval = interval
+        self.due = due
+        self.in_flight = False
+        self.polls = 0
+        self.status: str | None = None
+        self.lag: float | None = None
+        self.pressure: float | None = None
+
+
+class PollScheduler:
+    """Polls every router on its own schedule instead of all at once.
+
+    Routers are kept in a heap by next-due time. New routers are spread
+    evenly over ``interval``, in an order fixed by a hash of their name,
+    and every following poll is due one router interval after the last
+    one was, give or take ``jitter`` of it, again derived from the name so
+    the schedule is the same on every run.
+
+    Each router's interval adapts to what its polls return: it halves,
+    down to ``min_interval``, when the snapshot's ``pressure`` is at
+    ``near`` or above or moved by ``volatility`` since the last poll. It
+    grows by a quarter, up to ``max_interval``, while the router is
+    stable, and doubles, up to the same limit, while it does not answer.
+
+    A router is never polled again before its previous poll finishes, at
+    most ``max_concurrency`` polls run at once and, with ``rate_limit``,
+    no more than that many start per second. The time a poll waits past
+    its due time for any of these is its lag, recorded in the
+    ``rx_poll_lag_seconds`` histogram and in :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 10.0,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        jitter: float = 0.1,
+        rate_limit: float | None = None,
+        max_concurrency: int = 32,
+        near: float = 0.8,
+        volatility: float = 0.1,
+        pressure: Callable[[SystemResource], float] | None = None,
+    ):
+        self._pressure = pressure
+        self._states: dict[str, _RouterState] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._lags: deque[float] = deque(maxlen=1000)
+        self.polls = 0
+        self.configure(
+            interval,
+            min_interval,
+            max_interval,
+            jitter,
+            rate_limit,
+            max_concurrency,
+            near,
+            volatility,
+        )
+
+    def configure(
+        self,
+        interval: float = 10.0,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        jitter: float = 0.1,
+        rate_limit: float | None = None,
+        max_concurrency: int = 32,
+        near: float = 0.8,
+        volatility: float = 0.1,
+    ):
+        self.interval = interval
+        self.min_interval = interval / 4 if min_interval is None else min_interval
+        self.max_interval = interval * 3 if max_interval is None else max_interval
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.max_concurrency = max_concurrency
+        self.near = near
+        self.volatility = volatility
+        self._states.clear()
+        self._heap.clear()
+        self._lags.clear()
+
+    async def run(
+        self,
+        routers: Callable[[], dict[str, ConnectionConfig]],
+        poll: Poll,
+        on_result: Callable[[FleetSystemResourceResult], None],
+        sync_interval: float = 1.0,
+    ):
+        """Poll until cancelled, picking up router changes every ``sync_interval``."""
+        # Schedules start over, spread again, whenever polling (re)starts.
+        self._states.clear()
+        self._heap.clear()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: set[asyncio.Task[None]] = set()
+        tokens, refilled = 1.0, time.monotonic()
+        next_sync = 0.0
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_sync:
+                    self._sync(routers(), now)
+                    next_sync = now + sync_interval
+                if not self._heap or self._heap[0][0] > now:
+                    wake = min(self._heap[0][0], next_sync) if self._heap else next_sync
+                    await asyncio.sleep(wake - now)
+                    continue
+                due, name = heapq.heappop(self._heap)
+                state = self._states.get(name)
+                if state is None or state.due != due or state.in_flight:
+                    continue  # left over from a removed or rescheduled router
+                state.in_flight = True
+                await semaphore.acquire()
+                if self.rate_limit:
+                    now = time.monotonic()
+                    burst = max(1.0, self.rate_limit)
+                    tokens = min(burst, tokens + (now - refilled) * self.rate_limit)
+                    refilled = now
+                    if tokens < 1:
+                        await asyncio.sleep((1 - tokens) / self.rate_limit)
+                        tokens, refilled = 1.0, time.monotonic()
+                    tokens -= 1
+                state.lag = time.monotonic() - due
+                self._lags.append(state.lag)
+                poll_lag.observe(state.lag)
+                task = asyncio.create_task(
+                    self._poll(name, state, poll, on_result, semaphore)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self, detail: bool = False) -> SchedulerStats:
+        now = time.monotonic()
+        states = list(self._states.items())
+        lags = sorted(self._lags)
+        return SchedulerStats(
+            routers=len(states),
+            in_flight=sum(state.in_flight for _, state in states),
+            overdue=sum(not state.in_flight and state.due < now for _, state in states),
+            polls=self.polls,
+            mean_interval=(
+                sum(state.interval for _, state in states) / len(states)
+                if states
+                else None
+            ),
+            lag_p50_ms=_percentile(lags, 50) * 1000 if lags else None,
+            lag_p95_ms=_percentile(lags, 95) * 1000 if lags else None,
+            lag_max_ms=lags[-1] * 1000 if lags else None,
+            schedules=[
+                RouterSchedule(
+                    router=name,
+                    interval=state.interval,
+                    next_due_in=max(0.0, state.due - now),
+                    in_flight=state.in_flight,
+                    polls=state.polls,
+                    last_status=state.status,
+                    last_lag_ms=None if state.lag is None else state.lag * 1000,
+                    pressure=state.pressure,
+                )
+                for name, state in sorted(states, key=lambda item: item[1].due)
+            ]
+            if detail
+            else None,
+        )
+
+    def _sync(self, routers: dict[str, ConnectionConfig], now: float):
+        for name in set(self._states) - set(routers):
+            del self._states[name]
+        added = sorted(set(routers) - set(self._states), key=_fraction)
+        for index, name in enumerate(added):
+            due = now + (index + 0.5) / len(added) * self.interval
+            self._states[name] = _RouterState(routers[name], self.interval, due)
+            heapq.heappush(self._heap, (due, name))
+        for name, config in routers.items():
+            self._states[name].config = config
+
+    async def _poll(
+        self,
+        name: str,
+        state: _RouterState,
+        poll: Poll,
+        on_result: Callable[[FleetSystemResourceResult], None],
+        semaphore: asyncio.Semaphore,
+    ):
+        try:
+            result = await poll(name, state.config)
+        except Exception as e:
+            logger.warning("Polling {} failed: {}", name, e)
+            result = None
+        finally:
+            semaphore.release()
+            state.in_flight = False
+        state.polls += 1
+        self.polls += 1
+        self._adapt(state, result)
+        if result is not None:
+            try:
+                on_result(result)
+            except Exception as e:
+                logger.warning("Handling the poll of {} failed: {}", name, e)
+        if self._states.get(name) is state:
+            spread = self.jitter * (2 * _fraction(name, state.polls) - 1)
+            state.due = max(time.monotonic(), state.due + state.interval * (1 + spread))
+            heapq.heappush(self._heap, (state.due, name))
+
+    def _adapt(self, state: _RouterState, result: FleetSystemResourceResult | None):
+        if result is None or result.data is None:
+            state.status = result.status if result is not None else "error"
+            state.pressure = None
+            state.interval = min(self.max_interval, state.interval * 2)
+            return
+        state.status = result.status
+        pressure = self._pressure(result.data) if self._pressure else 0.0
+        volatile = (
+            state.pressure is not None
+            and abs(pressure - state.pressure) >= self.volatility
+        )
+        state.pressure = pressure
+        if pressure >= self.near or volatile:
+            state.interval = max(self.min_interval, state.interval / 2)
+        else:
+            state.interval = min(self.max_interval, state.interval * 1.25)
+
+
+poll_scheduler = PollScheduler(pressure=health_engine.pressure)
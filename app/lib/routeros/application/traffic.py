@@ -0,0 +1,415 @@
+import asyncio
+import heapq
+import math
+import operator
+import time
+from array import array
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+
+from loguru import logger
+
+from app.lib.routeros.domain.entities import Interface, InterfaceRate
+from app.lib.routeros.domain.repositories import InterfaceRepository
+from app.lib.routeros.types import ConnectionConfig
+
+NAN = math.nan
+COUNTER_32 = 2**32
+
+RATE_METRICS = ("rx_bps", "tx_bps", "rx_pps", "tx_pps", "total_bps")
+
+
+def counter_delta(previous: int, current: int) -> int | None:
+    """Counter increase between two samples, or None if it was reset.
+
+    A drop from near the top of the 32-bit range is a wrap; any other drop
+    means the counter was reset, usually by a reboot.
+    """
+    if current >= previous:
+        return current - previous
+    if previous < COUNTER_32 and previous - current > COUNTER_32 // 2:
+        return current + COUNTER_32 - previous
+    return None
+
+
+class RouterTraffic:
+    """Ring buffers of interface rates for one router.
+
+    Every interface of the router is sampled at the same instants, so the
+    ring position and timestamps are shared. Each metric is one flat
+    ``array('d')`` holding ``capacity`` values per interface slot, which
+    keeps the memory per interface small and fixed. A slot whose interface
+    has been missing for a whole ring holds only gaps, so it is freed and
+    handed to the next new interface.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.slots: dict[str, int] = {}
+        self.names: list[str] = []
+        self.free: list[int] = []
+        self.timestamps = array("d", [NAN] * capacity)
+        self.head = -1
+        self.count = 0
+        self.polls = 0
+        self.rates = {m: array("d") for m in ("rx_bps", "tx_bps", "rx_pps", "tx_pps")}
+        # Last raw counters per slot, one array per counter.
+        self.counters = tuple(array("Q") for _ in range(4))
+        self.seen = array("d")
+        self.last_poll = array("q")
+
+    def _slot(self, name: str) -> int:
+        slot = self.slots.get(name)
+        if slot is not None:
+            return slot
+        if self.free:
+            slot = self.free.pop()
+            self.names[slot] = name
+            for counter in self.counters:
+                counter[slot] = 0
+            self.seen[slot] = NAN
+        else:
+            slot = len(self.names)
+            self.names.append(name)
+            filler = array("d", [NAN]) * self.capacity
+            for values in self.rates.values():
+                values.extend(filler)
+            for counter in self.counters:
+                counter.append(0)
+            self.seen.append(NAN)
+            self.last_poll.append(0)
+        self.slots[name] = slot
+        return slot
+
+    @property
+    def latest(self) -> float:
+        return self.timestamps[self.head] if self.count else -math.inf
+
+    def ingest(self, timestamp: float, interfaces: list[Interface]):
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.polls += 1
+        self.timestamps[self.head] = timestamp
+        capacity, head = self.capacity, self.head
+
+        slots = [self._slot(interface.name) for interface in interfaces]
+        current = (
+            [interface.rx_byte for interface in interfaces],
+            [interface.tx_byte for interface in interfaces],
+            [interface.rx_packet for interface in interfaces],
+            [interface.tx_packet for interface in interfaces],
+        )
+        elapsed = [timestamp - self.seen[slot] for slot in slots]
+        deltas = [
+            list(map(counter_delta, map(counter.__getitem__, slots), values))
+            for counter, values in zip(self.counters, current, strict=True)
+        ]
+
+        # The whole column starts as a gap, so interfaces missing from this
+        # sample get no stale rate; sampled ones are then filled in.
+        column = array("d", [NAN]) * len(self.names)
+        for values in self.rates.values():
+            values[head::capacity] = column
+        rx_bps, tx_bps = self.rates["rx_bps"], self.rates["tx_bps"]
+        rx_pps, tx_pps = self.rates["rx_pps"], self.rates["tx_pps"]
+        for slot, seconds, rx_b, tx_b, rx_p, tx_p in zip(
+            slots, elapsed, *deltas, strict=True
+        ):
+            # A reset of any counter, or no earlier sample, leaves a gap.
+            if seconds > 0 and None not in (rx_b, tx_b, rx_p, tx_p):
+                index = slot * capacity + head
+                rx_bps[index] = rx_b * 8 / seconds
+                tx_bps[index] = tx_b * 8 / seconds
+                rx_pps[index] = rx_p / seconds
+                tx_pps[index] = tx_p / seconds
+
+        for counter, values in zip(self.counters, current, strict=True):
+            for slot, value in zip(slots, values, strict=True):
+                counter[slot] = value
+        for slot in slots:
+            self.seen[slot] = timestamp
+            self.last_poll[slot] = self.polls
+        if len(slots) < len(self.slots):
+            self._reclaim()
+
+    def _reclaim(self):
+        """Free the slots of interfaces missing for a whole ring."""
+        oldest = self.polls - self.capacity
+        for name, slot in list(self.slots.items()):
+            if self.last_poll[slot] <= oldest:
+                del self.slots[name]
+                self.names[slot] = ""
+                self.free.append(slot)
+
+    def positions(self) -> Iterator[int]:
+        """Ring positions from the oldest sample to the newest."""
+        start = self.head - self.count + 1
+        return ((start + i) % self.capacity for i in range(self.count))
+
+    def rate_at(self, slot: int, position: int) -> tuple[float, float, float, float]:
+        index = slot * self.capacity + position
+        return (
+            self.rates["rx_bps"][index],
+            self.rates["tx_bps"][index],
+            self.rates["rx_pps"][index],
+            self.rates["tx_pps"][index],
+        )
+
+
+class TrafficRateEngine:
+    """In-memory per-interface bps/pps rates for the whole fleet.
+
+    Rates are computed once per sample as counters arrive, so queries only
+    read the ring buffers: a series is a slice of one slot and the fleet
+    top-N is a single pass over every router's newest position.
+    """
+
+    def __init__(self, capacity: int = 120):
+        self.capacity = capacity
+        self._routers: dict[str, RouterTraffic] = {}
+
+    def configure(self, capacity: int):
+        if capacity != self.capacity:
+            self.capacity = capacity
+            self._routers.clear()
+
+    def ingest(
+        self, router: str, timestamp: datetime | float, interfaces: list[Interface]
+    ):
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        traffic = self._routers.get(router)
+        if traffic is None:
+            traffic = self._routers[router] = RouterTraffic(self.capacity)
+        elif timestamp <= traffic.latest:
+            # Already seen, e.g. the same published sample read twice.
+            return
+        traffic.ingest(timestamp, interfaces)
+
+    def retain(self, routers: set[str]):
+        """Forget routers that are no longer polled."""
+        for router in set(self._routers) - routers:
+            del self._routers[router]
+
+    def series(self, router: str, interface: str) -> list[InterfaceRate]:
+        """Rates of one interface, oldest first, skipping gaps."""
+        traffic = self._routers.get(router)
+        slot = traffic.slots.get(interface) if traffic else None
+        if traffic is None or slot is None:
+            return []
+        result = []
+        for position in traffic.positions():
+            rates = traffic.rate_at(slot, position)
+            if not math.isnan(rates[0]):
+                result.append(
+                    self._rate(router, interface, traffic.timestamps[position], rates)
+                )
+        return result
+
+    def top(
+        self,
+        n: int = 10,
+        metric: str = "total_bps",
+        router: str | None = None,
+        max_age: float | None = None,
+    ) -> list[InterfaceRate]:
+        """The ``n`` busiest interfaces by their latest rate."""
+        if metric not in RATE_METRICS:
+            raise ValueError(f"Unknown metric {metric}")
+        now = time.time()
+        candidates = []
+        for name, traffic in self._routers.items():
+            if router is not None and name != router:
+                continue
+            if traffic.count == 0:
+                continue
+            head = traffic.head
+            timestamp = traffic.timestamps[head]
+            if max_age is not None and now - timestamp > max_age:
+                continue
+            capacity = traffic.capacity
+            if metric == "total_bps":
+                rx = traffic.rates["rx_bps"][head::capacity]
+                tx = traffic.rates["tx_bps"][head::capacity]
+                values = list(map(operator.add, rx, tx))
+            else:
+                values = traffic.rates[metric][head::capacity].tolist()
+            candidates.append((name, traffic, timestamp, values))
+
+        best = heapq.nlargest(
+            n,
+            (
+                (value, index, slot)
+                for index, (_, _, _, values) in enumerate(candidates)
+                for slot, value in enumerate(values)
+                if value == value  # drops NaN
+            ),
+        )
+        result = []
+        for _, index, slot in best:
+            name, traffic, timestamp, _ = candidates[index]
+            result.append(
+                self._rate(
+                    name,
+                    traffic.names[slot],
+                    timestamp,
+                    traffic.rate_at(slot, traffic.head),
+                )
+            )
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {router: len(t.slots) for router, t in self._routers.items()}
+
+    @staticmethod
+    def _rate(
+        router: str,
+        interface: str,
+        timestamp: float,
+        rates: tuple[float, float, float, float],
+    ) -> InterfaceRate:
+        return InterfaceRate(
+            router=router,
+            interface=interface,
+            timestamp=datetime.fromtimestamp(timestamp, tz=timezone.utc),
+            rx_bps=rates[0],
+            tx_bps=rates[1],
+            rx_pps=rates[2],
+            tx_pps=rates[3],
+        )
+
+
+class InterfaceTrafficCollector:
+    """Background task that samples interface counters across the fleet.
+
+    Each router is polled concurrently, bounded by ``max_concurrency``,
+    and its counters are fed to the engine as soon as it answers. Every
+    sample is also handed to ``publish`` when given, so other workers can
+    follow along through :class:`PublishedTrafficFeed`.
+    """
+
+    def __init__(
+        self,
+        engine: TrafficRateEngine,
+        repo_factory: Callable[[ConnectionConfig], InterfaceRepository],
+        routers: Callable[[], dict[str, ConnectionConfig]],
+        interval: float = 10.0,
+        max_concurrency: int = 32,
+        deadline: float = 10.0,
+        publish: Callable[[str, float, list[Interface]], None] | None = None,
+    ):
+        self._engine = engine
+        self._repo_factory = repo_factory
+        self._routers = routers
+        self._interval = interval
+        self._max_concurrency = max_concurrency
+        self._deadline = deadline
+        self._publish = publish
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def collect_once(self) -> int:
+        """Sample every router once; returns how many routers answered."""
+        routers = self._routers()
+        self._engine.retain(set(routers))
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results = await asyncio.gather(
+            *(self._sample(name, config, semaphore) for name, config in routers.items())
+        )
+        return sum(results)
+
+    async def _sample(
+        self, name: str, config: ConnectionConfig, semaphore: asyncio.Semaphore
+    ) -> bool:
+        async with semaphore:
+            try:
+                interfaces = await asyncio.wait_for(
+                    self._repo_factory(config).get_interfaces(), self._deadline
+                )
+            except Exception as e:
+                logger.warning("Interface sampling of {} failed: {}", name, e)
+                return False
+            # Stamp on arrival: the rate divides by the time between answers.
+            timestamp = time.time()
+            self._engine.ingest(name, timestamp, interfaces)
+            if self._publish is not None:
+                self._publish(name, timestamp, interfaces)
+            return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                answered = await self.collect_once()
+                logger.debug("Sampled interface counters of {} routers", answered)
+            except Exception as e:
+                logger.warning("Interface traffic collection failed: {}", e)
+            await asyncio.sleep(max(0.0, self._interval - (loop.time() - started)))
+
+
+class PublishedTrafficFeed:
+    """Feeds the engine from samples another worker's collector published.
+
+    ``latest`` returns the newest ``(sampled at, interfaces)`` of a router;
+    the engine drops samples it has already seen, so polling it faster than
+    the collector publishes is harmless.
+    """
+
+    def __init__(
+        self,
+        engine: TrafficRateEngine,
+        latest: Callable[[str], tuple[float, list[Interface]] | None],
+        routers: Callable[[], dict[str, ConnectionConfig]],
+        interval: float = 10.0,
+    ):
+        self._engine = engine
+        self._latest = latest
+        self._routers = routers
+        self._interval = interval
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def follow_once(self):
+        routers = self._routers()
+        self._engine.retain(set(routers))
+        for name in routers:
+            sample = self._latest(name)
+            if sample is not None:
+                self._engine.ingest(name, *sample)
+
+    async def _run(self):
+        while True:
+            try:
+                self.follow_once()
+            except Exception as e:
+                logger.warning("Following published interface traffic failed: {}", e)
+            # Pick samples up well within one collector interval.
+            await asyncio.sleep(self._interval / 4)
+
+
+traffic_engine = TrafficRateEngine()
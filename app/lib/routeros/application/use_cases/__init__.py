@@ -1,6 +1,11 @@
-from dataclasses import dataclass
+import asyncio
+import time
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
 from datetime import datetime
 
+from app.core.admission import AdmissionRejected
+from app.lib.routeros.application.health import HealthRuleEngine, health_engine
 from app.lib.routeros.domain.entities import SystemResource
 from app.lib.routeros.domain.repositories import (
     SystemResourceRepository,
@@ -15,7 +20,20 @@ class SystemResourceResponse:
     success: bool
     data: SystemResource | None = None
     error_message: str | None = None
-    timestamp: datetime = datetime.now()
+    warnings: list[str] = field(default_factory=list)
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class FleetSystemResourceResult:
+    """Outcome of fetching system resources from one router of the fleet."""
+
+    router: str
+    host: str
+    status: str  # "ok", "error" or "timeout"
+    elapsed_ms: float
+    data: SystemResource | None = None
+    error_message: str | None = None
 
 
 class GetSystemResourceUseCase:
@@ -35,15 +53,8 @@ class GetSystemResourceUseCase:
             SystemResourceResponse with system resource data or error
         """
         try:
-            # Check connection first
-            is_connected = await self._system_resource_repo.check_connection()
-            if not is_connected:
-                return SystemResourceResponse(
-                    success=False,
-                    error_message=f"Unable to connect to router at {request.host}",
-                )
-
-            # Get system resource data
+            # No separate connection check: an unreachable router fails the
+            # fetch itself, and an open circuit fails it without waiting.
             system_resource = await self._system_resource_repo.get_system_resource()
             if not system_resource:
                 return SystemResourceResponse(
@@ -52,6 +63,14 @@ class GetSystemResourceUseCase:
                 )
             return SystemResourceResponse(success=True, data=system_resource)
 
+        except AdmissionRejected:
+            # Shed before reaching the router; the caller answers 503.
+            raise
+        except (ConnectionError, TimeoutError) as e:
+            return SystemResourceResponse(
+                success=False,
+                error_message=f"Unable to connect to router at {request.host}: {e}",
+            )
         except Exception as e:
             return SystemResourceResponse(
                 success=False, error_message=f"An error occurred: {str(e)}"
@@ -59,10 +78,19 @@ class GetSystemResourceUseCase:
 
 
 class MonitorSystemHealthUseCase:
-    """Use case for monitoring system health and detecting critical conditions."""
+    """Use case for checking one snapshot against the health rules.
 
-    def __init__(self, system_resource_repo: SystemResourceRepository):
+    Only threshold rules apply to a single snapshot; sustained and rate
+    conditions are tracked by the engine as the collector feeds it.
+    """
+
+    def __init__(
+        self,
+        system_resource_repo: SystemResourceRepository,
+        engine: HealthRuleEngine = health_engine,
+    ):
         self._system_resource_repo = system_resource_repo
+        self._engine = engine
 
     async def execute(self, request: ConnectionConfig) -> SystemResourceResponse:
         """
@@ -75,14 +103,6 @@ class MonitorSystemHealthUseCase:
             SystemResourceResponse with health analysis
         """
         try:
-            # Check connection first
-            is_connected = await self._system_resource_repo.check_connection()
-            if not is_connected:
-                return SystemResourceResponse(
-                    success=False,
-                    error_message=f"Unable to connect to router at {request.host}",
-                )
-
             system_resource = await self._system_resource_repo.get_system_resource()
             if not system_resource:
                 return SystemResourceResponse(
@@ -90,25 +110,102 @@ class MonitorSystemHealthUseCase:
                     error_message="Failed to retrieve system resource data for health monitoring",
                 )
 
-            # Add health warnings to the response
-            warnings = []
-            if system_resource.is_memory_critical:
-                warnings.append(
-                    f"Critical memory usage: {system_resource.memory_usage_percentage:.1f}%"
-                )
-
-            if system_resource.is_cpu_critical:
-                warnings.append(f"Critical CPU usage: {system_resource.cpu_load}%")
-
-            error_message = "; ".join(warnings) if warnings else None
-
             return SystemResourceResponse(
                 success=True,
                 data=system_resource,
-                error_message=error_message,  # Using error_message for warnings
+                warnings=self._engine.check(system_resource),
             )
 
+        except AdmissionRejected:
+            # Shed before reaching the router; the caller answers 503.
+            raise
+        except (ConnectionError, TimeoutError) as e:
+            return SystemResourceResponse(
+                success=False,
+                error_message=f"Unable to connect to router at {request.host}: {e}",
+            )
         except Exception as e:
             return SystemResourceResponse(
                 success=False, error_message=f"Health monitoring failed: {str(e)}"
             )
+
+
+class FleetSystemResourceUseCase:
+    """Use case for fanning ``GetSystemResourceUseCase`` out across many routers."""
+
+    def __init__(
+        self,
+        repo_factory: Callable[[ConnectionConfig], SystemResourceRepository],
+        max_concurrency: int = 32,
+        deadline: float = 10.0,
+    ):
+        self._repo_factory = repo_factory
+        self._max_concurrency = max_concurrency
+        self._deadline = deadline
+
+    async def execute(
+        self, routers: dict[str, ConnectionConfig]
+    ) -> AsyncIterator[FleetSystemResourceResult]:
+        """
+        Query every router concurrently and yield results as they complete.
+
+        At most ``max_concurrency`` routers are queried at once and each one
+        gets ``deadline`` seconds, so a dead router only delays its own
+        result. Closing the iterator early cancels the remaining queries.
+
+        Args:
+            routers: Mapping of router name to connection details
+
+        Yields:
+            FleetSystemResourceResult for each router, in completion order
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        tasks = [
+            asyncio.create_task(self._query(name, config, semaphore))
+            for name, config in routers.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def query(
+        self, name: str, config: ConnectionConfig
+    ) -> FleetSystemResourceResult:
+        """Query one router within the deadline, outside the concurrency limit."""
+        started = time.perf_counter()
+        use_case = GetSystemResourceUseCase(self._repo_factory(config))
+        try:
+            response = await asyncio.wait_for(use_case.execute(config), self._deadline)
+        except asyncio.TimeoutError:
+            return FleetSystemResourceResult(
+                router=name,
+                host=config.host,
+                status="timeout",
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+                error_message=f"No answer within {self._deadline}s",
+            )
+        except AdmissionRejected as e:
+            return FleetSystemResourceResult(
+                router=name,
+                host=config.host,
+                status="error",
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+                error_message=str(e),
+            )
+        return FleetSystemResourceResult(
+            router=name,
+            host=config.host,
+            status="ok" if response.success else "error",
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            data=response.data,
+            error_message=response.error_message,
+        )
+
+    async def _query(
+        self, name: str, config: ConnectionConfig, semaphore: asyncio.Semaphore
+    ) -> FleetSystemResourceResult:
+        async with semaphore:
+            return await self.query(name, config)
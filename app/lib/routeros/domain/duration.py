@@ -0,0 +1,21 @@
+import re
+
+_DURATION_UNITS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1, "ms": 0.001}
+_DURATION_PART = re.compile(r"(\d+)(ms|w|d|h|m|s)")
+_CLOCK = re.compile(r"(\d+):(\d{2}):(\d{2})$")
+
+
+def parse_duration(value: str) -> int:
+    """Parse RouterOS durations like '1w2d03:04:05' or '3h4m5s' to seconds."""
+    if not value:
+        return 0
+    value = value.strip()
+    seconds = 0.0
+    clock = _CLOCK.search(value)
+    if clock:
+        hours, minutes, secs = (int(part) for part in clock.groups())
+        seconds += hours * 3600 + minutes * 60 + secs
+        value = value[: clock.start()]
+    for amount, unit in _DURATION_PART.findall(value):
+        seconds += int(amount) * _DURATION_UNITS[unit]
+    return int(seconds)
@@ -1,4 +1,35 @@
+from .batch import BatchCommand, BatchCommandResult, BatchResult
+from .config_snapshot import ConfigDiff, ConfigSectionDiff, ConfigSnapshot
+from .health import Alert, AlertTransition, HealthRule
+from .interface import Interface
+from .interface_rate import InterfaceRate
+from .metric_series import (
+    ROLLUP_METRICS,
+    ROLLUP_RESOLUTIONS,
+    MetricPoint,
+    MetricSeries,
+)
 from .router_info import RouterInfo
 from .system_resource import SystemResource
+from .system_resource_sample import SystemResourceSample
 
-__all__ = ["SystemResource", "RouterInfo"]
+__all__ = [
+    "SystemResource",
+    "RouterInfo",
+    "SystemResourceSample",
+    "Interface",
+    "InterfaceRate",
+    "BatchCommand",
+    "BatchCommandResult",
+    "BatchResult",
+    "HealthRule",
+    "Alert",
+    "AlertTransition",
+    "MetricPoint",
+    "MetricSeries",
+    "ROLLUP_METRICS",
+    "ROLLUP_RESOLUTIONS",
+    "ConfigSnapshot",
+    "ConfigSectionDiff",
+    "ConfigDiff",
+]
@@ -0,0 +1,31 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class BatchCommand(BaseModel):
+    """One print of a batch: a menu path plus optional filters and projection."""
+
+    path: str = Field(pattern=r"^(/[A-Za-z0-9-]+)+$", examples=["/interface"])
+    queries: list[str] = Field(default_factory=list)
+    fields: list[str] | None = None
+    limit: int = Field(default=1000, ge=1, le=10_000)
+
+
+class BatchCommandResult(BaseModel):
+    """Outcome of one command of a batch."""
+
+    path: str
+    status: Literal["ok", "error", "timeout"]
+    elapsed_ms: float
+    rows: list[dict[str, str]] = Field(default_factory=list)
+    truncated: bool = False
+    error_message: str | None = None
+
+
+class BatchResult(BaseModel):
+    """Combined outcome of a batch run over one router session."""
+
+    router: str
+    elapsed_ms: float
+    results: list[BatchCommandResult]
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ConfigSnapshot(BaseModel):
+    """Domain entity recording one distinct configuration of a router.
+
+    ``sections`` maps each section's name to the content hash of its text,
+    and ``hash`` covers the whole mapping, so two snapshots hold the same
+    configuration exactly when their hashes are equal. ``changed`` names
+    the sections that differ from the router's previous snapshot.
+    """
+
+    id: int | None = None
+    router: str
+    timestamp: datetime
+    hash: str
+    sections: dict[str, str]
+    changed: list[str] = Field(default_factory=list)
+    content: dict[str, str] | None = None
+
+
+class ConfigSectionDiff(BaseModel):
+    """Unified diff of one section between two snapshots."""
+
+    section: str
+    status: Literal["added", "removed", "changed"]
+    lines: list[str]
+
+
+class ConfigDiff(BaseModel):
+    """Sections that differ between two snapshots; unchanged ones are left out."""
+
+    source: ConfigSnapshot
+    target: ConfigSnapshot
+    sections: list[ConfigSectionDiff]
@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, model_validator
+
+Severity = Literal["info", "warning", "critical"]
+
+
+class HealthRule(BaseModel):
+    """Domain entity describing one condition to alert on.
+
+    ``threshold`` rules compare the metric itself, ``rate`` rules its
+    increase per ``per`` seconds between consecutive samples. The alert
+    fires once the condition has held for ``for_seconds`` and resolves
+    when the value crosses back past ``clear``, which defaults to the
+    threshold; a gap between the two is the hysteresis band.
+    """
+
+    name: str
+    metric: str
+    kind: Literal["threshold", "rate"] = "threshold"
+    op: Literal[">", "<"] = ">"
+    threshold: float
+    clear: float | None = None
+    for_seconds: float = 0.0
+    per: float = 1.0
+    severity: Severity = "warning"
+
+    @model_validator(mode="after")
+    def _check_clear(self) -> "HealthRule":
+        if self.clear is None:
+            self.clear = self.threshold
+        elif (self.op == ">" and self.clear > self.threshold) or (
+            self.op == "<" and self.clear < self.threshold
+        ):
+            raise ValueError(f"clear of rule {self.name} is past its threshold")
+        return self
+
+    def breached(self, value: float) -> bool:
+        return value > self.threshold if self.op == ">" else value < self.threshold
+
+    def cleared(self, value: float) -> bool:
+        assert self.clear is not None
+        return value <= self.clear if self.op == ">" else value >= self.clear
+
+
+class Alert(BaseModel):
+    """Domain entity representing a rule currently firing for a router."""
+
+    router: str
+    rule: str
+    severity: Severity
+    metric: str
+    value: float
+    threshold: float
+    message: str
+    since: datetime
+    updated_at: datetime
+
+
+class AlertTransition(BaseModel):
+    """Domain entity recording an alert starting or stopping to fire."""
+
+    router: str
+    rule: str
+    severity: Severity
+    state: Literal["firing", "resolved"]
+    value: float
+    message: str
+    timestamp: datetime
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class Interface(BaseModel):
+    """Domain entity representing one row of the interface table."""
+
+    id: str
+    name: str
+    type: str
+    mtu: int = 0
+    mac_address: str = ""
+    running: bool = False
+    disabled: bool = False
+    rx_byte: int = 0
+    tx_byte: int = 0
+    rx_packet: int = 0
+    tx_packet: int = 0
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class InterfaceRate(BaseModel):
+    """Domain entity representing interface throughput over one interval."""
+
+    router: str
+    interface: str
+    timestamp: datetime
+    rx_bps: float
+    tx_bps: float
+    rx_pps: float
+    tx_pps: float
+
+    @property
+    def total_bps(self) -> float:
+        return self.rx_bps + self.tx_bps
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+# SystemResourceSample attributes kept in rollups, and the rollup bucket
+# sizes in seconds.
+ROLLUP_METRICS = (
+    "cpu_load",
+    "memory_usage_percentage",
+    "hdd_usage_percentage",
+    "free_memory",
+    "free_hdd_space",
+)
+ROLLUP_RESOLUTIONS = (60, 3600, 86400)
+
+
+class MetricPoint(BaseModel):
+    """Domain entity summarising one metric over one time bucket.
+
+    A raw sample is a bucket of one, with every statistic equal to it.
+    """
+
+    timestamp: datetime
+    min: float
+    max: float
+    avg: float
+    last: float
+    count: int
+
+
+class MetricSeries(BaseModel):
+    """Domain entity holding a metric's history for one router or the fleet.
+
+    ``resolution`` is the rollup bucket size in seconds the points were
+    read at, None for raw samples, and ``downsample`` how they were then
+    reduced to fit the requested number of points, if they were.
+    """
+
+    router: str | None
+    metric: str
+    resolution: int | None
+    downsample: str | None = None
+    points: list[MetricPoint]
@@ -2,13 +2,31 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from .system_resource import SystemResource
+
 
 class RouterInfo(BaseModel):
     """Domain entity representing router information."""
 
+    name: str
     host: str
     board_name: str
     platform: str
     version: str
     uptime: str
     last_updated: datetime | None = None
+
+    @classmethod
+    def from_resource(
+        cls, name: str, host: str, timestamp: datetime, resource: SystemResource
+    ) -> "RouterInfo":
+        """Build router information from a live SystemResource snapshot."""
+        return cls(
+            name=name,
+            host=host,
+            board_name=resource.board_name,
+            platform=resource.platform,
+            version=resource.version,
+            uptime=resource.uptime,
+            last_updated=timestamp,
+        )
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from app.lib.routeros.domain.duration import parse_duration
+
 
 class SystemResource(BaseModel):
     """Core domain entity representing system resource information."""
@@ -23,6 +25,11 @@ class SystemResource(BaseModel):
     board_name: str
     platform: str
 
+    @property
+    def uptime_seconds(self) -> int:
+        """Uptime converted from RouterOS duration format to seconds."""
+        return parse_duration(self.uptime)
+
     @property
     def memory_usage_percentage(self) -> float:
         """Calculate memory usage percentage."""
@@ -38,13 +45,3 @@ class SystemResource(BaseModel):
         return (
             (self.total_hdd_space - self.free_hdd_space) / self.total_hdd_space
         ) * 100
-
-    @property
-    def is_memory_critical(self) -> bool:
-        """Check if memory usage is critical (>90%)."""
-        return self.memory_usage_percentage > 90
-
-    @property
-    def is_cpu_critical(self) -> bool:
-        """Check if CPU usage is critical (>90%)."""
-        return self.cpu_load > 90
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from .system_resource import SystemResource
+
+
+class SystemResourceSample(BaseModel):
+    """Domain entity representing one recorded system resource snapshot."""
+
+    router: str
+    timestamp: datetime
+    cpu_load: int
+    free_memory: int
+    total_memory: int
+    free_hdd_space: int
+    total_hdd_space: int
+    write_sector_total: int
+    write_sector_since_reboot: int
+    bad_blocks: int
+    uptime_seconds: int
+
+    @classmethod
+    def from_resource(
+        cls, router: str, timestamp: datetime, resource: SystemResource
+    ) -> "SystemResourceSample":
+        """Build a sample from a live SystemResource snapshot."""
+        return cls(
+            router=router,
+            timestamp=timestamp,
+            cpu_load=resource.cpu_load,
+            free_memory=resource.free_memory,
+            total_memory=resource.total_memory,
+            free_hdd_space=resource.free_hdd_space,
+            total_hdd_space=resource.total_hdd_space,
+            write_sector_total=resource.write_sector_total,
+            write_sector_since_reboot=resource.write_sector_since_reboot,
+            bad_blocks=resource.bad_blocks,
+            uptime_seconds=resource.uptime_seconds,
+        )
+
+    @property
+    def memory_usage_percentage(self) -> float:
+        if self.total_memory == 0:
+            return 0.0
+        return ((self.total_memory - self.free_memory) / self.total_memory) * 100
+
+    @property
+    def hdd_usage_percentage(self) -> float:
+        if self.total_hdd_space == 0:
+            return 0.0
+        return (
+            (self.total_hdd_space - self.free_hdd_space) / self.total_hdd_space
+        ) * 100
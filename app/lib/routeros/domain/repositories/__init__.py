@@ -1,6 +1,18 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
 
-from app.lib.routeros.domain.entities import RouterInfo, SystemResource
+from app.lib.routeros.domain.entities import (
+    BatchCommand,
+    BatchCommandResult,
+    ConfigSnapshot,
+    Interface,
+    MetricPoint,
+    RouterInfo,
+    SystemResource,
+    SystemResourceSample,
+)
 
 
 class SystemResourceRepository(ABC):
@@ -13,19 +25,187 @@ class SystemResourceRepository(ABC):
 
     @abstractmethod
     async def check_connection(self) -> bool:
-        """Check if connection to router is available."""
+        """Check if connection to router is available.
+
+        Meant for diagnostics; reads do not need to call it first.
+        """
         pass
 
+    async def watch_system_resource(
+        self, interval: float
+    ) -> AsyncIterator[SystemResource]:
+        """Yield system resource snapshots roughly every ``interval`` seconds.
+
+        The default polls ``get_system_resource``; implementations can
+        override it with a push subscription.
+        """
+        while True:
+            system_resource = await self.get_system_resource()
+            if system_resource is not None:
+                yield system_resource
+            await asyncio.sleep(interval)
+
 
 class RouterInfoRepository(ABC):
     """Abstract repository interface for router information operations."""
 
     @abstractmethod
-    async def get_router_info(self) -> RouterInfo | None:
-        """Get router information."""
+    async def get_router_info(self, name: str) -> RouterInfo | None:
+        """Get the last recorded information of a router."""
+        pass
+
+    @abstractmethod
+    async def list_router_info(self) -> list[RouterInfo]:
+        """Get the last recorded information of every router."""
         pass
 
     @abstractmethod
     async def update_router_info(self, router_info: RouterInfo) -> bool:
         """Update router information."""
         pass
+
+    @abstractmethod
+    async def update_many(self, router_infos: list[RouterInfo]) -> None:
+        """Insert or update information of many routers in one transaction."""
+        pass
+
+
+class SystemResourceHistoryRepository(ABC):
+    """Abstract repository interface for recorded system resource history."""
+
+    @abstractmethod
+    async def add_samples(self, samples: list[SystemResourceSample]) -> None:
+        """Store a batch of samples in a single transaction."""
+        pass
+
+    @abstractmethod
+    async def get_samples(
+        self,
+        router: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[SystemResourceSample]:
+        """Get samples for a router, oldest first, within a time range."""
+        pass
+
+    @abstractmethod
+    async def count_samples(
+        self, router: str, start: datetime, end: datetime, limit: int
+    ) -> int:
+        """Count a router's samples in a time range, stopping at ``limit``."""
+        pass
+
+    @abstractmethod
+    async def get_rollups(
+        self,
+        router: str | None,
+        metric: str,
+        resolution: int,
+        start: datetime,
+        end: datetime,
+    ) -> list[MetricPoint]:
+        """Get a metric's rollup buckets, oldest first, within a time range.
+
+        With ``router`` None, each bucket aggregates the whole fleet: the
+        average of the routers' averages and last values, the lowest
+        minimum and the highest maximum.
+        """
+        pass
+
+
+class RouterTableRepository(ABC):
+    """Abstract repository interface for large, row-oriented router tables."""
+
+    @abstractmethod
+    def stream_rows(
+        self,
+        queries: Iterable[str] = (),
+        fields: Iterable[str] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[dict[str, str]]:
+        """Yield rows in router order without buffering the table.
+
+        ``queries`` are RouterOS ``?`` query words and ``fields`` the
+        properties to return. ``after`` resumes after the row with that
+        ``.id``; if that row no longer exists the position is lost, and
+        the stream raises instead of yielding nothing.
+        """
+        pass
+
+
+class BatchRepository(ABC):
+    """Abstract repository interface for running several reads at once."""
+
+    @abstractmethod
+    async def run_batch(
+        self, commands: list[BatchCommand], deadline: float
+    ) -> list[BatchCommandResult]:
+        """Run every command over one router session, results in input order.
+
+        A failed or timed-out command does not stop the others; each gets
+        at most ``deadline`` seconds.
+        """
+        pass
+
+
+class InterfaceRepository(ABC):
+    """Abstract repository interface for a router's interfaces."""
+
+    @abstractmethod
+    async def get_interfaces(self) -> list[Interface]:
+        """Get every interface with its traffic counters."""
+        pass
+
+
+class ConfigSourceRepository(ABC):
+    """Abstract repository interface for reading a router's configuration."""
+
+    @abstractmethod
+    async def get_config_sections(self) -> dict[str, str]:
+        """Get the configuration as text, split into named sections."""
+        pass
+
+
+class ConfigSnapshotRepository(ABC):
+    """Abstract repository interface for content-addressed config snapshots."""
+
+    @abstractmethod
+    async def add_snapshot(
+        self, snapshot: ConfigSnapshot, content: dict[str, str]
+    ) -> ConfigSnapshot:
+        """Store a snapshot and return it with its id.
+
+        ``content`` maps section hashes to their text; text already stored
+        under a hash, by any router, is not stored again.
+        """
+        pass
+
+    @abstractmethod
+    async def get_snapshot(self, snapshot_id: int) -> ConfigSnapshot | None:
+        """Get a snapshot by id, without its content."""
+        pass
+
+    @abstractmethod
+    async def get_latest(
+        self, router: str, before_id: int | None = None
+    ) -> ConfigSnapshot | None:
+        """Get a router's newest snapshot, or its newest before ``before_id``."""
+        pass
+
+    @abstractmethod
+    async def list_snapshots(
+        self,
+        router: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 100,
+    ) -> list[ConfigSnapshot]:
+        """Get snapshots, newest first, of one router or the whole fleet."""
+        pass
+
+    @abstractmethod
+    async def get_content(self, hashes: Iterable[str]) -> dict[str, str]:
+        """Get the text stored under each of ``hashes``."""
+        pass
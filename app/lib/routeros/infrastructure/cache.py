@@ -0,0 +1,244 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from loguru import logger
+from pydantic import TypeAdapter
+
+from app.lib.routeros.domain.entities import (
+    Alert,
+    AlertTransition,
+    Interface,
+    SystemResource,
+)
+from app.lib.routeros.domain.repositories import SystemResourceRepository
+from app.lib.routeros.infrastructure.mikrotik.constant import MikrotikResourceUri
+from app.lib.routeros.infrastructure.shared import SharedSnapshotStore
+from app.lib.routeros.types import ConnectionConfig
+
+T = TypeVar("T")
+
+CacheKey = tuple[str, str]
+
+# Cache entries holding the health engine's firing alerts and its latest
+# transitions for the whole fleet.
+FLEET = "fleet"
+ACTIVE_ALERTS = "/health/alerts"
+ALERT_TRANSITIONS = "/health/transitions"
+# Newest transitions published; the whole history would not fit a shared slot.
+PUBLISHED_TRANSITIONS = 100
+
+
+def snapshot_key(config: ConnectionConfig) -> str:
+    """Cache key of a router, shared by every worker that reads its snapshots."""
+    return f"{config.host}:{config.port}"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+
+
+@dataclass
+class CacheLookup(Generic[T]):
+    """Value returned by the cache together with how it was obtained."""
+
+    value: T | None
+    status: str  # "HIT", "STALE" or "MISS"
+    age: float = 0.0
+
+
+class SnapshotCache:
+    """TTL cache of router snapshots with single-flight fetching.
+
+    Entries younger than their path's TTL are served as hits. Entries past
+    the TTL but within ``stale_ttl`` are served as stale while one
+    background fetch refreshes them. Concurrent misses for the same router
+    and path share one in-flight fetch instead of each hitting the router.
+
+    With a :class:`SharedSnapshotStore` attached, the publishing worker
+    writes every registered path it stores to the shared store, and the
+    other workers look there before their own entries. Shared values are
+    decoded once per published version. A worker only fetches from the
+    router itself when nothing usable has been published.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 1.0,
+        stale_ttl: float = 5.0,
+        ttl: dict[str, float] | None = None,
+        enabled: bool = True,
+    ):
+        self.configure(default_ttl, stale_ttl, ttl, enabled)
+        self._entries: dict[CacheKey, _Entry] = {}
+        self._in_flight: dict[CacheKey, asyncio.Task[Any]] = {}
+        self._adapters: dict[str, TypeAdapter[Any]] = {}
+        self._store: SharedSnapshotStore | None = None
+        self.publishing = False
+        # Last decoded shared value per key: (version, value, stored_at).
+        self._shared: dict[CacheKey, tuple[int, Any, float]] = {}
+
+    def configure(
+        self,
+        default_ttl: float = 1.0,
+        stale_ttl: float = 5.0,
+        ttl: dict[str, float] | None = None,
+        enabled: bool = True,
+    ):
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttl = dict(ttl or {})
+        self.enabled = enabled
+
+    def ttl_for(self, path: str) -> float:
+        return self.ttl.get(path, self.default_ttl)
+
+    def register(self, path: str, adapter: TypeAdapter[Any]):
+        """Allow values of ``path`` to go through the shared store."""
+        self._adapters[path] = adapter
+
+    def attach(self, store: SharedSnapshotStore | None, publishing: bool = False):
+        self._store = store
+        self.publishing = publishing
+        self._shared.clear()
+
+    def peek(self, router: str, path: str) -> CacheLookup[Any]:
+        """Look up an entry without fetching; status is MISS if unusable."""
+        if self._store is not None and not self.publishing and path in self._adapters:
+            lookup = self._peek_shared(router, path)
+            if lookup.status != "MISS":
+                return lookup
+        entry = self._entries.get((router, path))
+        if entry is None:
+            return CacheLookup(value=None, status="MISS")
+        return self._lookup(path, entry.value, time.monotonic() - entry.stored_at)
+
+    async def get_or_fetch(
+        self, router: str, path: str, fetch: Callable[[], Awaitable[T | None]]
+    ) -> CacheLookup[T]:
+        """Serve from cache, revalidating or fetching through ``fetch``."""
+        if not self.enabled:
+            return CacheLookup(value=await fetch(), status="MISS")
+
+        lookup = self.peek(router, path)
+        if lookup.status == "STALE":
+            self._start_fetch(router, path, fetch)
+        if lookup.status != "MISS":
+            return lookup
+
+        # shield() keeps one cancelled waiter from cancelling the shared fetch.
+        value = await asyncio.shield(self._start_fetch(router, path, fetch))
+        return CacheLookup(value=value, status="MISS")
+
+    def put(self, router: str, path: str, value: Any):
+        self._entries[(router, path)] = _Entry(value, time.monotonic())
+        adapter = self._adapters.get(path)
+        if self._store is not None and self.publishing and adapter is not None:
+            self._store.publish(f"{router} {path}", adapter.dump_json(value))
+
+    def invalidate(self, router: str, path: str | None = None):
+        for key in list(self._entries):
+            if key[0] == router and (path is None or key[1] == path):
+                del self._entries[key]
+
+    def _lookup(self, path: str, value: Any, age: float) -> CacheLookup[Any]:
+        if age < self.ttl_for(path):
+            return CacheLookup(value=value, status="HIT", age=age)
+        if age < self.ttl_for(path) + self.stale_ttl:
+            return CacheLookup(value=value, status="STALE", age=age)
+        return CacheLookup(value=None, status="MISS", age=age)
+
+    def _peek_shared(self, router: str, path: str) -> CacheLookup[Any]:
+        assert self._store is not None
+        key = (router, path)
+        name = f"{router} {path}"
+        cached = self._shared.get(key)
+        if cached is None or cached[0] != self._store.version(name):
+            snapshot = self._store.read(name)
+            if snapshot is None:
+                return CacheLookup(value=None, status="MISS")
+            value = self._adapters[path].validate_json(snapshot.payload)
+            cached = self._shared[key] = (snapshot.version, value, snapshot.stored_at)
+        _, value, stored_at = cached
+        return self._lookup(path, value, max(0.0, time.time() - stored_at))
+
+    def _start_fetch(
+        self, router: str, path: str, fetch: Callable[[], Awaitable[T | None]]
+    ) -> "asyncio.Task[T | None]":
+        key = (router, path)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch))
+            # Background revalidations have no awaiter; mark errors retrieved.
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._in_flight[key] = task
+        return task
+
+    async def _fetch(
+        self, key: CacheKey, fetch: Callable[[], Awaitable[T | None]]
+    ) -> T | None:
+        try:
+            value = await fetch()
+            if value is not None:
+                self.put(*key, value)
+            return value
+        except Exception as e:
+            logger.warning("Snapshot fetch for {} {} failed: {}", *key, e)
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+
+class CachedSystemResourceRepository(SystemResourceRepository):
+    """SystemResourceRepository decorator that serves reads from a SnapshotCache.
+
+    The status and age of the last lookup are kept on the instance so the
+    route can report them; repositories are created per request.
+    """
+
+    def __init__(
+        self, inner: SystemResourceRepository, router: str, cache: SnapshotCache
+    ):
+        self._inner = inner
+        self._router = router
+        self._cache = cache
+        self.cache_status: str | None = None
+        self.cache_age: float = 0.0
+
+    async def get_system_resource(self) -> SystemResource | None:
+        lookup = await self._cache.get_or_fetch(
+            self._router,
+            MikrotikResourceUri.SYSTEM_RESOURCE,
+            self._inner.get_system_resource,
+        )
+        self.cache_status, self.cache_age = lookup.status, lookup.age
+        return lookup.value
+
+    async def check_connection(self) -> bool:
+        # A usable snapshot means the read will not touch the router at all.
+        if (
+            self._cache.enabled
+            and self._cache.peek(
+                self._router, MikrotikResourceUri.SYSTEM_RESOURCE
+            ).status
+            != "MISS"
+        ):
+            return True
+        return await self._inner.check_connection()
+
+
+snapshot_cache = SnapshotCache()
+snapshot_cache.register(
+    MikrotikResourceUri.SYSTEM_RESOURCE, TypeAdapter(SystemResource)
+)
+# Published by the traffic collector as (sampled at, interfaces).
+snapshot_cache.register(
+    MikrotikResourceUri.INTERFACE, TypeAdapter(tuple[float, list[Interface]])
+)
+# Published by the health engine after every collector cycle.
+snapshot_cache.register(ACTIVE_ALERTS, TypeAdapter(list[Alert]))
+snapshot_cache.register(ALERT_TRANSITIONS, TypeAdapter(list[AlertTransition]))
@@ -1,48 +1,253 @@
-from routeros_api import RouterOsApiPool  # pyright: ignore
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import AbstractAsyncContextManager
 
+from app.core.admission import admission
+from app.lib.routeros.infrastructure.mikrotik.breaker import (
+    CLOSED,
+    CircuitBreaker,
+    circuit_breakers,
+)
+from app.lib.routeros.infrastructure.mikrotik.client import AsyncRouterOsClient
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsError,
+    RouterOsLoginError,
+    RouterOsPoolExhaustedError,
+)
+from app.lib.routeros.infrastructure.mikrotik.pool import (
+    CONNECTION_ERRORS,
+    PooledConnection,
+    RouterConnectionPool,
+    connection_pool,
+)
 from app.lib.routeros.types.connection_config import ConnectionConfig
 
+# Outcomes that count against a router's circuit breaker: it did not answer,
+# or would not let us in. Traps are answers and count as successes.
+BREAKER_FAILURES: tuple[type[BaseException], ...] = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    RouterOsLoginError,
+)
+
+
+class MikroTikResource:
+    """A RouterOS menu path bound to one API session."""
+
+    def __init__(self, client: AsyncRouterOsClient, path: str, timeout: float):
+        self.client = client
+        self.path = path
+        self.timeout = timeout
+
+    async def get(self, **kwargs: str) -> list[dict[str, str]]:
+        """Print the menu, filtering on ``key=value`` pairs."""
+        return await self.client.execute(
+            f"{self.path}/print",
+            queries=[
+                f"?{key.replace('_', '-')}={value}" for key, value in kwargs.items()
+            ],
+            timeout=self.timeout,
+        )
+
+    def stream(
+        self,
+        queries: Iterable[str] = (),
+        proplist: Iterable[str] | None = None,
+        attributes: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[dict[str, str]]:
+        """Yield printed rows as the router sends them."""
+        return self.client.stream(
+            f"{self.path}/print",
+            attributes=attributes,
+            queries=queries,
+            proplist=proplist,
+            timeout=self.timeout if timeout is None else timeout,
+        )
+
 
 class MikroTikConnectionManager:
-    """Manages connections to MikroTik routers."""
+    """Manages connections to MikroTik routers.
+
+    Sessions are leased from the process-wide ``connection_pool`` on enter
+    and handed back on exit, so an ``async with`` block no longer pays for a
+    TCP connect and login each time.
+
+    Every block holds one of the router's admission slots, so a burst of
+    requests to one router is queued briefly and then shed with
+    :class:`~app.core.admission.AdmissionRejected` instead of opening ever
+    more work against it. Blocks opened with ``stream`` for as long as a
+    client watches take a slot of the router's stream limit instead.
 
-    def __init__(self, config: ConnectionConfig):
+    Every block goes through the router's circuit breaker: entering fails
+    fast while the circuit is open, ``fetch`` uses the breaker's adaptive
+    timeout, and the way the block ends is recorded as a success or a
+    failure. Streams keep the configured timeout, since the first row of a
+    large table can take far longer than a typical print.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        pool: RouterConnectionPool | None = None,
+        breaker: CircuitBreaker | None = None,
+        stream: bool = False,
+    ):
         self.connection_config = config
-        self.connection = None
+        self.stream = stream
+        self.pool = pool or connection_pool
+        self.breaker = breaker or circuit_breakers.get(config)
+        self.connection: PooledConnection | None = None
+        self._broken = False
+        self._slot: AbstractAsyncContextManager[None] | None = None
 
-    def __enter__(self):
-        self.connect()
+    async def __aenter__(self):
+        await self.connect()
         return self
 
-    def __exit__(self, exc_type: type, exc_value: Exception, traceback: object):
-        self.disconnect()
+    async def __aexit__(self, exc_type: type, exc_value: Exception, traceback: object):
+        if isinstance(exc_value, CONNECTION_ERRORS):
+            self._broken = True
+        self._record(exc_value)
+        await self.disconnect()
 
-    def connect(self):
-        """Establish connection to MikroTik router."""
+    async def connect(self):
+        """Lease a session to the MikroTik router from the pool."""
         if not self.connection:
-            self.connection = RouterOsApiPool(
-                host=self.connection_config.host,
-                port=self.connection_config.port,
-                username=self.connection_config.username,
-                password=self.connection_config.password,
-                plaintext_login=True,
-            )
-
-    def get_connection(self):
+            self.breaker.before_call()
+            config = self.connection_config
+            slot = admission.router_slot(f"{config.host}:{config.port}", self.stream)
+            try:
+                await slot.__aenter__()
+            except BaseException:
+                self.breaker.release()
+                raise
+            try:
+                self.connection = await self.pool.acquire(config)
+            except BaseException as e:
+                self._record(e)
+                await slot.__aexit__(None, None, None)
+                raise
+            self._slot = slot
+            self._broken = False
+
+    def get_connection(self) -> PooledConnection:
         """Get the active connection."""
         if not self.connection:
             raise Exception("Not connected to MikroTik router.")
         return self.connection
 
-    def get_resource(self, resource_path: str):
+    def get_resource(
+        self, resource_path: str, timeout: float | None = None
+    ) -> MikroTikResource:
         """Get a specific resource from the router."""
-        if not self.connection:
-            raise Exception("Not connected to MikroTik router.")
-        api = self.connection.get_api()
-        return api.get_resource(resource_path)  # pyright: ignore
+        return MikroTikResource(
+            self.get_connection().client,
+            resource_path,
+            self.connection_config.timeout if timeout is None else timeout,
+        )
+
+    async def fetch(self, resource_path: str, **kwargs: str) -> list[dict[str, str]]:
+        """Run a print on a resource, reconnecting once if the socket broke.
+
+        With hedging enabled, a print still unanswered after the router's
+        p95 latency is raced against the same print on a second session.
+        """
+        delay = self.breaker.hedge_delay() if self.breaker.state == CLOSED else None
+        if delay is not None:
+            return await self._hedged_fetch(delay, resource_path, kwargs)
+        return await self._fetch(resource_path, kwargs)
+
+    async def _fetch(
+        self, resource_path: str, kwargs: dict[str, str]
+    ) -> list[dict[str, str]]:
+        timeout = self.breaker.timeout(self.connection_config.timeout)
+        try:
+            started = time.monotonic()
+            rows = await self.get_resource(resource_path, timeout).get(**kwargs)
+        except CONNECTION_ERRORS:
+            broken, self.connection = self.get_connection(), None
+            self.connection = await self.pool.replace(broken)
+            started = time.monotonic()
+            rows = await self.get_resource(resource_path, timeout).get(**kwargs)
+        # The verdict on the block is recorded once, when it exits.
+        self.breaker.record_latency(time.monotonic() - started)
+        return rows
+
+    async def _hedged_fetch(
+        self, delay: float, resource_path: str, kwargs: dict[str, str]
+    ) -> list[dict[str, str]]:
+        primary = asyncio.create_task(self._fetch(resource_path, kwargs))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            pending.add(asyncio.create_task(self._backup_fetch(resource_path, kwargs)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both attempts failed; report the first one's error.
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _backup_fetch(
+        self, resource_path: str, kwargs: dict[str, str]
+    ) -> list[dict[str, str]]:
+        """The same print on a second pooled session.
+
+        The backup runs within this block's breaker call and admission slot,
+        so it records no outcome of its own: the block records one when it
+        exits, for whichever attempt won.
+        """
+        connection = await self.pool.acquire(self.connection_config)
+        broken = False
+        try:
+            timeout = self.breaker.timeout(self.connection_config.timeout)
+            started = time.monotonic()
+            rows = await MikroTikResource(
+                connection.client, resource_path, timeout
+            ).get(**kwargs)
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            await self.pool.release(connection, discard=broken)
+        self.breaker.record_latency(time.monotonic() - started)
+        return rows
+
+    async def ping(self) -> bool:
+        """Check the leased session is alive."""
+        return await self.get_connection().probe()
+
+    def _record(self, error: BaseException | None):
+        if isinstance(error, RouterOsPoolExhaustedError):
+            # Local contention: the router was never asked.
+            self.breaker.release()
+        elif error is None or (
+            isinstance(error, RouterOsError) and not isinstance(error, BREAKER_FAILURES)
+        ):
+            self.breaker.record_success()
+        elif isinstance(error, BREAKER_FAILURES):
+            self.breaker.record_failure()
+        else:
+            # Cancelled or failed on our side; the router was not at fault.
+            self.breaker.release()
 
-    def disconnect(self):
-        """Disconnect from the router."""
+    async def disconnect(self):
+        """Return the session to the pool, dropping it if it is broken."""
         if self.connection:
-            self.connection.disconnect()
+            await self.pool.release(self.connection, discard=self._broken)
             self.connection = None
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            await slot.__aexit__(None, None, None)
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from contextlib import aclosing
+
+from app.lib.routeros.domain.entities import BatchCommand, BatchCommandResult
+from app.lib.routeros.domain.repositories import BatchRepository
+from app.lib.routeros.infrastructure.mikrotik import (
+    BREAKER_FAILURES,
+    MikroTikConnectionManager,
+)
+from app.lib.routeros.infrastructure.mikrotik.exceptions import RouterOsError
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+
+
+class MikroTikBatchRepository(BatchRepository):
+    """Runs a batch of prints as tagged commands on one pooled session.
+
+    All commands are written to the socket up front and their replies are
+    demultiplexed by ``.tag``, so the batch costs one session lease and
+    roughly the slowest command's round trip instead of the sum of all.
+    """
+
+    def __init__(self, connection_config: MikrotikConnectionConfig):
+        self.connection_config = connection_config
+
+    async def run_batch(
+        self, commands: list[BatchCommand], deadline: float
+    ) -> list[BatchCommandResult]:
+        async with MikroTikConnectionManager(self.connection_config) as connection:
+            results = await asyncio.gather(
+                *(self._run(connection, command, deadline) for command in commands)
+            )
+            failures = [error for _, error in results if error is not None]
+            if failures and len(failures) == len(commands):
+                # Nothing got through: let the breaker and the pool see it.
+                raise failures[0]
+        return [result for result, _ in results]
+
+    async def _run(
+        self,
+        connection: MikroTikConnectionManager,
+        command: BatchCommand,
+        deadline: float,
+    ) -> tuple[BatchCommandResult, BaseException | None]:
+        """Run one command; the error is returned only if the router is at fault."""
+        rows: list[dict[str, str]] = []
+        truncated = False
+        started = time.perf_counter()
+
+        async def collect():
+            nonlocal truncated
+            loop = asyncio.get_running_loop()
+            expires = loop.time() + deadline
+            resource = connection.get_resource(command.path)
+            stream = resource.stream(queries=command.queries, proplist=command.fields)
+            async with aclosing(stream):  # pyright: ignore
+                async for row in stream:
+                    # Buffered rows arrive without suspending, which can hide
+                    # wait_for's cancellation, so check the clock as well.
+                    if loop.time() > expires:
+                        raise TimeoutError
+                    if len(rows) >= command.limit:
+                        # Closing the stream cancels the rest on the router.
+                        truncated = True
+                        return
+                    rows.append(row)
+
+        def result(status: str, error: str | None = None) -> BatchCommandResult:
+            return BatchCommandResult(
+                path=command.path,
+                status=status,  # pyright: ignore
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+                rows=rows if status == "ok" else [],
+                truncated=truncated,
+                error_message=error,
+            )
+
+        try:
+            await asyncio.wait_for(collect(), deadline)
+        except (TimeoutError, asyncio.TimeoutError):
+            message = f"No answer from {command.path} within {deadline}s"
+            return result("timeout", message), TimeoutError(message)
+        except BREAKER_FAILURES as e:
+            return result("error", str(e)), e
+        except RouterOsError as e:
+            # A trap, e.g. an unknown menu: the router itself is fine.
+            return result("error", str(e)), None
+        return result("ok"), None
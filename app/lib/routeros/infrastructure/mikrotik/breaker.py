@@ -0,0 +1,217 @@
+import time
+from collections import deque
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.core.metrics import registry
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsCircuitOpenError,
+)
+from app.lib.routeros.types.connection_config import ConnectionConfig
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class BreakerState(BaseModel):
+    """Snapshot of one router's circuit breaker, as served by the API."""
+
+    router: str
+    state: str
+    consecutive_failures: int
+    retry_after: float
+    timeout: float
+    p50_ms: float | None
+    p99_ms: float | None
+    samples: int
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker and latency tracker for one router.
+
+    ``failure_threshold`` consecutive failures open the circuit, and calls
+    then fail immediately for ``reset_timeout`` seconds. After that a single
+    trial call is let through (half-open): success closes the circuit,
+    failure opens it again for twice as long, up to ``max_reset_timeout``.
+
+    Latencies of successful commands give the adaptive timeout:
+    ``timeout_multiplier`` times the observed p99, kept between
+    ``min_timeout`` and the router's configured timeout. Until
+    ``min_samples`` latencies are known the configured timeout is used.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        max_reset_timeout: float = 300.0,
+        min_timeout: float = 0.5,
+        timeout_multiplier: float = 4.0,
+        min_samples: int = 20,
+        window: int = 200,
+        hedge: bool = False,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.hedge = hedge
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._open_for = reset_timeout
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._sorted: list[float] | None = None
+
+    @property
+    def retry_after(self) -> float:
+        if self.state == CLOSED:
+            return 0.0
+        return max(0.0, self._opened_at + self._open_for - time.monotonic())
+
+    def before_call(self):
+        """Let a call through or raise :class:`RouterOsCircuitOpenError`."""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN and self.retry_after <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        raise RouterOsCircuitOpenError(
+            f"Circuit open for {self.name}, retry in {self.retry_after:.1f}s",
+            self.retry_after,
+        )
+
+    def record_latency(self, latency: float):
+        """Add a successful command's latency to the adaptive timeout window."""
+        self._latencies.append(latency)
+        self._sorted = None
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self._open_for = self.reset_timeout
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._open_for = min(self._open_for * 2, self.max_reset_timeout)
+            self._open()
+        elif (
+            self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def release(self):
+        """Give back a half-open trial that ended without a verdict."""
+        self._trial_in_flight = False
+
+    def reset(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._open_for = self.reset_timeout
+        self._trial_in_flight = False
+
+    def percentile(self, pct: float) -> float | None:
+        if not self._latencies:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._latencies)
+        return _percentile(self._sorted, pct)
+
+    def timeout(self, configured: float) -> float:
+        """Command timeout to use given the router's configured one."""
+        if len(self._latencies) < self.min_samples:
+            return configured
+        p99 = self.percentile(99) or 0.0
+        return min(configured, max(self.min_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay(self) -> float | None:
+        """How long to wait before hedging a read, or None to not hedge."""
+        if not self.hedge or len(self._latencies) < self.min_samples:
+            return None
+        return self.percentile(95)
+
+    def snapshot(self, configured: float) -> BreakerState:
+        p50, p99 = self.percentile(50), self.percentile(99)
+        return BreakerState(
+            router=self.name,
+            state=self.state,
+            consecutive_failures=self.consecutive_failures,
+            retry_after=round(self.retry_after, 3),
+            timeout=self.timeout(configured),
+            p50_ms=None if p50 is None else round(p50 * 1000, 3),
+            p99_ms=None if p99 is None else round(p99 * 1000, 3),
+            samples=len(self._latencies),
+        )
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class CircuitBreakers:
+    """Process-wide circuit breakers, one per router host and port."""
+
+    def __init__(self, **options: Any):
+        self._options = options
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._timeouts: dict[str, float] = {}
+
+    def configure(self, **options: Any):
+        """Apply new options; breakers are recreated with closed circuits."""
+        self._options = options
+        self._breakers.clear()
+
+    def get(self, config: ConnectionConfig) -> CircuitBreaker:
+        name = f"{config.host}:{config.port}"
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name, **self._options)
+        self._timeouts[name] = config.timeout
+        return breaker
+
+    def find(self, config: ConnectionConfig) -> CircuitBreaker | None:
+        return self._breakers.get(f"{config.host}:{config.port}")
+
+    def states(self) -> list[BreakerState]:
+        return [
+            breaker.snapshot(self._timeouts.get(name, 0.0))
+            for name, breaker in self._breakers.items()
+        ]
+
+
+circuit_breakers = CircuitBreakers()
+
+registry.gauge(
+    "rx_circuit_breaker_state",
+    "Circuit breaker state per router; 1 for the current state.",
+    ("router", "state"),
+    lambda: (
+        ((state.router, name), 1.0 if state.state == name else 0.0)
+        for state in circuit_breakers.states()
+        for name in (CLOSED, OPEN, HALF_OPEN)
+    ),
+)
+registry.gauge(
+    "rx_circuit_breaker_timeout_seconds",
+    "Adaptive command timeout per router.",
+    ("router",),
+    lambda: (((state.router,), state.timeout) for state in circuit_breakers.states()),
+)
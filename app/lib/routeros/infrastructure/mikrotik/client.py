@@ -0,0 +1,327 @@
+import asyncio
+import hashlib
+import itertools
+import ssl
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+
+from app.core.metrics import timed_phase
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsConnectionError,
+    RouterOsLoginError,
+    RouterOsTrapError,
+)
+from app.lib.routeros.infrastructure.mikrotik.protocol import (
+    build_command,
+    encode_sentence,
+    parse_reply,
+    read_sentence,
+)
+from app.lib.routeros.types.connection_config import ConnectionConfig
+
+Reply = tuple[str, dict[str, str]]
+
+# Rows buffered per streamed command before the reader stops reading the
+# socket, which in turn makes the router wait on TCP flow control.
+STREAM_BUFFER = 256
+
+
+@dataclass
+class _PendingCommand:
+    tag: str
+    replies: asyncio.Queue[Reply | BaseException] = field(default_factory=asyncio.Queue)
+    done: bool = False
+
+    def fail(self, error: BaseException):
+        # Errors must get through even when a bounded queue is full.
+        self.discard()
+        self.replies.put_nowait(error)
+
+    def discard(self):
+        while not self.replies.empty():
+            self.replies.get_nowait()
+
+
+class AsyncRouterOsClient:
+    """Asyncio-native RouterOS API client.
+
+    Every command is sent with a unique ``.tag`` and a single reader task
+    routes replies back to the command that asked for them, so several
+    commands can be in flight on one socket at the same time.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        port: int = 8728,
+        use_ssl: bool = False,
+        ssl_verify: bool = False,
+        timeout: float = 5,
+    ):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port
+        self.use_ssl = use_ssl
+        self.ssl_verify = ssl_verify
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._pending: dict[str, _PendingCommand] = {}
+        self._tags = itertools.count()
+        self._error: BaseException | None = None
+
+    @classmethod
+    def from_config(cls, config: ConnectionConfig) -> "AsyncRouterOsClient":
+        return cls(
+            host=config.host,
+            username=config.username,
+            password=config.password,
+            port=config.port,
+            use_ssl=config.use_ssl,
+            ssl_verify=config.ssl_verify,
+            timeout=config.timeout,
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._writer is None or self._error is not None
+
+    async def connect(self):
+        """Open the socket, start the reply dispatcher and log in."""
+        ssl_context = None
+        if self.use_ssl:
+            ssl_context = ssl.create_default_context()
+            if not self.ssl_verify:
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+        try:
+            with timed_phase("connect", self.host):
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, ssl=ssl_context),
+                    self.timeout,
+                )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RouterOsConnectionError(
+                f"Unable to connect to {self.host}:{self.port}: {e}"
+            ) from e
+        self._error = None
+        self._reader_task = asyncio.create_task(self._read_replies())
+        try:
+            with timed_phase("login", self.host):
+                await self.login()
+        except BaseException:
+            await self.close()
+            raise
+
+    async def login(self):
+        """Log in, falling back to the pre-6.43 challenge/response scheme."""
+        try:
+            replies = await self._run(
+                "/login", {"name": self.username, "password": self.password}
+            )
+        except RouterOsTrapError as e:
+            raise RouterOsLoginError(str(e)) from e
+        challenge = replies[0].get("ret") if replies else None
+        if challenge:
+            digest = hashlib.md5(
+                b"\x00" + self.password.encode() + bytes.fromhex(challenge)
+            ).hexdigest()
+            try:
+                await self._run(
+                    "/login", {"name": self.username, "response": f"00{digest}"}
+                )
+            except RouterOsTrapError as e:
+                raise RouterOsLoginError(str(e)) from e
+
+    async def execute(
+        self,
+        command: str,
+        attributes: dict[str, str] | None = None,
+        queries: Iterable[str] = (),
+        proplist: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[dict[str, str]]:
+        """Run a command and collect every reply row.
+
+        ``timeout`` bounds the whole command and defaults to the client's
+        configured timeout. The command is cancelled on the router when the
+        deadline passes.
+        """
+        with timed_phase("command", self.host):
+            return await self._run(command, attributes, queries, proplist, timeout)
+
+    async def _run(
+        self,
+        command: str,
+        attributes: dict[str, str] | None = None,
+        queries: Iterable[str] = (),
+        proplist: Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> list[dict[str, str]]:
+        timeout = self.timeout if timeout is None else timeout
+        pending = self._send(command, attributes, queries, proplist)
+        try:
+            return await asyncio.wait_for(self._collect(pending), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"RouterOS command {command} timed out after {timeout}s"
+            ) from None
+        finally:
+            self._finish(pending)
+
+    async def stream(
+        self,
+        command: str,
+        attributes: dict[str, str] | None = None,
+        queries: Iterable[str] = (),
+        proplist: Iterable[str] | None = None,
+        timeout: float | None = None,
+        buffer: int = STREAM_BUFFER,
+    ) -> AsyncIterator[dict[str, str]]:
+        """Yield reply rows as they arrive.
+
+        Unlike :meth:`execute`, ``timeout`` bounds the wait for each reply
+        rather than the whole command, so long listings are not cut short.
+        At most ``buffer`` rows are held in memory; past that the socket is
+        no longer read until the consumer catches up.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        pending = self._send(command, attributes, queries, proplist, buffer)
+        trap: dict[str, str] | None = None
+        try:
+            while True:
+                try:
+                    if pending.replies.empty():
+                        reply, data = await asyncio.wait_for(
+                            self._next_reply(pending), timeout
+                        )
+                    else:
+                        # Skip wait_for, which costs a task per row.
+                        reply, data = self._next_reply_nowait(pending)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(
+                        f"RouterOS command {command} timed out after {timeout}s"
+                    ) from None
+                if reply == "!re":
+                    yield data
+                elif reply == "!trap":
+                    trap = data
+                elif reply == "!done":
+                    pending.done = True
+                    if trap is not None:
+                        raise RouterOsTrapError(
+                            trap.get("message", "Command failed"), trap.get("category")
+                        )
+                    if data:
+                        yield data
+                    return
+        finally:
+            self._finish(pending)
+
+    async def close(self):
+        """Close the socket and fail any commands still waiting."""
+        writer, self._writer = self._writer, None
+        if self._reader_task and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._fail_pending(RouterOsConnectionError("Connection closed"))
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def _send(
+        self,
+        command: str,
+        attributes: dict[str, str] | None,
+        queries: Iterable[str],
+        proplist: Iterable[str] | None,
+        buffer: int = 0,
+    ) -> _PendingCommand:
+        if self.closed or self._writer is None:
+            raise RouterOsConnectionError(f"Not connected to {self.host}")
+        tag = str(next(self._tags))
+        pending = self._pending[tag] = _PendingCommand(tag, asyncio.Queue(buffer))
+        # A single write keeps concurrently issued sentences from interleaving.
+        self._writer.write(
+            encode_sentence(build_command(command, attributes, queries, proplist, tag))
+        )
+        return pending
+
+    async def _next_reply(self, pending: _PendingCommand) -> Reply:
+        item = await pending.replies.get()
+        if isinstance(item, BaseException):
+            pending.done = True
+            raise item
+        return item
+
+    def _next_reply_nowait(self, pending: _PendingCommand) -> Reply:
+        item = pending.replies.get_nowait()
+        if isinstance(item, BaseException):
+            pending.done = True
+            raise item
+        return item
+
+    async def _collect(self, pending: _PendingCommand) -> list[dict[str, str]]:
+        rows: list[dict[str, str]] = []
+        trap: dict[str, str] | None = None
+        while True:
+            reply, data = await self._next_reply(pending)
+            if reply == "!re":
+                rows.append(data)
+            elif reply == "!trap":
+                trap = data
+            elif reply == "!done":
+                pending.done = True
+                if trap is not None:
+                    raise RouterOsTrapError(
+                        trap.get("message", "Command failed"), trap.get("category")
+                    )
+                if data:
+                    # /login and similar commands return attributes on !done.
+                    rows.append(data)
+                return rows
+
+    def _finish(self, pending: _PendingCommand):
+        self._pending.pop(pending.tag, None)
+        # Unblocks the reader if it is waiting on this command's full queue.
+        pending.discard()
+        if not pending.done and not self.closed and self._writer is not None:
+            # Stop the router from streaming replies nobody will read.
+            self._writer.write(
+                encode_sentence(build_command("/cancel", {"tag": pending.tag}))
+            )
+
+    async def _read_replies(self):
+        assert self._reader is not None
+        try:
+            while True:
+                words = await read_sentence(self._reader)
+                reply, tag, data = parse_reply(words)
+                if reply == "!fatal":
+                    message = next(iter(data.values()), None) or " ".join(words[1:])
+                    raise RouterOsConnectionError(f"Router closed session: {message}")
+                pending = self._pending.get(tag) if tag is not None else None
+                if pending is not None:
+                    await pending.replies.put((reply, data))
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError, ValueError) as e:
+            error = (
+                e
+                if isinstance(e, RouterOsConnectionError)
+                else RouterOsConnectionError(f"Connection to {self.host} lost: {e}")
+            )
+            self._error = error
+            self._fail_pending(error)
+            if self._writer is not None:
+                self._writer.close()
+
+    def _fail_pending(self, error: BaseException):
+        for pending in self._pending.values():
+            pending.fail(error)
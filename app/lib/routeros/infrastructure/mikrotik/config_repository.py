@@ -0,0 +1,127 @@
+from collections.abc import Callable, Iterable
+from contextlib import aclosing
+
+from app.core.settings import ConfigSnapshotConfig
+from app.lib.routeros.domain.repositories import ConfigSourceRepository
+from app.lib.routeros.infrastructure.mikrotik import MikroTikConnectionManager
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+
+# Fields that move on their own and would make every print look changed.
+VOLATILE_FIELDS = (
+    ".id",
+    "bytes",
+    "packets",
+    "rx-byte",
+    "tx-byte",
+    "rx-packet",
+    "tx-packet",
+    "rx-drop",
+    "tx-drop",
+    "rx-error",
+    "tx-error",
+    "fp-rx-byte",
+    "fp-tx-byte",
+    "fp-rx-packet",
+    "fp-tx-packet",
+    "link-downs",
+    "last-link-up-time",
+    "last-link-down-time",
+    "uptime",
+)
+
+
+def split_export(lines: Iterable[str]) -> dict[str, str]:
+    """Split ``/export`` output into sections keyed by their menu header.
+
+    Comments, which carry the export's date and the RouterOS version, are
+    dropped and ``\\``-continued lines are joined, so a section's text only
+    changes when its configuration does. A menu exported in several places
+    is gathered into one section.
+    """
+    sections: dict[str, list[str]] = {}
+    current = sections.setdefault("/", [])
+    pending = ""
+    for line in lines:
+        line = line.rstrip()
+        if pending:
+            line, pending = pending + line.lstrip(), ""
+        if line.endswith("\\"):
+            pending = line[:-1]
+            continue
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("/"):
+            current = sections.setdefault(line, [])
+        else:
+            current.append(line)
+    if pending:
+        current.append(pending)
+    return {name: "\n".join(body) for name, body in sections.items() if body}
+
+
+def render_rows(rows: Iterable[dict[str, str]], ignore: Iterable[str] = ()) -> str:
+    """One line of sorted ``key=value`` pairs per printed row, in print order."""
+    skipped = set(ignore)
+    return "\n".join(
+        " ".join(
+            f"{key}={value}" for key, value in sorted(row.items()) if key not in skipped
+        )
+        for row in rows
+    )
+
+
+class MikroTikConfigRepository(ConfigSourceRepository):
+    """Reads a router's configuration as ``/export`` sections and menu prints.
+
+    The export is split by :func:`split_export`. Each menu in ``paths`` is
+    printed as well and becomes a section named after its path, without
+    ``ignore_fields``, which covers state the export leaves out, such as
+    dynamic entries. Both share one pooled session and ``timeout``.
+    """
+
+    def __init__(
+        self,
+        connection_config: MikrotikConnectionConfig,
+        export: bool = True,
+        paths: Iterable[str] = (),
+        ignore_fields: Iterable[str] = VOLATILE_FIELDS,
+        timeout: float = 60.0,
+    ):
+        self.connection_config = connection_config
+        self.export = export
+        self.paths = tuple(paths)
+        self.ignore_fields = tuple(ignore_fields)
+        self.timeout = timeout
+
+    async def get_config_sections(self) -> dict[str, str]:
+        sections: dict[str, str] = {}
+        async with MikroTikConnectionManager(self.connection_config) as connection:
+            if self.export:
+                client = connection.get_connection().client
+                replies = await client.execute("/export", timeout=self.timeout)
+                # The router may send the script whole or one line per reply.
+                sections.update(
+                    split_export(
+                        line
+                        for reply in replies
+                        for line in reply.get("ret", "").splitlines()
+                    )
+                )
+            for path in self.paths:
+                stream = connection.get_resource(path, self.timeout).stream()
+                async with aclosing(stream):  # pyright: ignore
+                    rows = [row async for row in stream]
+                sections[path] = render_rows(rows, self.ignore_fields)
+        return sections
+
+
+def config_source_factory(
+    settings: ConfigSnapshotConfig,
+) -> Callable[[MikrotikConnectionConfig], MikroTikConfigRepository]:
+    """Builds the config source of each router from the snapshot settings."""
+    ignore_fields = (
+        VOLATILE_FIELDS if settings.ignore_fields is None else settings.ignore_fields
+    )
+    return lambda config: MikroTikConfigRepository(
+        config, settings.export, settings.paths, ignore_fields, settings.timeout
+    )
@@ -0,0 +1,174 @@
+"""Declarative decoding of RouterOS records into domain entities.
+
+Each entity declares its fields once, as ``(target, source key, parser,
+default)``. :class:`RecordDecoder` compiles that into a single generated
+function per entity, so decoding a record is one dict lookup and one parser
+call per field followed by a construction that skips pydantic validation.
+The parsers already guarantee the types, and large tables make per-record
+validation the dominant cost.
+
+Any ``str -> value`` callable works as a parser, e.g.
+``app.lib.routeros.domain.duration.parse_duration`` for '1w2d03:04:05'.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+
+_SIZE_UNITS = {
+    "B": 1,
+    "KiB": 1024,
+    "MiB": 1024**2,
+    "GiB": 1024**3,
+    "TiB": 1024**4,
+    "kB": 1000,
+    "KB": 1000,
+    "MB": 1000**2,
+    "GB": 1000**3,
+}
+
+
+def parse_text(value: str) -> str:
+    return value
+
+
+def parse_int(value: str) -> int:
+    """Parse an integer, treating empty or malformed values as 0."""
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def parse_size(value: str) -> int:
+    """Parse byte counts such as '128MiB', '1.5GiB' or a plain number."""
+    if value.isdigit():
+        return int(value)
+    number = value.rstrip("BKMGTikb")
+    factor = _SIZE_UNITS.get(value[len(number) :])
+    if factor is None:
+        return 0
+    try:
+        return int(float(number) * factor)
+    except ValueError:
+        return 0
+
+
+def parse_percent(value: str) -> int:
+    """Parse percentages such as '15%' or '15'."""
+    return parse_int(value.rstrip("%"))
+
+
+def parse_bool(value: str) -> bool:
+    return value in ("true", "yes")
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Where one entity field comes from and how its value is parsed."""
+
+    target: str
+    source: str
+    parser: Callable[[str], Any] = parse_text
+    default: str = ""
+
+
+def field(
+    target: str,
+    parser: Callable[[str], Any] = parse_text,
+    source: str | None = None,
+    default: str = "",
+) -> FieldSpec:
+    """Declare a field; the source key defaults to the kebab-case target."""
+    return FieldSpec(target, source or target.replace("_", "-"), parser, default)
+
+
+def _fast_constructor(entity: type[T]) -> Callable[[dict[str, Any]], T]:
+    """Build instances the way ``model_construct`` does, minus its overhead.
+
+    Only plain models qualify: anything with private attributes or extra
+    fields falls back to ``model_construct``.
+    """
+    if entity.__private_attributes__ or entity.model_config.get("extra") == "allow":
+        return lambda values: entity.model_construct(**values)
+
+    new = object.__new__
+    setattr_ = object.__setattr__
+
+    def construct(values: dict[str, Any]) -> T:
+        instance = new(entity)
+        setattr_(instance, "__dict__", values)
+        setattr_(instance, "__pydantic_fields_set__", set(values))
+        setattr_(instance, "__pydantic_extra__", None)
+        setattr_(instance, "__pydantic_private__", None)
+        return instance
+
+    return construct
+
+
+class RecordDecoder(Generic[T]):
+    """Decoder compiled from a list of :class:`FieldSpec` for one entity."""
+
+    def __init__(self, entity: type[T], fields: Iterable[FieldSpec]):
+        self.entity = entity
+        self.fields = tuple(fields)
+        targets = {spec.target for spec in self.fields}
+        unknown = targets - set(entity.model_fields)
+        if unknown:
+            raise ValueError(f"{entity.__name__} has no fields {sorted(unknown)}")
+        missing = {
+            name
+            for name, info in entity.model_fields.items()
+            if info.is_required() and name not in targets
+        }
+        if missing:
+            raise ValueError(f"{entity.__name__} fields not mapped: {sorted(missing)}")
+        self.decode: Callable[[dict[str, str]], T] = self._compile()
+
+    def decode_many(self, rows: Iterable[dict[str, str]]) -> list[T]:
+        decode = self.decode
+        return [decode(row) for row in rows]
+
+    def _compile(self) -> Callable[[dict[str, str]], T]:
+        namespace: dict[str, Any] = {"construct": _fast_constructor(self.entity)}
+        specs = {spec.target: (index, spec) for index, spec in enumerate(self.fields)}
+        items = []
+        # Keep model field order so dumps look the same as validated models.
+        for name, info in self.entity.model_fields.items():
+            if name in specs:
+                index, spec = specs[name]
+                value = f"get({spec.source!r}, {spec.default!r})"
+                if spec.parser in (parse_int, parse_size):
+                    # Inline the common all-digits case to save a call.
+                    namespace[f"parse_{index}"] = spec.parser
+                    value = (
+                        f"(int(v) if (v := {value}).isdigit() else parse_{index}(v))"
+                    )
+                elif spec.parser is not parse_text:
+                    namespace[f"parse_{index}"] = spec.parser
+                    value = f"parse_{index}({value})"
+            else:
+                namespace[f"default_{name}"] = partial(
+                    info.get_default, call_default_factory=True
+                )
+                value = f"default_{name}()"
+            items.append(f"{name!r}: {value}")
+        source = (
+            "def decode(row):\n"
+            "    get = row.get\n"
+            f"    return construct({{{', '.join(items)}}})\n"
+        )
+        exec(compile(source, f"<decoder {self.entity.__name__}>", "exec"), namespace)
+        return namespace["decode"]
@@ -0,0 +1,42 @@
+class RouterOsError(Exception):
+    """Base error raised by the RouterOS API client."""
+
+
+class RouterOsConnectionError(RouterOsError, ConnectionError):
+    """The API socket is closed or unusable and must be reopened."""
+
+
+class RouterOsLoginError(RouterOsError):
+    """The router rejected the supplied credentials."""
+
+
+class RouterOsTrapError(RouterOsError):
+    """The router answered a command with ``!trap``."""
+
+    def __init__(self, message: str, category: str | None = None):
+        super().__init__(message)
+        self.category = category
+
+
+class RouterOsPoolExhaustedError(RouterOsError, TimeoutError):
+    """Every pooled session to the router stayed in use past the timeout.
+
+    The wait happened on our side, so it says nothing about the router.
+    """
+
+
+class RouterOsCursorNotFoundError(RouterOsError):
+    """A stream was resumed after a row the router no longer has."""
+
+    def __init__(self, cursor: str, path: str):
+        super().__init__(f"Row {cursor} no longer exists in {path}; restart the stream")
+        self.cursor = cursor
+        self.path = path
+
+
+class RouterOsCircuitOpenError(RouterOsError):
+    """The router's circuit breaker is open; nothing was sent to it."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
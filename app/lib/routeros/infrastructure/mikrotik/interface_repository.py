@@ -0,0 +1,38 @@
+from app.core.metrics import timed_phase
+from app.lib.routeros.domain.entities import Interface
+from app.lib.routeros.domain.repositories import InterfaceRepository
+from app.lib.routeros.infrastructure.mikrotik import MikroTikConnectionManager
+from app.lib.routeros.infrastructure.mikrotik.constant import MikrotikResourceUri
+from app.lib.routeros.infrastructure.mikrotik.schemas import INTERFACE
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+
+# Only what the traffic engine needs; skips comments, MTUs, MACs and so on.
+COUNTER_PROPLIST = (
+    ".id",
+    "name",
+    "type",
+    "running",
+    "disabled",
+    "rx-byte",
+    "tx-byte",
+    "rx-packet",
+    "tx-packet",
+)
+
+
+class MikroTikInterfaceRepository(InterfaceRepository):
+    """MikroTik implementation of InterfaceRepository."""
+
+    def __init__(self, connection_config: MikrotikConnectionConfig):
+        self.connection_config = connection_config
+
+    async def get_interfaces(self) -> list[Interface]:
+        """Print the interface table, decoding rows as they arrive."""
+        decode = INTERFACE.decode
+        async with MikroTikConnectionManager(self.connection_config) as connection:
+            resource = connection.get_resource(MikrotikResourceUri.INTERFACE)
+            with timed_phase("command", self.connection_config.host):
+                return [
+                    decode(row)
+                    async for row in resource.stream(proplist=COUNTER_PROPLIST)
+                ]
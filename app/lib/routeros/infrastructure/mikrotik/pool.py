@@ -0,0 +1,298 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from app.core.metrics import record_phase, registry
+from app.lib.routeros.infrastructure.mikrotik.client import AsyncRouterOsClient
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsPoolExhaustedError,
+)
+from app.lib.routeros.types.connection_config import ConnectionConfig
+
+PoolKey = tuple[str, int, str]
+
+# Errors that mean the underlying socket is unusable and must be replaced.
+# Timeouts are deliberately excluded: the command is cancelled on the router
+# and the session stays usable.
+CONNECTION_ERRORS: tuple[type[BaseException], ...] = (ConnectionError,)
+
+KEEPALIVE_RESOURCE = "/system/identity"
+
+
+def pool_key(config: ConnectionConfig) -> PoolKey:
+    """Build the key a router's sessions are pooled under."""
+    return (config.host, config.port, config.username)
+
+
+@dataclass
+class PooledConnection:
+    """A single logged-in RouterOS API session owned by the pool."""
+
+    key: PoolKey
+    client: AsyncRouterOsClient
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    last_probed: float = field(default_factory=time.monotonic)
+
+    @property
+    def last_seen_alive(self) -> float:
+        return max(self.last_used, self.last_probed)
+
+    @property
+    def closed(self) -> bool:
+        return self.client.closed
+
+    async def probe(self) -> bool:
+        """Send a cheap command to check the socket is still alive."""
+        try:
+            await self.client.execute(f"{KEEPALIVE_RESOURCE}/print")
+            return True
+        except Exception:
+            return False
+
+    async def close(self):
+        """Close the underlying socket, ignoring errors from dead peers."""
+        try:
+            await self.client.close()
+        except Exception:
+            pass
+
+
+class _RouterSlot:
+    """Idle sessions and accounting for a single router."""
+
+    def __init__(self, config: ConnectionConfig):
+        self.config = config
+        self.idle: deque[PooledConnection] = deque()
+        self.in_use = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + self.in_use
+
+
+class RouterConnectionPool:
+    """Process-wide pool of RouterOS API sessions keyed by host/port/user.
+
+    Sessions are logged in once and reused across requests. A background
+    task evicts sessions idle for longer than ``idle_timeout``, keeps at
+    least ``min_size`` sessions per router open and probes idle sessions
+    every ``keepalive_interval`` seconds so dead sockets are replaced before
+    a request picks them up.
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        keepalive_interval: float = 60.0,
+    ):
+        self.configure(min_size, max_size, idle_timeout, keepalive_interval)
+        self._slots: dict[PoolKey, _RouterSlot] = {}
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self._worker_task: asyncio.Task[None] | None = None
+
+    def configure(
+        self,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        keepalive_interval: float = 60.0,
+    ):
+        """Update the pool limits; existing sessions are kept."""
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+
+    def start(self):
+        """Start the background maintenance task on the running loop."""
+        self._closed = False
+        if self._worker_task and not self._worker_task.done():
+            return
+        self._worker_task = asyncio.get_running_loop().create_task(self._maintain())
+
+    async def warm(self, config: ConnectionConfig):
+        """Open ``min_size`` sessions to a router ahead of the first request."""
+        slot = self._get_slot(config)
+        while slot.size < self.min_size:
+            slot.in_use += 1
+            try:
+                connection = await self._open(config)
+            except BaseException:
+                await self._forget(slot)
+                raise
+            await self.release(connection)
+
+    async def acquire(self, config: ConnectionConfig) -> PooledConnection:
+        """Lease a session, opening one if the router is below ``max_size``.
+
+        Waits for up to the config's ``timeout`` if all sessions are in use.
+        """
+        slot = self._get_slot(config)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + config.timeout
+        async with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed.")
+                if slot.idle:
+                    connection = slot.idle.pop()
+                    slot.in_use += 1
+                    break
+                if slot.size < self.max_size:
+                    slot.in_use += 1
+                    connection = None
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise RouterOsPoolExhaustedError(
+                        f"Timed out waiting for a pooled connection to {config.host}"
+                    )
+                try:
+                    await asyncio.wait_for(self._cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    continue
+        record_phase("pool_wait", loop.time() - started, config.host)
+
+        try:
+            if connection is None:
+                return await self._open(config)
+            stale = (
+                time.monotonic() - connection.last_seen_alive >= self.keepalive_interval
+            )
+            if connection.closed or (stale and not await connection.probe()):
+                # The socket died while idle; reconnect transparently.
+                await connection.close()
+                return await self._open(config)
+            return connection
+        except BaseException:
+            await self._forget(slot)
+            raise
+
+    async def release(self, connection: PooledConnection, discard: bool = False):
+        """Return a leased session; ``discard`` closes it instead of reusing it."""
+        async with self._cond:
+            slot = self._slots.get(connection.key)
+            if slot is not None:
+                slot.in_use -= 1
+            if slot is None or self._closed or connection.closed:
+                discard = True
+            elif not discard:
+                connection.last_used = time.monotonic()
+                slot.idle.append(connection)
+            self._cond.notify()
+        if discard:
+            await connection.close()
+
+    async def replace(self, connection: PooledConnection) -> PooledConnection:
+        """Swap a broken leased session for a freshly opened one."""
+        await connection.close()
+        slot = self._slots[connection.key]
+        try:
+            return await self._open(slot.config)
+        except BaseException:
+            await self._forget(slot)
+            raise
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return idle/in-use counts per router for diagnostics."""
+        return {
+            f"{host}:{port}": {"idle": len(slot.idle), "in_use": slot.in_use}
+            for (host, port, _), slot in self._slots.items()
+        }
+
+    async def close(self):
+        """Stop maintenance and close every idle session."""
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+        async with self._cond:
+            self._closed = True
+            idle = [c for slot in self._slots.values() for c in slot.idle]
+            for slot in self._slots.values():
+                slot.idle.clear()
+            self._cond.notify_all()
+        await asyncio.gather(*(c.close() for c in idle))
+
+    def _get_slot(self, config: ConnectionConfig) -> _RouterSlot:
+        key = pool_key(config)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _RouterSlot(config)
+        return slot
+
+    async def _forget(self, slot: _RouterSlot):
+        """Give back a reserved slot whose session could not be opened."""
+        async with self._cond:
+            slot.in_use -= 1
+            self._cond.notify()
+
+    async def _open(self, config: ConnectionConfig) -> PooledConnection:
+        client = AsyncRouterOsClient.from_config(config)
+        await client.connect()
+        return PooledConnection(key=pool_key(config), client=client)
+
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(min(self.keepalive_interval, self.idle_timeout))
+            for slot in list(self._slots.values()):
+                try:
+                    await self._maintain_slot(slot)
+                except Exception as e:
+                    logger.warning(
+                        "Connection pool maintenance failed for {}: {}",
+                        slot.config.host,
+                        e,
+                    )
+
+    async def _maintain_slot(self, slot: _RouterSlot):
+        now = time.monotonic()
+        async with self._cond:
+            candidates = list(slot.idle)
+            slot.idle.clear()
+            slot.in_use += len(candidates)
+
+        keep: list[PooledConnection] = []
+        for connection in candidates:
+            expired = now - connection.last_used >= self.idle_timeout
+            if (expired and len(keep) >= self.min_size) or not await connection.probe():
+                await connection.close()
+            else:
+                keep.append(connection)
+
+        async with self._cond:
+            slot.in_use -= len(candidates)
+            for connection in keep:
+                connection.last_probed = now
+            slot.idle.extend(keep)
+            self._cond.notify_all()
+
+        if slot.size < self.min_size:
+            await self.warm(slot.config)
+
+
+connection_pool = RouterConnectionPool()
+
+registry.gauge(
+    "rx_pool_connections",
+    "Pooled RouterOS API sessions per router and state.",
+    ("router", "state"),
+    lambda: (
+        ((router, state), count)
+        for router, counts in connection_pool.stats().items()
+        for state, count in counts.items()
+    ),
+)
@@ -0,0 +1,100 @@
+"""Wire format of the RouterOS API.
+
+A sentence is a sequence of length-prefixed words terminated by an empty
+word. Replies start with a reply word (``!re``, ``!done``, ``!trap``,
+``!fatal`` or ``!empty``) followed by ``=key=value`` attribute words and an
+optional ``.tag=`` word used to match replies to commands.
+"""
+
+import asyncio
+from collections.abc import Iterable
+
+ENCODING = "utf-8"
+
+
+def encode_length(length: int) -> bytes:
+    """Encode a word length using the RouterOS variable-length scheme."""
+    if length < 0x80:
+        return length.to_bytes(1, "big")
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, "big")
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, "big")
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, "big")
+    return b"\xf0" + length.to_bytes(4, "big")
+
+
+def encode_word(word: str) -> bytes:
+    data = word.encode(ENCODING)
+    return encode_length(len(data)) + data
+
+
+def encode_sentence(words: Iterable[str]) -> bytes:
+    """Encode a full sentence, including the terminating empty word."""
+    return b"".join(encode_word(word) for word in words) + b"\x00"
+
+
+async def read_length(reader: asyncio.StreamReader) -> int:
+    first = (await reader.readexactly(1))[0]
+    if first & 0x80 == 0x00:
+        return first
+    if first & 0xC0 == 0x80:
+        extra, mask = 1, 0x3F
+    elif first & 0xE0 == 0xC0:
+        extra, mask = 2, 0x1F
+    elif first & 0xF0 == 0xE0:
+        extra, mask = 3, 0x0F
+    elif first == 0xF0:
+        return int.from_bytes(await reader.readexactly(4), "big")
+    else:
+        raise ValueError(f"Invalid RouterOS word length prefix: {first:#x}")
+    rest = await reader.readexactly(extra)
+    return ((first & mask) << (8 * extra)) | int.from_bytes(rest, "big")
+
+
+async def read_sentence(reader: asyncio.StreamReader) -> list[str]:
+    """Read words until the terminating empty word."""
+    words: list[str] = []
+    while True:
+        length = await read_length(reader)
+        if length == 0:
+            return words
+        data = await reader.readexactly(length)
+        words.append(data.decode(ENCODING, errors="replace"))
+
+
+def parse_reply(words: list[str]) -> tuple[str, str | None, dict[str, str]]:
+    """Split a reply sentence into ``(reply_word, tag, attributes)``."""
+    if not words:
+        return "", None, {}
+    tag = None
+    attributes: dict[str, str] = {}
+    for word in words[1:]:
+        if word.startswith(".tag="):
+            tag = word[5:]
+        elif word.startswith("="):
+            key, _, value = word[1:].partition("=")
+            attributes[key] = value
+        elif word.startswith("ret="):
+            # Some replies (e.g. legacy /login) omit the leading '='.
+            attributes["ret"] = word[4:]
+    return words[0], tag, attributes
+
+
+def build_command(
+    command: str,
+    attributes: dict[str, str] | None = None,
+    queries: Iterable[str] = (),
+    proplist: Iterable[str] | None = None,
+    tag: str | None = None,
+) -> list[str]:
+    """Build the words of a command sentence."""
+    words = [command]
+    words.extend(f"={key}={value}" for key, value in (attributes or {}).items())
+    if proplist:
+        words.append(f"=.proplist={','.join(proplist)}")
+    words.extend(query if query.startswith("?") else f"?{query}" for query in queries)
+    if tag is not None:
+        words.append(f".tag={tag}")
+    return words
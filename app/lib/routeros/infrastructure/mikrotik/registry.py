@@ -0,0 +1,68 @@
+from collections.abc import Iterable
+
+from app.core.settings import RouterOSConfig, Settings
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+
+
+class RouterRegistry:
+    """In-memory registry of known routers, keyed by router name.
+
+    Routers come from the settings or are stored through the API; a
+    stored router never replaces one of the same name from the settings.
+    """
+
+    def __init__(self):
+        self._routers: dict[str, MikrotikConnectionConfig] = {}
+        self._configured: set[str] = set()
+        self._stored: set[str] = set()
+
+    def load(self, settings: Settings):
+        """Register the default router and every entry of ``Settings.routers``."""
+        entries = [settings.routeros] if settings.routeros.host else []
+        for entry in [*entries, *settings.routers]:
+            self.register(entry.name, self.to_config(entry))
+            self._configured.add(entry.name)
+
+    def sync(self, entries: Iterable[RouterOSConfig]):
+        """Make the stored routers match ``entries``."""
+        stored = {entry.name: entry for entry in entries}
+        for name in self._stored - stored.keys():
+            self._routers.pop(name, None)
+        for name, entry in stored.items():
+            if name not in self._configured:
+                self.register(name, self.to_config(entry))
+        self._stored = stored.keys() - self._configured
+
+    def configured(self, name: str) -> bool:
+        """Whether ``name`` comes from the settings rather than the API."""
+        return name in self._configured
+
+    def register(self, name: str, config: MikrotikConnectionConfig):
+        self._routers[name] = config
+
+    def unregister(self, name: str) -> bool:
+        return self._routers.pop(name, None) is not None
+
+    def get(self, name: str) -> MikrotikConnectionConfig | None:
+        return self._routers.get(name)
+
+    def all(self) -> dict[str, MikrotikConnectionConfig]:
+        return dict(self._routers)
+
+    def __len__(self) -> int:
+        return len(self._routers)
+
+    @staticmethod
+    def to_config(entry: RouterOSConfig) -> MikrotikConnectionConfig:
+        return MikrotikConnectionConfig(
+            host=entry.host,
+            username=entry.username,
+            password=entry.password,
+            port=entry.port,
+            use_ssl=entry.use_ssl,
+            ssl_verify=entry.ssl_verify,
+            timeout=entry.timeout,
+        )
+
+
+router_registry = RouterRegistry()
@@ -0,0 +1,51 @@
+from app.lib.routeros.domain.entities import Interface, SystemResource
+from app.lib.routeros.infrastructure.mikrotik.decoder import (
+    RecordDecoder,
+    field,
+    parse_bool,
+    parse_float,
+    parse_int,
+    parse_percent,
+    parse_size,
+)
+
+SYSTEM_RESOURCE = RecordDecoder(
+    SystemResource,
+    [
+        field("uptime"),
+        field("version"),
+        field("build_time"),
+        field("factory_firmware"),
+        field("free_memory", parse_size),
+        field("total_memory", parse_size),
+        field("cpu"),
+        field("cpu_count", parse_int),
+        field("cpu_frequency", parse_float),
+        field("cpu_load", parse_percent),
+        field("free_hdd_space", parse_size),
+        field("total_hdd_space", parse_size),
+        field("write_sector_total", parse_int),
+        field("write_sector_since_reboot", parse_int),
+        field("bad_blocks", parse_int),
+        field("architecture_name"),
+        field("board_name"),
+        field("platform"),
+    ],
+)
+
+INTERFACE = RecordDecoder(
+    Interface,
+    [
+        field("id", source=".id"),
+        field("name"),
+        field("type"),
+        field("mtu", parse_int),
+        field("mac_address"),
+        field("running", parse_bool),
+        field("disabled", parse_bool),
+        field("rx_byte", parse_int),
+        field("tx_byte", parse_int),
+        field("rx_packet", parse_int),
+        field("tx_packet", parse_int),
+    ],
+)
@@ -0,0 +1,60 @@
+from collections.abc import AsyncIterator, Iterable
+from contextlib import aclosing
+
+from app.lib.routeros.domain.repositories import RouterTableRepository
+from app.lib.routeros.infrastructure.mikrotik import MikroTikConnectionManager
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsCursorNotFoundError,
+)
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+
+ROW_ID = ".id"
+
+
+class MikroTikTableRepository(RouterTableRepository):
+    """Streams a RouterOS menu such as ``/ip/route`` row by row.
+
+    Field projection and filters are sent to the router as ``.proplist``
+    and ``?`` query words, so unwanted rows and columns never cross the
+    wire. The pooled session is held until the stream is exhausted or
+    closed; closing early cancels the print on the router.
+    """
+
+    def __init__(self, connection_config: MikrotikConnectionConfig, path: str):
+        self.connection_config = connection_config
+        self.path = path
+
+    async def stream_rows(
+        self,
+        queries: Iterable[str] = (),
+        fields: Iterable[str] | None = None,
+        after: str | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[dict[str, str]]:
+        proplist = None
+        if fields:
+            # .id is always needed to hand out a resumption cursor.
+            proplist = [ROW_ID, *(f for f in fields if f != ROW_ID)]
+        sent = 0
+        skipping = after is not None
+        async with MikroTikConnectionManager(
+            self.connection_config, stream=True
+        ) as connection:
+            resource = connection.get_resource(self.path)
+            rows = resource.stream(queries=queries, proplist=proplist)
+            # Closing promptly cancels the print instead of waiting for GC.
+            async with aclosing(rows):  # pyright: ignore
+                async for row in rows:
+                    if skipping:
+                        # The API has no offset, but print order is stable,
+                        # so resume by dropping rows up to the cursor.
+                        skipping = row.get(ROW_ID) != after
+                        continue
+                    yield row
+                    sent += 1
+                    if limit is not None and sent >= limit:
+                        return
+            if skipping and after is not None:
+                # Every row was read and dropped: the cursor row was removed,
+                # and with it any way of knowing where the client stopped.
+                raise RouterOsCursorNotFoundError(after, self.path)
@@ -0,0 +1,250 @@
+"""Snapshots shared between uvicorn worker processes.
+
+One elected worker polls the routers and publishes serialized snapshots
+into a memory-mapped file; the other workers read them from there instead
+of polling the same routers themselves.
+
+The file is a header followed by fixed-size slots, one per
+``(router, path)`` key, found by hashing the key and probing linearly.
+Each slot starts with a sequence number used as a seqlock: the single
+writer makes it odd before writing and even again afterwards, and readers
+retry whenever it is odd or changed while they were copying. Readers
+never take a lock, and comparing the sequence number against the last one
+they saw is enough to tell whether a slot holds new data.
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+_MAGIC = b"RXSNAP01"
+# magic, slot count, slot size
+_HEADER = struct.Struct("<8sII")
+# Slots start on a page boundary so every sequence number is 8-byte aligned.
+_HEADER_SIZE = mmap.PAGESIZE
+# sequence, stored_at, key length, payload length
+_SLOT = struct.Struct("<QdHI")
+_SEQUENCE = struct.Struct("<Q")
+
+_READ_RETRIES = 100
+
+
+@dataclass(frozen=True)
+class SharedSnapshot:
+    version: int
+    stored_at: float
+    payload: bytes
+
+
+class SharedSnapshotStore:
+    """Memory-mapped slot table written by one process and read by many."""
+
+    def __init__(self, path: str = "", slots: int = 512, slot_size: int = 65536):
+        self.configure(path, slots, slot_size)
+        self._file = None
+        self._map: mmap.mmap | None = None
+        self._offsets: dict[bytes, int] = {}
+
+    def configure(self, path: str = "", slots: int = 512, slot_size: int = 65536):
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+
+    @property
+    def opened(self) -> bool:
+        return self._map is not None
+
+    @property
+    def max_payload(self) -> int:
+        return self.slot_size - _SLOT.size
+
+    def open(self):
+        """Map the file, creating or re-initialising it if its layout differs."""
+        if self._map is not None:
+            return
+        size = _HEADER_SIZE + self.slots * self.slot_size
+        header = _HEADER.pack(_MAGIC, self.slots, self.slot_size)
+        file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                if (
+                    file.read(_HEADER.size) != header
+                    or os.fstat(file.fileno()).st_size != size
+                ):
+                    # A fresh file, or one left behind with other dimensions.
+                    file.truncate(0)
+                    file.truncate(size)
+                    file.seek(0)
+                    file.write(header)
+                    file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+            self._map = mmap.mmap(file.fileno(), size)
+        except BaseException:
+            file.close()
+            raise
+        self._file = file
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offsets.clear()
+
+    def publish(self, key: str, payload: bytes, stored_at: float | None = None) -> bool:
+        """Write ``payload`` under ``key``; only the elected worker may call this.
+
+        Returns False if the payload does not fit in a slot or the table is
+        full, in which case readers keep seeing the previous value.
+        """
+        if self._map is None:
+            return False
+        encoded = key.encode()
+        if len(payload) + len(encoded) > self.max_payload:
+            logger.warning(
+                "Snapshot {} is {} bytes, over the {} byte slot",
+                key,
+                len(payload),
+                self.max_payload,
+            )
+            return False
+        offset = self._find(encoded, claim=True)
+        if offset is None:
+            logger.warning("Shared snapshot table is full, dropping {}", key)
+            return False
+        buffer = self._map
+        (sequence,) = _SEQUENCE.unpack_from(buffer, offset)
+        # An odd sequence left by a writer that died mid-write is reused.
+        begin = sequence + 1 if sequence % 2 == 0 else sequence
+        _SEQUENCE.pack_into(buffer, offset, begin)
+        start = offset + _SLOT.size
+        buffer[start : start + len(encoded)] = encoded
+        start += len(encoded)
+        buffer[start : start + len(payload)] = payload
+        _SLOT.pack_into(
+            buffer,
+            offset,
+            begin,
+            time.time() if stored_at is None else stored_at,
+            len(encoded),
+            len(payload),
+        )
+        _SEQUENCE.pack_into(buffer, offset, begin + 1)
+        return True
+
+    def version(self, key: str) -> int:
+        """Current sequence number of ``key``, or 0 if it was never published."""
+        if self._map is None:
+            return 0
+        offset = self._find(key.encode())
+        if offset is None:
+            return 0
+        return _SEQUENCE.unpack_from(self._map, offset)[0]
+
+    def read(self, key: str) -> SharedSnapshot | None:
+        if self._map is None:
+            return None
+        encoded = key.encode()
+        offset = self._find(encoded)
+        if offset is None:
+            return None
+        buffer = self._map
+        for _ in range(_READ_RETRIES):
+            sequence, stored_at, key_length, length = _SLOT.unpack_from(buffer, offset)
+            if sequence == 0:
+                # Claimed by the writer but not published yet.
+                return None
+            if sequence % 2 or key_length + length > self.max_payload:
+                continue
+            start = offset + _SLOT.size + key_length
+            payload = buffer[start : start + length]
+            if _SEQUENCE.unpack_from(buffer, offset)[0] == sequence:
+                return SharedSnapshot(sequence, stored_at, payload)
+        return None
+
+    def _find(self, key: bytes, claim: bool = False) -> int | None:
+        """Offset of the slot holding ``key``; with ``claim``, take a free one."""
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        assert self._map is not None
+        buffer = self._map
+        first = zlib.crc32(key) % self.slots
+        for probe in range(self.slots):
+            offset = _HEADER_SIZE + (first + probe) % self.slots * self.slot_size
+            sequence, _, key_length, _ = _SLOT.unpack_from(buffer, offset)
+            if sequence == 0 and key_length == 0:
+                if not claim:
+                    return None
+                # Record the key before the first publish makes the slot live.
+                start = offset + _SLOT.size
+                buffer[start : start + len(key)] = key
+                _SLOT.pack_into(buffer, offset, 0, 0.0, len(key), 0)
+                self._offsets[key] = offset
+                return offset
+            start = offset + _SLOT.size
+            if key_length == len(key) and buffer[start : start + key_length] == key:
+                self._offsets[key] = offset
+                return offset
+        return None
+
+
+class LeaderElection:
+    """Elects one worker process by holding an exclusive ``flock``.
+
+    The kernel drops the lock when the holder exits, so another worker
+    takes over on its next attempt. Without ``fcntl`` every process
+    considers itself the leader.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_leader = False
+        self._file = None
+
+    def try_acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        if fcntl is None:
+            self.is_leader = True
+            return True
+        if self._file is None:
+            self._file = open(self.path, "a+")
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(f"{os.getpid()}\n")
+        self._file.flush()
+        self.is_leader = True
+        return True
+
+    def release(self):
+        if self._file is not None:
+            if self.is_leader and fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self.is_leader = False
+
+
+shared_store = SharedSnapshotStore()
@@ -0,0 +1,63 @@
+import asyncio
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def sqlite_path(db_url: str) -> str:
+    """Turn a ``sqlite:///path`` URL from Settings.db_url into a file path."""
+    for prefix in ("sqlite+aiosqlite:///", "sqlite:///"):
+        if db_url.startswith(prefix):
+            return db_url[len(prefix) :] or ":memory:"
+    raise ValueError(f"Unsupported database URL: {db_url}")
+
+
+class SQLiteDatabase:
+    """One persistent SQLite connection driven from a dedicated thread.
+
+    All statements run on a single-worker executor, so the connection is
+    only ever touched by one thread and callers on the event loop never
+    block on disk I/O.
+    """
+
+    def __init__(self):
+        self.path: str | None = None
+        self._connection: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    def open(self, path: str):
+        if self._connection is not None:
+            return
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._connection = self._executor.submit(self._connect, path).result()
+
+    async def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run ``fn(connection)`` on the database thread."""
+        if self._connection is None or self._executor is None:
+            raise RuntimeError("Database is not open.")
+        connection = self._connection
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, fn, connection
+        )
+
+    def close(self):
+        if self._connection is None or self._executor is None:
+            return
+        self._executor.submit(self._connection.close).result()
+        self._executor.shutdown()
+        self._connection = None
+        self._executor = None
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+
+database = SQLiteDatabase()
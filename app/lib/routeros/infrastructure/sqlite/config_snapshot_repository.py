@@ -0,0 +1,191 @@
+import json
+import sqlite3
+import zlib
+from collections.abc import Iterable
+from datetime import datetime
+
+from app.lib.routeros.domain.entities import ConfigSnapshot
+from app.lib.routeros.domain.repositories import ConfigSnapshotRepository
+from app.lib.routeros.infrastructure.sqlite import SQLiteDatabase, database
+from app.lib.routeros.infrastructure.sqlite.system_resource_history_repository import (
+    from_epoch_ms,
+    to_epoch_ms,
+)
+
+SNAPSHOT_COLUMNS = "s.id, s.router, s.ts, s.manifest, m.sections, s.changed"
+
+
+class SQLiteConfigSnapshotRepository(ConfigSnapshotRepository):
+    """SQLite store of config snapshots, deduplicated by content hash.
+
+    Section text is zlib-compressed into ``config_blobs`` once per hash and
+    the section-to-hash mapping into ``config_manifests`` once per
+    snapshot hash, whichever routers and snapshots share them; a
+    ``config_snapshots`` row only records which manifest a router had when.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self._database = database
+
+    async def setup(self):
+        await self._database.run(self._create_schema)
+
+    async def add_snapshot(
+        self, snapshot: ConfigSnapshot, content: dict[str, str]
+    ) -> ConfigSnapshot:
+        snapshot_id = await self._database.run(
+            lambda conn: self._insert(conn, snapshot, content)
+        )
+        return snapshot.model_copy(update={"id": snapshot_id})
+
+    async def get_snapshot(self, snapshot_id: int) -> ConfigSnapshot | None:
+        rows = await self._database.run(
+            lambda conn: conn.execute(
+                f"""
+                SELECT {SNAPSHOT_COLUMNS} FROM config_snapshots s
+                JOIN config_manifests m ON m.hash = s.manifest
+                WHERE s.id = ?
+                """,
+                (snapshot_id,),
+            ).fetchall()
+        )
+        return self._snapshot(rows[0]) if rows else None
+
+    async def get_latest(
+        self, router: str, before_id: int | None = None
+    ) -> ConfigSnapshot | None:
+        rows = await self._database.run(
+            lambda conn: conn.execute(
+                f"""
+                SELECT {SNAPSHOT_COLUMNS} FROM config_snapshots s
+                JOIN config_manifests m ON m.hash = s.manifest
+                WHERE s.router = ? AND s.id < ?
+                ORDER BY s.id DESC
+                LIMIT 1
+                """,
+                (router, 2**62 if before_id is None else before_id),
+            ).fetchall()
+        )
+        return self._snapshot(rows[0]) if rows else None
+
+    async def list_snapshots(
+        self,
+        router: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 100,
+    ) -> list[ConfigSnapshot]:
+        where = ["s.ts >= ?", "s.ts < ?"]
+        params: list[object] = [
+            to_epoch_ms(start) if start else 0,
+            to_epoch_ms(end) if end else 2**62,
+        ]
+        if router is not None:
+            where.append("s.router = ?")
+            params.append(router)
+        rows = await self._database.run(
+            lambda conn: conn.execute(
+                f"""
+                SELECT {SNAPSHOT_COLUMNS} FROM config_snapshots s
+                JOIN config_manifests m ON m.hash = s.manifest
+                WHERE {" AND ".join(where)}
+                ORDER BY s.ts DESC, s.id DESC
+                LIMIT ?
+                """,
+                (*params, limit),
+            ).fetchall()
+        )
+        return [self._snapshot(row) for row in rows]
+
+    async def get_content(self, hashes: Iterable[str]) -> dict[str, str]:
+        wanted = list(set(hashes))
+        if not wanted:
+            return {}
+        rows = await self._database.run(
+            lambda conn: conn.execute(
+                f"SELECT hash, content FROM config_blobs "
+                f"WHERE hash IN ({', '.join('?' * len(wanted))})",
+                wanted,
+            ).fetchall()
+        )
+        return {row[0]: zlib.decompress(row[1]).decode() for row in rows}
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS config_blobs (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                content BLOB NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS config_manifests (
+                hash TEXT PRIMARY KEY,
+                sections TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS config_snapshots (
+                id INTEGER PRIMARY KEY,
+                router TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                manifest TEXT NOT NULL,
+                changed TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_config_snapshots_router
+                ON config_snapshots (router, ts);
+            CREATE INDEX IF NOT EXISTS idx_config_snapshots_ts
+                ON config_snapshots (ts);
+            """
+        )
+
+    @staticmethod
+    def _insert(
+        conn: sqlite3.Connection, snapshot: ConfigSnapshot, content: dict[str, str]
+    ) -> int:
+        with conn:
+            hashes = list(set(snapshot.sections.values()))
+            stored = {
+                row[0]
+                for row in conn.execute(
+                    f"SELECT hash FROM config_blobs "
+                    f"WHERE hash IN ({', '.join('?' * len(hashes))})",
+                    hashes,
+                )
+            }
+            # Compress only what no snapshot has stored yet.
+            conn.executemany(
+                "INSERT OR IGNORE INTO config_blobs (hash, size, content) "
+                "VALUES (?, ?, ?)",
+                [
+                    (digest, len(text.encode()), zlib.compress(text.encode()))
+                    for digest, text in content.items()
+                    if digest not in stored
+                ],
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO config_manifests (hash, sections) VALUES (?, ?)",
+                (snapshot.hash, json.dumps(snapshot.sections, sort_keys=True)),
+            )
+            return conn.execute(
+                "INSERT INTO config_snapshots (router, ts, manifest, changed) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    snapshot.router,
+                    to_epoch_ms(snapshot.timestamp),
+                    snapshot.hash,
+                    json.dumps(snapshot.changed),
+                ),
+            ).lastrowid
+
+    @staticmethod
+    def _snapshot(row: tuple) -> ConfigSnapshot:
+        return ConfigSnapshot(
+            id=row[0],
+            router=row[1],
+            timestamp=from_epoch_ms(row[2]),
+            hash=row[3],
+            sections=json.loads(row[4]),
+            changed=json.loads(row[5]),
+        )
+
+
+config_snapshot_repository = SQLiteConfigSnapshotRepository(database)
@@ -0,0 +1,149 @@
+import sqlite3
+
+from app.core.settings import RouterOSConfig
+from app.lib.routeros.domain.entities import RouterInfo
+from app.lib.routeros.domain.repositories import RouterInfoRepository
+from app.lib.routeros.infrastructure.sqlite import SQLiteDatabase, database
+from app.lib.routeros.infrastructure.sqlite.system_resource_history_repository import (
+    from_epoch_ms,
+    to_epoch_ms,
+)
+
+ROUTER_COLUMNS = (
+    "name",
+    "host",
+    "port",
+    "username",
+    "password",
+    "use_ssl",
+    "ssl_verify",
+    "timeout",
+)
+INFO_COLUMNS = ("name", "host", "board_name", "platform", "version", "uptime")
+
+
+class SQLiteRouterRepository(RouterInfoRepository):
+    """SQLite store of routers registered through the API, and their RouterInfo.
+
+    RouterInfo is read from memory only: the copy is loaded by
+    :meth:`refresh`, kept current by this worker's own writes, and picked
+    up from other workers' writes on the next refresh.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self._database = database
+        self._info: dict[str, RouterInfo] = {}
+
+    async def setup(self):
+        await self._database.run(self._create_schema)
+
+    async def refresh(self) -> list[RouterOSConfig]:
+        """Reload RouterInfo and return the registered routers."""
+        routers, info = await self._database.run(self._select_all)
+        self._info = {router_info.name: router_info for router_info in info}
+        return routers
+
+    async def get_router_info(self, name: str) -> RouterInfo | None:
+        return self._info.get(name)
+
+    async def list_router_info(self) -> list[RouterInfo]:
+        return list(self._info.values())
+
+    async def update_router_info(self, router_info: RouterInfo) -> bool:
+        await self.update_many([router_info])
+        return True
+
+    async def update_many(self, router_infos: list[RouterInfo]) -> None:
+        if router_infos:
+            await self._database.run(lambda conn: self._upsert_info(conn, router_infos))
+            self._info.update((info.name, info) for info in router_infos)
+
+    async def save_router(self, entry: RouterOSConfig) -> None:
+        await self._database.run(lambda conn: self._upsert_router(conn, entry))
+
+    async def delete_router(self, name: str) -> bool:
+        deleted = await self._database.run(lambda conn: self._delete(conn, name))
+        self._info.pop(name, None)
+        return deleted
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS routers (
+                name TEXT PRIMARY KEY,
+                host TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                username TEXT NOT NULL,
+                password TEXT NOT NULL,
+                use_ssl INTEGER NOT NULL,
+                ssl_verify INTEGER NOT NULL,
+                timeout INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS router_info (
+                name TEXT PRIMARY KEY,
+                host TEXT NOT NULL,
+                board_name TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                version TEXT NOT NULL,
+                uptime TEXT NOT NULL,
+                last_updated INTEGER
+            ) WITHOUT ROWID;
+            """
+        )
+
+    @staticmethod
+    def _select_all(
+        conn: sqlite3.Connection,
+    ) -> tuple[list[RouterOSConfig], list[RouterInfo]]:
+        routers = [
+            RouterOSConfig(**dict(zip(ROUTER_COLUMNS, row, strict=True)))
+            for row in conn.execute(f"SELECT {', '.join(ROUTER_COLUMNS)} FROM routers")
+        ]
+        info = [
+            RouterInfo.model_construct(
+                **dict(zip(INFO_COLUMNS, row[:-1], strict=True)),
+                last_updated=None if row[-1] is None else from_epoch_ms(row[-1]),
+            )
+            for row in conn.execute(
+                f"SELECT {', '.join(INFO_COLUMNS)}, last_updated FROM router_info"
+            )
+        ]
+        return routers, info
+
+    @staticmethod
+    def _upsert_router(conn: sqlite3.Connection, entry: RouterOSConfig):
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO routers ({', '.join(ROUTER_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(ROUTER_COLUMNS))})",
+                tuple(getattr(entry, column) for column in ROUTER_COLUMNS),
+            )
+
+    @staticmethod
+    def _upsert_info(conn: sqlite3.Connection, router_infos: list[RouterInfo]):
+        columns = (*INFO_COLUMNS, "last_updated")
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+        with conn:
+            conn.executemany(
+                f"INSERT INTO router_info ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT (name) DO UPDATE SET {updates}",
+                [
+                    (
+                        *(getattr(info, column) for column in INFO_COLUMNS),
+                        to_epoch_ms(info.last_updated) if info.last_updated else None,
+                    )
+                    for info in router_infos
+                ],
+            )
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, name: str) -> bool:
+        with conn:
+            deleted = conn.execute("DELETE FROM routers WHERE name = ?", (name,))
+            conn.execute("DELETE FROM router_info WHERE name = ?", (name,))
+        return deleted.rowcount > 0
+
+
+router_repository = SQLiteRouterRepository(database)
@@ -0,0 +1,344 @@
+import sqlite3
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from app.lib.routeros.domain.entities import (
+    ROLLUP_METRICS,
+    ROLLUP_RESOLUTIONS,
+    MetricPoint,
+    SystemResourceSample,
+)
+from app.lib.routeros.domain.repositories import SystemResourceHistoryRepository
+from app.lib.routeros.infrastructure.sqlite import SQLiteDatabase, database
+
+SAMPLE_COLUMNS = (
+    "cpu_load",
+    "free_memory",
+    "total_memory",
+    "free_hdd_space",
+    "total_hdd_space",
+    "write_sector_total",
+    "write_sector_since_reboot",
+    "bad_blocks",
+    "uptime_seconds",
+)
+
+ROLLUP_STATS = ("min", "max", "sum", "last")
+ROLLUP_COLUMNS = tuple(
+    f"{metric}_{stat}" for metric in ROLLUP_METRICS for stat in ROLLUP_STATS
+)
+
+# Merges a batch's partial rollup into the stored one. SET expressions all
+# see the stored row, so last_ts there is the previous value.
+_MERGE = {
+    "min": "min({column}, excluded.{column})",
+    "max": "max({column}, excluded.{column})",
+    "sum": "{column} + excluded.{column}",
+    "last": "CASE WHEN excluded.last_ts >= last_ts "
+    "THEN excluded.{column} ELSE {column} END",
+}
+
+RollupKey = tuple[int, int, int]  # resolution, router_id, bucket start (ms)
+
+
+def to_epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def from_epoch_ms(value: int) -> datetime:
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+class SQLiteSystemResourceHistoryRepository(SystemResourceHistoryRepository):
+    """SQLite implementation of SystemResourceHistoryRepository.
+
+    Samples live in a ``WITHOUT ROWID`` table clustered on
+    ``(router_id, ts)``, so a router's range scan reads contiguous pages.
+    Router names are interned into ``history_routers`` to keep rows small.
+
+    Every batch also updates, in the same transaction, the min, max, sum
+    and last value of each of ``ROLLUP_METRICS`` per router and per
+    bucket of each of ``ROLLUP_RESOLUTIONS`` (UTC-aligned), so long ranges
+    and fleet-wide queries read rollups instead of samples.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self._database = database
+        self._router_ids: dict[str, int] = {}
+
+    async def setup(self):
+        await self._database.run(self._create_schema)
+        await self._database.run(self._backfill_rollups)
+
+    async def add_samples(self, samples: list[SystemResourceSample]) -> None:
+        if samples:
+            await self._database.run(lambda conn: self._insert(conn, samples))
+
+    async def get_samples(
+        self,
+        router: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 1000,
+    ) -> list[SystemResourceSample]:
+        return await self._database.run(
+            lambda conn: self._select(conn, router, start, end, limit)
+        )
+
+    async def count_samples(
+        self, router: str, start: datetime, end: datetime, limit: int
+    ) -> int:
+        return await self._database.run(
+            lambda conn: conn.execute(
+                """
+                SELECT count(*) FROM (
+                    SELECT 1 FROM resource_samples s
+                    JOIN history_routers r ON r.id = s.router_id
+                    WHERE r.name = ? AND s.ts >= ? AND s.ts < ?
+                    LIMIT ?
+                )
+                """,
+                (router, to_epoch_ms(start), to_epoch_ms(end), limit),
+            ).fetchone()[0]
+        )
+
+    async def get_rollups(
+        self,
+        router: str | None,
+        metric: str,
+        resolution: int,
+        start: datetime,
+        end: datetime,
+    ) -> list[MetricPoint]:
+        if metric not in ROLLUP_METRICS:
+            raise ValueError(f"No rollups of {metric}")
+        return await self._database.run(
+            lambda conn: self._select_rollups(
+                conn, router, metric, resolution, start, end
+            )
+        )
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS history_routers (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS resource_samples (
+                router_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                {", ".join(f"{column} INTEGER NOT NULL" for column in SAMPLE_COLUMNS)},
+                PRIMARY KEY (router_id, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS resource_rollups (
+                resolution INTEGER NOT NULL,
+                router_id INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                last_ts INTEGER NOT NULL,
+                {", ".join(f"{column} REAL NOT NULL" for column in ROLLUP_COLUMNS)},
+                PRIMARY KEY (resolution, router_id, bucket)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_resource_rollups_bucket
+                ON resource_rollups (resolution, bucket);
+            """
+        )
+
+    @classmethod
+    def _backfill_rollups(cls, conn: sqlite3.Connection):
+        """Roll up samples stored before rollups existed, once."""
+        if conn.execute("SELECT 1 FROM resource_rollups LIMIT 1").fetchone():
+            return
+        cursor = conn.execute(
+            f"SELECT router_id, ts, {', '.join(SAMPLE_COLUMNS)} FROM resource_samples"
+        )
+        with conn:
+            while rows := cursor.fetchmany(10_000):
+                cls._upsert_rollups(
+                    conn,
+                    (
+                        (
+                            row[0],
+                            row[1],
+                            SystemResourceSample.model_construct(
+                                **dict(zip(SAMPLE_COLUMNS, row[2:], strict=True))
+                            ),
+                        )
+                        for row in rows
+                    ),
+                )
+
+    @staticmethod
+    def _upsert_rollups(
+        conn: sqlite3.Connection,
+        samples: Iterable[tuple[int, int, SystemResourceSample]],
+    ):
+        # Combine the batch per bucket first: one upsert per router and
+        # bucket instead of one per sample.
+        partial: dict[RollupKey, list[float]] = {}
+        for router_id, ts, sample in samples:
+            values = [float(getattr(sample, metric)) for metric in ROLLUP_METRICS]
+            for resolution in ROLLUP_RESOLUTIONS:
+                size = resolution * 1000
+                key = (resolution, router_id, ts // size * size)
+                row = partial.get(key)
+                if row is None:
+                    partial[key] = [1, ts, *(v for v in values for _ in ROLLUP_STATS)]
+                    continue
+                row[0] += 1
+                latest = ts >= row[1]
+                row[1] = max(row[1], ts)
+                for index, value in enumerate(values):
+                    offset = 2 + index * len(ROLLUP_STATS)
+                    row[offset] = min(row[offset], value)
+                    row[offset + 1] = max(row[offset + 1], value)
+                    row[offset + 2] += value
+                    if latest:
+                        row[offset + 3] = value
+        if not partial:
+            return
+        columns = ("count", "last_ts", *ROLLUP_COLUMNS)
+        updates = ", ".join(
+            [
+                "count = count + excluded.count",
+                *(
+                    f"{metric}_{stat} = "
+                    + _MERGE[stat].format(column=f"{metric}_{stat}")
+                    for metric in ROLLUP_METRICS
+                    for stat in ROLLUP_STATS
+                ),
+                "last_ts = max(last_ts, excluded.last_ts)",
+            ]
+        )
+        conn.executemany(
+            f"INSERT INTO resource_rollups (resolution, router_id, bucket, "
+            f"{', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 3))}) "
+            f"ON CONFLICT (resolution, router_id, bucket) DO UPDATE SET {updates}",
+            [(*key, *row) for key, row in partial.items()],
+        )
+
+    def _router_id(self, conn: sqlite3.Connection, name: str) -> int:
+        router_id = self._router_ids.get(name)
+        if router_id is None:
+            conn.execute(
+                "INSERT OR IGNORE INTO history_routers (name) VALUES (?)", (name,)
+            )
+            router_id = conn.execute(
+                "SELECT id FROM history_routers WHERE name = ?", (name,)
+            ).fetchone()[0]
+            self._router_ids[name] = router_id
+        return router_id
+
+    def _insert(self, conn: sqlite3.Connection, samples: list[SystemResourceSample]):
+        placeholders = ", ".join("?" * (len(SAMPLE_COLUMNS) + 2))
+        with conn:
+            rows = [
+                (
+                    self._router_id(conn, sample.router),
+                    to_epoch_ms(sample.timestamp),
+                    *(getattr(sample, column) for column in SAMPLE_COLUMNS),
+                )
+                for sample in samples
+            ]
+            insert = (
+                f"INSERT OR IGNORE INTO resource_samples "
+                f"(router_id, ts, {', '.join(SAMPLE_COLUMNS)}) VALUES ({placeholders})"
+            )
+            # A sample already stored for the same router and time is kept,
+            # and only the rows actually inserted are rolled up, so a
+            # resubmitted batch is not counted twice.
+            inserted = []
+            for row, sample in zip(rows, samples, strict=True):
+                if conn.execute(insert, row).rowcount:
+                    inserted.append((row[0], row[1], sample))
+            self._upsert_rollups(conn, inserted)
+
+    def _select(
+        self,
+        conn: sqlite3.Connection,
+        router: str,
+        start: datetime | None,
+        end: datetime | None,
+        limit: int,
+    ) -> list[SystemResourceSample]:
+        rows = conn.execute(
+            f"""
+            SELECT s.ts, {", ".join(f"s.{column}" for column in SAMPLE_COLUMNS)}
+            FROM resource_samples s
+            JOIN history_routers r ON r.id = s.router_id
+            WHERE r.name = ? AND s.ts >= ? AND s.ts < ?
+            ORDER BY s.ts
+            LIMIT ?
+            """,
+            (
+                router,
+                to_epoch_ms(start) if start else 0,
+                to_epoch_ms(end) if end else 2**62,
+                limit,
+            ),
+        ).fetchall()
+        return [
+            SystemResourceSample.model_construct(
+                router=router,
+                timestamp=from_epoch_ms(row[0]),
+                **dict(zip(SAMPLE_COLUMNS, row[1:], strict=True)),
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def _select_rollups(
+        conn: sqlite3.Connection,
+        router: str | None,
+        metric: str,
+        resolution: int,
+        start: datetime,
+        end: datetime,
+    ) -> list[MetricPoint]:
+        size = resolution * 1000
+        # The bucket holding ``start`` is included although it begins earlier.
+        params: list[object] = [resolution, to_epoch_ms(start) // size * size]
+        params.append(to_epoch_ms(end))
+        if router is not None:
+            rows = conn.execute(
+                f"""
+                SELECT bucket, {metric}_min, {metric}_max,
+                       {metric}_sum / count, {metric}_last, count
+                FROM resource_rollups
+                WHERE resolution = ? AND bucket >= ? AND bucket < ?
+                  AND router_id = (SELECT id FROM history_routers WHERE name = ?)
+                ORDER BY bucket
+                """,
+                (*params, router),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                f"""
+                SELECT bucket, min({metric}_min), max({metric}_max),
+                       avg({metric}_sum / count), avg({metric}_last), sum(count)
+                FROM resource_rollups
+                WHERE resolution = ? AND bucket >= ? AND bucket < ?
+                GROUP BY bucket
+                ORDER BY bucket
+                """,
+                params,
+            ).fetchall()
+        return [
+            MetricPoint(
+                timestamp=from_epoch_ms(row[0]),
+                min=row[1],
+                max=row[2],
+                avg=row[3],
+                last=row[4],
+                count=row[5],
+            )
+            for row in rows
+        ]
+
+
+history_repository = SQLiteSystemResourceHistoryRepository(database)
@@ -6,3 +6,6 @@ class ConnectionConfig(Protocol):
     username: str
     password: str
     port: int
+    use_ssl: bool
+    ssl_verify: bool
+    timeout: int
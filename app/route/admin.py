@@ -0,0 +1,101 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, ConfigDict
+
+from app.core import get_settings
+from app.core.admission import LimiterStats, admission
+from app.core.profiling import profiler, render_collapsed, slow_requests
+from app.core.structure import BaseResponse
+
+settings = get_settings()
+
+router = APIRouter(prefix="/admin", tags=["admin"], include_in_schema=False)
+
+
+class SlowRequestSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    method: str
+    path: str
+    route: str
+    status: int
+    started_at: datetime
+    duration_ms: float
+    phases: dict[str, float]
+    samples: int
+
+
+def _require_profiling():
+    if not settings.profiling.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+
+# The profiler and the slow request log expose stacks of the running code.
+profiling_only = [Depends(_require_profiling)]
+
+
+@router.post("/profile", response_class=PlainTextResponse, dependencies=profiling_only)
+async def run_profile(
+    seconds: float = Query(default=10.0, gt=0),
+    interval: float | None = Query(default=None, ge=0.001),
+):
+    """Sample every thread for ``seconds``; returns collapsed stacks.
+
+    Render with e.g. ``flamegraph.pl`` or load into speedscope.
+    """
+    if seconds > settings.profiling.max_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds must be at most {settings.profiling.max_seconds}",
+        )
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return PlainTextResponse(
+        await profiler.profile(seconds, interval or settings.profiling.sample_interval)
+    )
+
+
+@router.get(
+    "/slow-requests",
+    response_model=BaseResponse[list[SlowRequestSummary]],
+    dependencies=profiling_only,
+)
+async def list_slow_requests(limit: int = Query(default=100, ge=1, le=10_000)):
+    """Recorded slow requests, newest first, without their stacks."""
+    return BaseResponse(
+        success=True,
+        data=[
+            SlowRequestSummary.model_validate(request)
+            for request in slow_requests.recent(limit)
+        ],
+    )
+
+
+@router.get(
+    "/slow-requests/{request_id}/stacks",
+    response_class=PlainTextResponse,
+    dependencies=profiling_only,
+)
+async def get_slow_request_stacks(request_id: int):
+    """Collapsed stacks sampled while one slow request was running."""
+    request = slow_requests.get(request_id)
+    if request is None:
+        raise HTTPException(status_code=404, detail=f"No slow request {request_id}")
+    return PlainTextResponse(render_collapsed(request.stacks))
+
+
+@router.delete(
+    "/slow-requests", response_model=BaseResponse[None], dependencies=profiling_only
+)
+async def clear_slow_requests():
+    slow_requests.clear()
+    return BaseResponse(success=True)
+
+
+@router.get("/admission", response_model=BaseResponse[list[LimiterStats]])
+async def get_admission():
+    """Live counters of the global limiter and of every router's limiter."""
+    return BaseResponse(success=True, data=admission.stats())
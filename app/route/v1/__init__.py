@@ -1 +1,2 @@
+from .logs import router as logs_router  # noqa
 from .routeros import router as routeros_router  # noqa
@@ -0,0 +1,47 @@
+import sqlite3
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core import get_settings
+from app.core.log_query import LogPage, LogQuery
+from app.core.structure import BaseResponse
+
+settings = get_settings()
+
+router = APIRouter(prefix="/v1/logs", tags=["logs"])
+
+log_query = LogQuery(settings.log_sink.db_path, settings.log_retention.archive_cache)
+
+
+@router.get("", response_model=BaseResponse[LogPage])
+async def get_logs(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    level: list[str] | None = Query(default=None),
+    extra: list[str] | None = Query(
+        default=None, description="Filters on extra JSON keys, as key:value"
+    ),
+    q: str | None = Query(default=None, description="FTS5 query on message"),
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    extra_filters: dict[str, str] = {}
+    for item in extra or []:
+        key, sep, value = item.partition(":")
+        if not sep:
+            raise HTTPException(status_code=400, detail=f"Invalid extra filter: {item}")
+        extra_filters[key] = value
+    try:
+        page = await log_query.search(
+            start=start,
+            end=end,
+            levels=level,
+            extra=extra_filters,
+            text=q,
+            cursor=cursor,
+            limit=limit,
+        )
+    except (ValueError, sqlite3.OperationalError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return BaseResponse(success=True, data=page)
@@ -1,38 +1,823 @@
-from fastapi import APIRouter
+import asyncio
+import math
+import re
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
 from loguru import logger
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from pydantic_core import to_json
 
-from app.core import Settings
+from app.core import get_settings
+from app.core.encoding import (
+    MSGPACK_MEDIA_TYPE,
+    choose_encoding,
+    compress_stream,
+    etag_matches,
+    pack,
+    wants_msgpack,
+)
+from app.core.responses import ClosingStreamingResponse, SnapshotRenderer
+from app.core.settings import ROUTER_NAME_PATTERN, RouterOSConfig, check_router_name
 from app.core.structure import BaseResponse
-from app.lib.routeros.application.use_cases import GetSystemResourceUseCase
-from app.lib.routeros.domain.entities import SystemResource
+from app.lib.routeros.application.broadcaster import (
+    LiveUpdate,
+    SystemResourceBroadcaster,
+)
+from app.lib.routeros.application.config_snapshots import (
+    ConfigCapture,
+    ConfigSnapshotService,
+)
+from app.lib.routeros.application.health import health_engine
+from app.lib.routeros.application.history import Downsample, HistoryQueryEngine
+from app.lib.routeros.application.scheduler import SchedulerStats, poll_scheduler
+from app.lib.routeros.application.traffic import traffic_engine
+from app.lib.routeros.application.use_cases import (
+    FleetSystemResourceResult,
+    FleetSystemResourceUseCase,
+    GetSystemResourceUseCase,
+)
+from app.lib.routeros.domain.entities import (
+    Alert,
+    AlertTransition,
+    BatchCommand,
+    BatchResult,
+    ConfigDiff,
+    ConfigSnapshot,
+    InterfaceRate,
+    MetricSeries,
+    RouterInfo,
+    SystemResource,
+    SystemResourceSample,
+)
+from app.lib.routeros.infrastructure.cache import (
+    ACTIVE_ALERTS,
+    ALERT_TRANSITIONS,
+    FLEET,
+    CachedSystemResourceRepository,
+    snapshot_cache,
+    snapshot_key,
+)
+from app.lib.routeros.infrastructure.mikrotik.batch_repository import (
+    MikroTikBatchRepository,
+)
+from app.lib.routeros.infrastructure.mikrotik.breaker import (
+    BreakerState,
+    circuit_breakers,
+)
+from app.lib.routeros.infrastructure.mikrotik.config_repository import (
+    config_source_factory,
+)
+from app.lib.routeros.infrastructure.mikrotik.constant import MikrotikResourceUri
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsCircuitOpenError,
+    RouterOsCursorNotFoundError,
+    RouterOsError,
+    RouterOsTrapError,
+)
+from app.lib.routeros.infrastructure.mikrotik.registry import router_registry
 from app.lib.routeros.infrastructure.mikrotik.system_resource_repository import (
     MikroTikSystemResourceRepository,
 )
+from app.lib.routeros.infrastructure.mikrotik.table_repository import (
+    MikroTikTableRepository,
+)
 from app.lib.routeros.infrastructure.mikrotik.types import (
     MikrotikConnectionConfig,
 )
+from app.lib.routeros.infrastructure.sqlite.config_snapshot_repository import (
+    config_snapshot_repository,
+)
+from app.lib.routeros.infrastructure.sqlite.router_repository import (
+    router_repository,
+)
+from app.lib.routeros.infrastructure.sqlite.system_resource_history_repository import (
+    history_repository,
+)
 
-settings = Settings()  # pyright: ignore
+settings = get_settings()
 
 router = APIRouter(prefix="/v1/routeros", tags=["routeros"])
 
+# Bytes of NDJSON gathered before a chunk is handed to the server.
+STREAM_CHUNK_SIZE = 64 * 1024
 
-@router.get("/system-resource", response_model=BaseResponse[SystemResource])
-async def get_mikrotik_resource():
-    mikrotik_connection_config = MikrotikConnectionConfig(
-        host=settings.routeros.host,
-        username=settings.routeros.username,
-        password=settings.routeros.password,
-        port=settings.routeros.port,
-    )
-    use_case = GetSystemResourceUseCase(
-        system_resource_repo=MikroTikSystemResourceRepository(
-            mikrotik_connection_config
-        ),
+_FILTER = re.compile(r"^(-?)([A-Za-z0-9.-]+)(?:([=<>])(.*))?$")
+
+fleet_result_adapter = TypeAdapter(FleetSystemResourceResult)
+live_update_adapter = TypeAdapter(LiveUpdate)
+system_resource_renderer = SnapshotRenderer(TypeAdapter(SystemResource))
+
+history_query = HistoryQueryEngine(history_repository)
+config_snapshots = ConfigSnapshotService(
+    config_snapshot_repository,
+    source_factory=config_source_factory(settings.config_snapshots),
+    routers=router_registry.all,
+    deadline=settings.config_snapshots.timeout * 2,
+)
+
+broadcaster = SystemResourceBroadcaster(
+    repo_factory=MikroTikSystemResourceRepository,
+    interval=settings.live.interval,
+    queue_size=settings.live.queue_size,
+)
+
+
+def cached_system_resource_repository(
+    config: MikrotikConnectionConfig,
+) -> CachedSystemResourceRepository:
+    return CachedSystemResourceRepository(
+        MikroTikSystemResourceRepository(config),
+        router=snapshot_key(config),
+        cache=snapshot_cache,
     )
+
+
+def _get_router_config(router_name: str) -> MikrotikConnectionConfig:
+    config = router_registry.get(router_name)
+    if config is None:
+        raise HTTPException(status_code=404, detail=f"Unknown router {router_name}")
+    return config
+
+
+def _parse_filters(filters: list[str] | None) -> list[str]:
+    """Turn ``key=value``, ``key>value``, ``key<value``, ``key`` and ``-key``
+    filters into RouterOS query words."""
+    queries = []
+    for item in filters or []:
+        match = _FILTER.match(item)
+        if match is None or (match[1] and match[3]):
+            raise HTTPException(status_code=400, detail=f"Invalid filter: {item}")
+        negate, key, op, value = match.groups()
+        if op is None:
+            queries.append(f"?{negate}{key}")
+        elif op == "=":
+            queries.append(f"?{key}={value}")
+        else:
+            queries.append(f"?{op}{key}={value}")
+    return queries
+
+
+def _router_http_error(error: Exception) -> HTTPException:
+    """Map a failure talking to a router onto the matching HTTP error."""
+    if isinstance(error, RouterOsTrapError):
+        return HTTPException(status_code=400, detail=str(error))
+    if isinstance(error, RouterOsCursorNotFoundError):
+        return HTTPException(status_code=410, detail=str(error))
+    if isinstance(error, RouterOsCircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"Retry-After": str(math.ceil(error.retry_after))},
+        )
+    if isinstance(error, TimeoutError):
+        return HTTPException(status_code=504, detail=str(error))
+    return HTTPException(status_code=502, detail=str(error))
+
+
+@dataclass
+class TableQuery:
+    """Projection, filters and resumption cursor for a table stream."""
+
+    fields: str | None = Query(
+        default=None, description="Comma-separated properties to return"
+    )
+    filters: list[str] | None = Query(
+        default=None,
+        alias="filter",
+        description="Filters pushed down to the router: key=value, key>value, "
+        "key<value, key (has property) or -key (lacks it)",
+    )
+    after: str | None = Query(
+        default=None,
+        description="Resume after the row with this .id; 410 if it was removed",
+    )
+    limit: int | None = Query(default=None, ge=1)
+    accept: str | None = Header(default=None, include_in_schema=False)
+    accept_encoding: str | None = Header(default=None, include_in_schema=False)
+
+
+class BatchCommandRequest(BaseModel):
+    path: str = Field(pattern=r"^(/[A-Za-z0-9-]+)+$", examples=["/system/resource"])
+    filters: list[str] = Field(
+        default_factory=list, description="Same syntax as the table endpoints"
+    )
+    fields: list[str] | None = None
+    limit: int = Field(default=1000, ge=1, le=10_000)
+
+
+class BatchRequest(BaseModel):
+    commands: list[BatchCommandRequest] = Field(min_length=1, max_length=32)
+    deadline: float | None = Field(
+        default=None, gt=0, description="Seconds allowed per command"
+    )
+
+
+class RouterRegistration(BaseModel):
+    host: str = Field(min_length=1)
+    username: str
+    password: str = ""
+    port: int = Field(default=8728, ge=1, le=65535)
+    use_ssl: bool = False
+    ssl_verify: bool = False
+    timeout: int = Field(default=5, ge=1)
+
+
+class NewRouter(RouterRegistration):
+    name: str = Field(pattern=ROUTER_NAME_PATTERN)
+
+    @field_validator("name")
+    @classmethod
+    def _check_name(cls, name: str) -> str:
+        return check_router_name(name)
+
+
+class RegisteredRouter(BaseModel):
+    """A known router as listed by the API; the password is never returned."""
+
+    name: str
+    host: str
+    port: int
+    username: str
+    use_ssl: bool
+    ssl_verify: bool
+    timeout: int
+    source: Literal["settings", "api"]
+    info: RouterInfo | None = None
+
+
+async def _stream_table(
+    router_name: str, path: str, query: TableQuery
+) -> StreamingResponse:
+    config = _get_router_config(router_name)
+    repository = MikroTikTableRepository(config, path)
+    fields = query.fields
+    rows = repository.stream_rows(
+        queries=_parse_filters(query.filters),
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        after=query.after,
+        limit=query.limit,
+    )
+    # Wait for the first row so connection and query errors still get a
+    # proper status code instead of a truncated 200.
+    try:
+        first = await anext(rows, None)
+    except (RouterOsError, ConnectionError, TimeoutError) as e:
+        await rows.aclose()
+        raise _router_http_error(e) from e
+
+    # NDJSON, or concatenated MessagePack maps when the client prefers it.
+    packed = wants_msgpack(query.accept)
+    encode, separator = (pack, b"") if packed else (to_json, b"\n")
+
+    async def encoded() -> AsyncIterator[bytes]:
+        if first is None:
+            return
+        chunk = [encode(first)]
+        size = len(chunk[0])
+        try:
+            async for row in rows:
+                item = encode(row)
+                chunk.append(item)
+                size += len(item) + 1
+                if size >= STREAM_CHUNK_SIZE:
+                    yield separator.join(chunk) + separator
+                    chunk, size = [], 0
+        except (RouterOsError, ConnectionError, TimeoutError) as e:
+            logger.warning("Streaming {} from {} failed: {}", path, router_name, e)
+            chunk.append(encode({"error": str(e)}))
+        finally:
+            await rows.aclose()
+        if chunk:
+            yield separator.join(chunk) + separator
+
+    body = encoded()
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = choose_encoding(query.accept_encoding)
+    if encoding is not None:
+        body = compress_stream(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return ClosingStreamingResponse(
+        body,
+        media_type=MSGPACK_MEDIA_TYPE if packed else "application/x-ndjson",
+        headers=headers,
+    )
+
+
+@router.get("/system-resource", response_model=BaseResponse[SystemResource])
+async def get_mikrotik_resource(
+    response: Response,
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+):
+    # The registry's entry, so the default router shares its cache and
+    # breaker keys and keeps its configured TLS and timeout.
+    mikrotik_connection_config = router_registry.get(
+        settings.routeros.name
+    ) or router_registry.to_config(settings.routeros)
+    repository = cached_system_resource_repository(mikrotik_connection_config)
+    use_case = GetSystemResourceUseCase(system_resource_repo=repository)
     logger.info(
         "Fetching system resource from MikroTik router at {}",
         mikrotik_connection_config.host,
     )
-    response = await use_case.execute(mikrotik_connection_config)
-    return response
+    result = await use_case.execute(mikrotik_connection_config)
+    headers = {}
+    if repository.cache_status:
+        headers["X-Cache"] = repository.cache_status
+        headers["Age"] = str(int(repository.cache_age))
+    if not result.success or result.data is None:
+        response.headers.update(headers)
+        breaker = circuit_breakers.find(mikrotik_connection_config)
+        if breaker is not None and breaker.retry_after:
+            response.headers["Retry-After"] = str(math.ceil(breaker.retry_after))
+        return result
+
+    # The timestamp is when the snapshot was taken, so the body is the same
+    # for every request it serves.
+    rendered = system_resource_renderer.render(
+        snapshot_key(mikrotik_connection_config),
+        result.data,
+        datetime.now() - timedelta(seconds=repository.cache_age),
+    )
+    headers["ETag"] = rendered.etag
+    headers["Vary"] = "Accept"
+    if etag_matches(if_none_match, rendered.etag):
+        return Response(status_code=304, headers=headers)
+    if wants_msgpack(accept):
+        return Response(
+            rendered.packed(), media_type=MSGPACK_MEDIA_TYPE, headers=headers
+        )
+    return Response(rendered.body, media_type="application/json", headers=headers)
+
+
+@router.get("/breakers", response_model=BaseResponse[list[BreakerState]])
+async def get_circuit_breakers():
+    """Circuit breaker state and adaptive timeout of every router seen so far."""
+    return BaseResponse(success=True, data=circuit_breakers.states())
+
+
+@router.get("/collector/schedule", response_model=BaseResponse[SchedulerStats])
+async def get_collector_schedule(
+    detail: bool = Query(default=False, description="Include every router"),
+):
+    """Lag and intervals of the adaptive poller, on the worker running it."""
+    return BaseResponse(success=True, data=poll_scheduler.stats(detail))
+
+
+async def _registered_router(name: str) -> RegisteredRouter:
+    config = _get_router_config(name)
+    return RegisteredRouter(
+        name=name,
+        host=config.host,
+        port=config.port,
+        username=config.username,
+        use_ssl=config.use_ssl,
+        ssl_verify=config.ssl_verify,
+        timeout=config.timeout,
+        source="settings" if router_registry.configured(name) else "api",
+        info=await router_repository.get_router_info(name),
+    )
+
+
+async def _store_router(name: str, registration: RouterRegistration):
+    if router_registry.configured(name):
+        raise HTTPException(
+            status_code=409, detail=f"Router {name} is defined in the settings"
+        )
+    previous = router_registry.get(name)
+    await router_repository.save_router(
+        RouterOSConfig(name=name, **registration.model_dump(exclude={"name"}))
+    )
+    router_registry.sync(await router_repository.refresh())
+    if previous is not None:
+        snapshot_cache.invalidate(snapshot_key(previous))
+
+
+@router.get("/routers", response_model=BaseResponse[list[RegisteredRouter]])
+async def list_routers():
+    """Every known router with its last RouterInfo, served from memory."""
+    return BaseResponse(
+        success=True,
+        data=[await _registered_router(name) for name in router_registry.all()],
+    )
+
+
+@router.post("/routers", response_model=BaseResponse[RegisteredRouter], status_code=201)
+async def create_router(registration: NewRouter):
+    if router_registry.get(registration.name) is not None:
+        raise HTTPException(
+            status_code=409, detail=f"Router {registration.name} already exists"
+        )
+    await _store_router(registration.name, registration)
+    return BaseResponse(success=True, data=await _registered_router(registration.name))
+
+
+@router.get("/routers/{router_name}", response_model=BaseResponse[RegisteredRouter])
+async def get_router(router_name: str):
+    return BaseResponse(success=True, data=await _registered_router(router_name))
+
+
+@router.put("/routers/{router_name}", response_model=BaseResponse[RegisteredRouter])
+async def replace_router(
+    registration: RouterRegistration,
+    router_name: str = Path(pattern=ROUTER_NAME_PATTERN),
+):
+    """Register a router under this name, or replace its connection details."""
+    try:
+        check_router_name(router_name)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    await _store_router(router_name, registration)
+    return BaseResponse(success=True, data=await _registered_router(router_name))
+
+
+@router.delete("/routers/{router_name}", response_model=BaseResponse[None])
+async def delete_router(router_name: str):
+    config = _get_router_config(router_name)
+    if router_registry.configured(router_name):
+        raise HTTPException(
+            status_code=409, detail=f"Router {router_name} is defined in the settings"
+        )
+    await router_repository.delete_router(router_name)
+    router_registry.sync(await router_repository.refresh())
+    snapshot_cache.invalidate(snapshot_key(config))
+    return BaseResponse(success=True)
+
+
+@router.post("/{router_name}/breaker/reset", response_model=BaseResponse[BreakerState])
+async def reset_circuit_breaker(router_name: str):
+    """Close a router's circuit, e.g. after fixing it, without waiting."""
+    config = _get_router_config(router_name)
+    breaker = circuit_breakers.get(config)
+    breaker.reset()
+    return BaseResponse(success=True, data=breaker.snapshot(config.timeout))
+
+
+@router.get("/fleet/system-resource", response_class=StreamingResponse)
+async def get_fleet_system_resource(
+    routers: str | None = Query(
+        default=None, description="Comma-separated router names; all if omitted"
+    ),
+    max_concurrency: int | None = Query(default=None, ge=1),
+    deadline: float | None = Query(default=None, gt=0),
+):
+    """Stream one NDJSON line per router as each router answers."""
+    targets = router_registry.all()
+    if routers:
+        names = {name.strip() for name in routers.split(",")}
+        targets = {name: cfg for name, cfg in targets.items() if name in names}
+
+    use_case = FleetSystemResourceUseCase(
+        repo_factory=cached_system_resource_repository,
+        max_concurrency=max_concurrency or settings.fleet.max_concurrency,
+        deadline=deadline or settings.fleet.deadline,
+    )
+    logger.info("Fetching system resource from {} routers", len(targets))
+
+    async def ndjson() -> AsyncIterator[bytes]:
+        async for result in use_case.execute(targets):
+            yield fleet_result_adapter.dump_json(result) + b"\n"
+
+    return ClosingStreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/{router_name}/history/system-resource",
+    response_model=BaseResponse[list[SystemResourceSample]],
+)
+async def get_system_resource_history(
+    router_name: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(default=1000, ge=1, le=100_000),
+):
+    """Serve recorded samples without contacting the router."""
+    _get_router_config(router_name)
+    samples = await history_repository.get_samples(router_name, start, end, limit)
+    return BaseResponse(success=True, data=samples)
+
+
+async def _metric_series(
+    router_name: str | None,
+    metric: str,
+    start: datetime | None,
+    end: datetime | None,
+    points: int,
+    downsample: Downsample,
+) -> BaseResponse[MetricSeries]:
+    try:
+        series = await history_query.series(
+            router_name, metric, start, end, points, downsample
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return BaseResponse(success=True, data=series)
+
+
+@router.get(
+    "/fleet/history/system-resource/{metric}",
+    response_model=BaseResponse[MetricSeries],
+)
+async def get_fleet_metric_history(
+    metric: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    points: int = Query(default=500, ge=2, le=10_000),
+    downsample: Downsample = "lttb",
+):
+    """One metric across the fleet, per rollup bucket; the last day by default."""
+    return await _metric_series(None, metric, start, end, points, downsample)
+
+
+@router.get(
+    "/{router_name}/history/system-resource/{metric}",
+    response_model=BaseResponse[MetricSeries],
+)
+async def get_metric_history(
+    router_name: str,
+    metric: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    points: int = Query(default=500, ge=2, le=10_000),
+    downsample: Downsample = "lttb",
+):
+    """One metric of a router in at most ``points`` points; the last day by default."""
+    _get_router_config(router_name)
+    return await _metric_series(router_name, metric, start, end, points, downsample)
+
+
+@router.get(
+    "/{router_name}/interfaces/{interface_name}/traffic",
+    response_model=BaseResponse[list[InterfaceRate]],
+)
+async def get_interface_traffic(router_name: str, interface_name: str):
+    """Recent rates of one interface, oldest first, from memory."""
+    _get_router_config(router_name)
+    return BaseResponse(
+        success=True, data=traffic_engine.series(router_name, interface_name)
+    )
+
+
+@router.get("/fleet/traffic/top", response_model=BaseResponse[list[InterfaceRate]])
+async def get_fleet_traffic_top(
+    n: int = Query(default=10, ge=1, le=1000),
+    metric: str = "total_bps",
+    router_name: str | None = Query(default=None, alias="router"),
+    max_age: float | None = Query(default=None, gt=0),
+):
+    """Busiest interfaces across the fleet by their latest rate."""
+    try:
+        rates = traffic_engine.top(n, metric, router_name, max_age)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return BaseResponse(success=True, data=rates)
+
+
+def _active_alerts(
+    router_name: str | None = None, severity: str | None = None
+) -> list[Alert]:
+    # Workers that do not poll serve the set published by the one that does.
+    alerts = snapshot_cache.peek(FLEET, ACTIVE_ALERTS).value
+    if alerts is None:
+        return health_engine.active(router_name, severity)
+    return [
+        alert
+        for alert in alerts
+        if (router_name is None or alert.router == router_name)
+        and (severity is None or alert.severity == severity)
+    ]
+
+
+@router.get("/alerts", response_model=BaseResponse[list[Alert]])
+async def get_alerts(
+    router_name: str | None = Query(default=None, alias="router"),
+    severity: Literal["info", "warning", "critical"] | None = None,
+):
+    """Alerts currently firing across the fleet, from memory."""
+    return BaseResponse(success=True, data=_active_alerts(router_name, severity))
+
+
+@router.get("/alerts/transitions", response_model=BaseResponse[list[AlertTransition]])
+async def get_alert_transitions(limit: int = Query(default=100, ge=1, le=10_000)):
+    """Most recent alert state changes, newest first.
+
+    Only the polling worker evaluates rules; the others serve the newest
+    transitions it published, up to ``PUBLISHED_TRANSITIONS`` of them.
+    """
+    transitions = health_engine.transitions(limit)
+    if not transitions:
+        transitions = snapshot_cache.peek(FLEET, ALERT_TRANSITIONS).value or []
+    return BaseResponse(success=True, data=transitions[:limit])
+
+
+@router.get("/{router_name}/alerts", response_model=BaseResponse[list[Alert]])
+async def get_router_alerts(router_name: str):
+    _get_router_config(router_name)
+    return BaseResponse(success=True, data=_active_alerts(router_name))
+
+
+@router.get("/{router_name}/live/system-resource", response_class=StreamingResponse)
+async def stream_system_resource(router_name: str):
+    """Push system resource updates as Server-Sent Events."""
+    config = _get_router_config(router_name)
+
+    async def events() -> AsyncIterator[bytes]:
+        async with broadcaster.subscribe(router_name, config) as subscription:
+            while True:
+                try:
+                    update = await asyncio.wait_for(
+                        subscription.get(), settings.live.heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"data: " + live_update_adapter.dump_json(update) + b"\n\n"
+
+    return ClosingStreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{router_name}/live/system-resource/ws")
+async def websocket_system_resource(websocket: WebSocket, router_name: str):
+    """Push system resource updates over a WebSocket."""
+    config = router_registry.get(router_name)
+    if config is None:
+        await websocket.close(code=1008, reason=f"Unknown router {router_name}")
+        return
+    await websocket.accept()
+    try:
+        async with broadcaster.subscribe(router_name, config) as subscription:
+            while True:
+                update = await subscription.get()
+                await websocket.send_text(
+                    live_update_adapter.dump_json(update).decode()
+                )
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: sending after the client has gone away.
+        pass
+
+
+@router.get("/{router_name}/interface", response_class=StreamingResponse)
+async def stream_interfaces(router_name: str, query: TableQuery = Depends()):
+    """Stream the interface table as NDJSON."""
+    return await _stream_table(router_name, MikrotikResourceUri.INTERFACE, query)
+
+
+@router.get("/{router_name}/ip/address", response_class=StreamingResponse)
+async def stream_ip_addresses(router_name: str, query: TableQuery = Depends()):
+    """Stream the IP address table as NDJSON."""
+    return await _stream_table(router_name, MikrotikResourceUri.IP_ADDRESS, query)
+
+
+@router.get("/{router_name}/ip/route", response_class=StreamingResponse)
+async def stream_ip_routes(router_name: str, query: TableQuery = Depends()):
+    """Stream the routing table as NDJSON, without buffering it."""
+    return await _stream_table(router_name, MikrotikResourceUri.IP_ROUTE, query)
+
+
+@router.post("/{router_name}/batch", response_model=BaseResponse[BatchResult])
+async def run_batch(router_name: str, request: BatchRequest):
+    """Run several prints on one router session and return every result.
+
+    Commands run concurrently as tagged commands on one connection. A
+    failing command is reported in its own result; the request only fails
+    when none of them could reach the router.
+    """
+    config = _get_router_config(router_name)
+    commands = [
+        BatchCommand(
+            path=command.path,
+            queries=_parse_filters(command.filters),
+            fields=command.fields,
+            limit=command.limit,
+        )
+        for command in request.commands
+    ]
+    started = time.perf_counter()
+    try:
+        results = await MikroTikBatchRepository(config).run_batch(
+            commands, request.deadline or settings.fleet.deadline
+        )
+    except (RouterOsError, ConnectionError, TimeoutError) as e:
+        raise _router_http_error(e) from e
+    return BaseResponse(
+        success=all(result.status == "ok" for result in results),
+        data=BatchResult(
+            router=router_name,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+            results=results,
+        ),
+    )
+
+
+@router.get("/fleet/config/changes", response_model=BaseResponse[list[ConfigSnapshot]])
+async def get_fleet_config_changes(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(default=100, ge=1, le=10_000),
+):
+    """Configuration changes across the fleet, newest first."""
+    snapshots = await config_snapshot_repository.list_snapshots(None, start, end, limit)
+    return BaseResponse(success=True, data=snapshots)
+
+
+@router.post(
+    "/{router_name}/config/snapshots", response_model=BaseResponse[ConfigCapture]
+)
+async def capture_config(router_name: str):
+    """Capture the router's configuration now; stored only if it changed."""
+    config = _get_router_config(router_name)
+    try:
+        capture = await config_snapshots.capture(router_name, config)
+    except (RouterOsError, ConnectionError, TimeoutError) as e:
+        raise _router_http_error(e) from e
+    return BaseResponse(success=True, data=capture)
+
+
+@router.get(
+    "/{router_name}/config/snapshots",
+    response_model=BaseResponse[list[ConfigSnapshot]],
+)
+async def get_config_changes(
+    router_name: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(default=100, ge=1, le=10_000),
+):
+    """The router's configuration changes, newest first, from storage only."""
+    _get_router_config(router_name)
+    snapshots = await config_snapshot_repository.list_snapshots(
+        router_name, start, end, limit
+    )
+    return BaseResponse(success=True, data=snapshots)
+
+
+async def _router_snapshot(router_name: str, snapshot_id: int) -> ConfigSnapshot:
+    snapshot = await config_snapshot_repository.get_snapshot(snapshot_id)
+    if snapshot is None or snapshot.router != router_name:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown snapshot {snapshot_id} of {router_name}"
+        )
+    return snapshot
+
+
+@router.get(
+    "/{router_name}/config/snapshots/{snapshot_id}",
+    response_model=BaseResponse[ConfigSnapshot],
+)
+async def get_config_snapshot(router_name: str, snapshot_id: int):
+    """One snapshot with the text of every section."""
+    snapshot = await _router_snapshot(router_name, snapshot_id)
+    return BaseResponse(
+        success=True, data=await config_snapshots.with_content(snapshot)
+    )
+
+
+@router.get("/{router_name}/config/diff", response_model=BaseResponse[ConfigDiff])
+async def get_config_diff(
+    router_name: str,
+    target: int | None = Query(default=None, description="Snapshot id; the latest"),
+    source: int | None = Query(
+        default=None,
+        description="Snapshot id, of any router; the one before target by default",
+    ),
+    context: int = Query(default=3, ge=0, le=100),
+):
+    """Diff two snapshots, section by section, skipping identical sections."""
+    _get_router_config(router_name)
+    if target is None:
+        to = await config_snapshot_repository.get_latest(router_name)
+        if to is None:
+            raise HTTPException(
+                status_code=404, detail=f"No config snapshots of {router_name}"
+            )
+    else:
+        to = await _router_snapshot(router_name, target)
+    if source is None:
+        since = await config_snapshot_repository.get_latest(router_name, to.id)
+    else:
+        since = await config_snapshot_repository.get_snapshot(source)
+    if since is None:
+        raise HTTPException(status_code=404, detail="No snapshot to compare with")
+    return BaseResponse(
+        success=True, data=await config_snapshots.diff(since, to, context)
+    )
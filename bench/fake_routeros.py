@@ -0,0 +1,316 @@
+import asyncio
+import ipaddress
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from app.lib.routeros.infrastructure.mikrotik.protocol import (
+    encode_sentence,
+    parse_reply,
+    read_sentence,
+)
+
+
+@dataclass
+class FakeRouterOsOptions:
+    """Behaviour knobs for the fake router."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    interface_rows: int = 64
+    address_rows: int = 64
+    route_rows: int = 100_000
+    seed: int | None = None
+
+
+def system_resource_row(tick: int = 0) -> dict[str, str]:
+    return {
+        "uptime": f"1w2d03:04:{tick % 60:02d}",
+        "version": "7.16 (stable)",
+        "build-time": "2024-09-20 13:00:27",
+        "factory-firmware": "7.14",
+        "free-memory": str(180 * 1024 * 1024 - tick % 1024),
+        "total-memory": str(256 * 1024 * 1024),
+        "cpu": "ARMv7",
+        "cpu-count": "4",
+        "cpu-frequency": "716",
+        "cpu-load": str(tick % 100),
+        "free-hdd-space": str(100 * 1024 * 1024),
+        "total-hdd-space": "128MiB",
+        "write-sector-since-reboot": str(1000 + tick),
+        "write-sector-total": str(500_000 + tick),
+        "bad-blocks": "0",
+        "architecture-name": "arm",
+        "board-name": "RB4011iGS+",
+        "platform": "MikroTik",
+    }
+
+
+def interface_rows(count: int, tick: int = 0) -> Iterator[dict[str, str]]:
+    for index in range(count):
+        yield {
+            ".id": f"*{index + 1:X}",
+            "name": f"ether{index + 1}",
+            "type": "ether",
+            "mtu": "1500",
+            "mac-address": f"48:8F:5A:{index >> 16 & 0xFF:02X}:{index >> 8 & 0xFF:02X}:{index & 0xFF:02X}",
+            "rx-byte": str((index + 1) * 1_000_000 + tick * 125_000 * (index % 7 + 1)),
+            "tx-byte": str((index + 1) * 2_000_000 + tick * 250_000 * (index % 5 + 1)),
+            "rx-packet": str((index + 1) * 1_000 + tick * 100),
+            "tx-packet": str((index + 1) * 2_000 + tick * 200),
+            "running": "true" if index % 9 else "false",
+            "disabled": "false",
+        }
+
+
+def address_rows(count: int) -> Iterator[dict[str, str]]:
+    for index in range(count):
+        yield {
+            ".id": f"*{index + 1:X}",
+            "address": f"10.{index >> 8 & 0xFF}.{index & 0xFF}.1/24",
+            "network": f"10.{index >> 8 & 0xFF}.{index & 0xFF}.0",
+            "interface": f"ether{index % 64 + 1}",
+            "dynamic": "false",
+            "disabled": "false",
+        }
+
+
+def route_rows(count: int) -> Iterator[dict[str, str]]:
+    base = int(ipaddress.IPv4Address("1.0.0.0"))
+    for index in range(count):
+        network = ipaddress.IPv4Address(base + (index << 8))
+        yield {
+            ".id": f"*{index + 1:X}",
+            "dst-address": f"{network}/24",
+            "gateway": f"192.0.2.{index % 250 + 1}",
+            "distance": "20",
+            "scope": "40",
+            "target-scope": "10",
+            "routing-table": "main",
+            "active": "true",
+            "bgp": "true",
+        }
+
+
+class FakeRouterOsServer:
+    """In-process server speaking the RouterOS API binary protocol.
+
+    Supports login, ``print`` on the menus the app uses (with ``.proplist``
+    and ``?key=value`` filters), ``=interval=`` listening, ``/export`` and
+    ``/cancel``. Latency, jitter and a trap failure rate are applied per
+    command so benchmarks can model slow or flaky routers.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        options: FakeRouterOsOptions | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.options = options or FakeRouterOsOptions()
+        self.commands = 0
+        self._random = random.Random(self.options.seed)
+        self._server: asyncio.Server | None = None
+        self._tick = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def rows(self, path: str) -> Iterator[dict[str, str]]:
+        self._tick += 1
+        if path == "/system/resource":
+            return iter([system_resource_row(self._tick)])
+        if path == "/system/identity":
+            return iter([{"name": "fake-router"}])
+        if path == "/system/health":
+            return iter([{"name": "voltage", "value": "24.1", "type": "V"}])
+        if path == "/interface":
+            return interface_rows(self.options.interface_rows, self._tick)
+        if path == "/ip/address":
+            return address_rows(self.options.address_rows)
+        if path == "/ip/route":
+            return route_rows(self.options.route_rows)
+        raise KeyError(path)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks: dict[str, asyncio.Task[None]] = {}
+        try:
+            while True:
+                words = await read_sentence(reader)
+                if not words:
+                    continue
+                command, tag, attributes = parse_reply(words)
+                queries = [w[1:] for w in words[1:] if w.startswith("?")]
+                if command == "/cancel":
+                    task = tasks.pop(attributes.get("tag", ""), None)
+                    if task is not None:
+                        task.cancel()
+                    self._reply(writer, "!done", tag)
+                    continue
+                task = asyncio.create_task(
+                    self._run(writer, command, tag, attributes, queries)
+                )
+                if tag is not None:
+                    tasks[tag] = task
+                    task.add_done_callback(lambda _, tag=tag: tasks.pop(tag, None))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            writer.close()
+
+    async def _run(
+        self,
+        writer: asyncio.StreamWriter,
+        command: str,
+        tag: str | None,
+        attributes: dict[str, str],
+        queries: list[str],
+    ):
+        self.commands += 1
+        try:
+            await self._delay()
+            if command == "/login":
+                self._reply(writer, "!done", tag)
+                return
+            if self._random.random() < self.options.failure_rate:
+                self._reply(writer, "!trap", tag, {"message": "simulated failure"})
+                self._reply(writer, "!done", tag)
+                return
+            if command == "/export":
+                for line in self.export_lines():
+                    self._reply(writer, "!re", tag, {"ret": line})
+                self._reply(writer, "!done", tag)
+                return
+            path, _, action = command.rpartition("/")
+            if action != "print":
+                raise KeyError(command)
+            proplist = attributes.get(".proplist")
+            interval = attributes.get("interval")
+            while True:
+                for index, row in enumerate(self.rows(path)):
+                    if index % 64 == 0:
+                        # Loopback sockets rarely push back, so drain() alone
+                        # would let one big print starve the event loop.
+                        await asyncio.sleep(0)
+                    if all(_matches(row, query) for query in queries):
+                        if proplist:
+                            row = {k: row[k] for k in proplist.split(",") if k in row}
+                        self._reply(writer, "!re", tag, row)
+                        await writer.drain()
+                if not interval:
+                    break
+                await asyncio.sleep(_parse_interval(interval))
+            self._reply(writer, "!done", tag)
+        except KeyError:
+            self._reply(writer, "!trap", tag, {"message": "no such command"})
+            self._reply(writer, "!done", tag)
+        except asyncio.CancelledError:
+            self._reply(
+                writer, "!trap", tag, {"category": "2", "message": "interrupted"}
+            )
+            self._reply(writer, "!done", tag)
+        except ConnectionError:
+            pass
+
+    def export_lines(self) -> list[str]:
+        lines = ["# software id = FAKE-0000", "/interface ethernet"]
+        lines += [
+            f"set [ find default-name=ether{i} ] comment=port{i}" for i in range(1, 9)
+        ]
+        lines += [
+            "/ip address",
+            f"add address=10.0.0.1/24 interface=ether1 comment=tick{self._tick}",
+        ]
+        return lines
+
+    async def _delay(self):
+        delay = self.options.latency
+        if self.options.jitter:
+            delay += self._random.uniform(0, self.options.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _reply(
+        writer: asyncio.StreamWriter,
+        reply: str,
+        tag: str | None,
+        attributes: dict[str, str] | None = None,
+    ):
+        if writer.is_closing():
+            return
+        words = [reply, *(f"={k}={v}" for k, v in (attributes or {}).items())]
+        if tag is not None:
+            words.append(f".tag={tag}")
+        writer.write(encode_sentence(words))
+
+
+def _matches(row: dict[str, str], query: str) -> bool:
+    """Evaluate one ``?`` query word, without the leading ``?``."""
+    op = query[0] if query[0] in "<>-" else "="
+    key, sep, value = query.lstrip("<>-").partition("=")
+    if op == "-":
+        return key not in row
+    if not sep:
+        return key in row
+    if op == "=":
+        return row.get(key) == value
+    if key not in row:
+        return False
+    left, right = row[key], value
+    if left.isdigit() and right.isdigit():
+        return int(left) > int(right) if op == ">" else int(left) < int(right)
+    return left > right if op == ">" else left < right
+
+
+def _parse_interval(value: str) -> float:
+    if value.endswith("ms"):
+        return int(value[:-2]) / 1000
+    if value.endswith("s"):
+        return float(value[:-1])
+    return float(value)
+
+
+async def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake RouterOS API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8728)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--interface-rows", type=int, default=64)
+    parser.add_argument("--route-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    server = FakeRouterOsServer(
+        args.host,
+        args.port,
+        FakeRouterOsOptions(
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            interface_rows=args.interface_rows,
+            route_rows=args.route_rows,
+        ),
+    )
+    await server.start()
+    print(f"Fake RouterOS API listening on {server.host}:{server.port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
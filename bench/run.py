@@ -0,0 +1,372 @@
+"""Drive the app against the fake RouterOS server and report latency.
+
+Usage::
+
+    uv run python -m bench.run
+    uv run python -m bench.run --scenario system-resource-uncached --latency 0.02
+    uv run python -m bench.run --save-baseline bench/baseline.json
+    uv run python -m bench.run --compare bench/baseline.json --tolerance 0.2
+
+Requests are sent in-process through ``httpx.ASGITransport`` so the numbers
+measure the app and the RouterOS client, not a network stack. Pass ``--url``
+to load-test an already running server instead.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+from bench.fake_routeros import FakeRouterOsOptions, FakeRouterOsServer
+
+
+@dataclass
+class Scenario:
+    """One endpoint to load, plus app state it needs before the run."""
+
+    path: str
+    description: str
+    cache: bool = True
+    streaming: bool = False
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "system-resource": Scenario(
+        "/api/v1/routeros/system-resource",
+        "Single router, snapshot cache enabled",
+    ),
+    "system-resource-uncached": Scenario(
+        "/api/v1/routeros/system-resource",
+        "Single router, every request goes to the router",
+        cache=False,
+    ),
+    "system-resource-revalidate": Scenario(
+        "/api/v1/routeros/system-resource",
+        "Single router, client revalidating its copy (304 while unchanged)",
+        headers={"If-None-Match": "*"},
+    ),
+    "fleet-system-resource": Scenario(
+        "/api/v1/routeros/fleet/system-resource",
+        "All registered routers, streamed as NDJSON",
+        cache=False,
+        streaming=True,
+    ),
+    "ip-route-stream": Scenario(
+        "/api/v1/routeros/default/ip/route?fields=dst-address,gateway",
+        "Full routing table streamed as NDJSON with a projection",
+        streaming=True,
+        headers={"Accept-Encoding": "identity"},
+    ),
+    "ip-route-stream-gzip": Scenario(
+        "/api/v1/routeros/default/ip/route?fields=dst-address,gateway",
+        "Same routing table stream, gzip-compressed",
+        streaming=True,
+        headers={"Accept-Encoding": "gzip"},
+    ),
+    "interface-stream": Scenario(
+        "/api/v1/routeros/default/interface?filter=running=true",
+        "Interface table with a filter pushed down to the router",
+        streaming=True,
+        headers={"Accept-Encoding": "identity"},
+    ),
+    "fleet-traffic-top": Scenario(
+        "/api/v1/routeros/fleet/traffic/top?n=20",
+        "Busiest interfaces across the fleet, served from memory",
+    ),
+    "history-system-resource": Scenario(
+        "/api/v1/routeros/default/history/system-resource?limit=100",
+        "Recorded samples, no router round trip",
+    ),
+}
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    requests: int
+    errors: int
+    duration: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    statuses: dict[str, int] = field(default_factory=dict)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    scenario: Scenario,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+) -> ScenarioResult:
+    """Closed-loop load: ``concurrency`` workers issue requests back to back."""
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    errors = 0
+    recording = False
+
+    async def request() -> str:
+        if scenario.streaming:
+            async with client.stream(
+                "GET", scenario.path, headers=scenario.headers
+            ) as response:
+                async for _ in response.aiter_bytes():
+                    pass
+                return str(response.status_code)
+        response = await client.get(scenario.path, headers=scenario.headers)
+        return str(response.status_code)
+
+    async def worker(deadline: float):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await request()
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            if not recording:
+                continue
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.startswith(("2", "304")):
+                errors += 1
+
+    if warmup > 0:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+
+    recording = True
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        scenario=name,
+        requests=len(latencies),
+        errors=errors,
+        duration=round(elapsed, 3),
+        throughput=round(len(latencies) / elapsed, 1),
+        p50_ms=round(percentile(latencies, 50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 99) * 1000, 3),
+        max_ms=round((latencies[-1] if latencies else 0.0) * 1000, 3),
+        statuses=statuses,
+    )
+
+
+def configure_environment(server: FakeRouterOsServer, routers: int, workdir: str):
+    """Point the app at the fake server; must run before ``main`` is imported."""
+    router = {
+        "host": server.host,
+        "port": server.port,
+        "username": "admin",
+        "password": "",
+    }
+    os.environ.update(
+        {
+            "ROUTEROS": json.dumps(router),
+            "ROUTERS": json.dumps(
+                [{**router, "name": f"bench-{i}"} for i in range(routers)]
+            ),
+            "ALLOWED_HOSTS": '["*"]',
+            "DB_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            "LOG_SINK": json.dumps({"db_path": os.path.join(workdir, "log.db")}),
+            "COLLECTOR": json.dumps({"enabled": False}),
+            "TRAFFIC": json.dumps({"interval": 1.0}),
+        }
+    )
+
+
+async def run_in_process(args: argparse.Namespace) -> list[ScenarioResult]:
+    server = FakeRouterOsServer(
+        options=FakeRouterOsOptions(
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            interface_rows=args.interface_rows,
+            route_rows=args.route_rows,
+            seed=args.seed,
+        )
+    )
+    await server.start()
+    with tempfile.TemporaryDirectory(prefix="rx-bench-") as workdir:
+        configure_environment(server, args.routers, workdir)
+        from app.lib.routeros.infrastructure.cache import snapshot_cache
+        from main import app
+
+        if args.quiet:
+            from loguru import logger
+
+            logger.remove()
+
+        results = []
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://bench", timeout=30
+                ) as client:
+                    for name in args.scenario:
+                        scenario = SCENARIOS[name]
+                        snapshot_cache.enabled = scenario.cache
+                        results.append(
+                            await run_scenario(
+                                client,
+                                name,
+                                scenario,
+                                args.concurrency,
+                                args.duration,
+                                args.warmup,
+                            )
+                        )
+        finally:
+            await server.stop()
+    return results
+
+
+async def run_remote(args: argparse.Namespace) -> list[ScenarioResult]:
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        return [
+            await run_scenario(
+                client,
+                name,
+                SCENARIOS[name],
+                args.concurrency,
+                args.duration,
+                args.warmup,
+            )
+            for name in args.scenario
+        ]
+
+
+def compare(
+    results: list[ScenarioResult],
+    baseline: dict[str, Any],
+    tolerance: float,
+    report: Callable[[str], None] = print,
+) -> bool:
+    """Return False if any scenario regressed beyond ``tolerance``."""
+    ok = True
+    previous = {item["scenario"]: item for item in baseline.get("results", [])}
+    for result in results:
+        before = previous.get(result.scenario)
+        if before is None:
+            report(f"{result.scenario}: no baseline")
+            continue
+        checks = [
+            ("throughput", before["throughput"], result.throughput, False),
+            ("p95_ms", before["p95_ms"], result.p95_ms, True),
+            ("p99_ms", before["p99_ms"], result.p99_ms, True),
+        ]
+        for metric, old, new, lower_is_better in checks:
+            if not old:
+                continue
+            change = (new - old) / old
+            regressed = change > tolerance if lower_is_better else -change > tolerance
+            marker = "REGRESSION" if regressed else "ok"
+            report(
+                f"{result.scenario} {metric}: {old} -> {new} ({change:+.1%}) {marker}"
+            )
+            ok = ok and not regressed
+    return ok
+
+
+def print_results(results: list[ScenarioResult]):
+    header = f"{'scenario':<28}{'req':>8}{'err':>6}{'req/s':>10}"
+    header += f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    for r in results:
+        print(
+            f"{r.scenario:<28}{r.requests:>8}{r.errors:>6}{r.throughput:>10}"
+            f"{r.p50_ms:>10}{r.p95_ms:>10}{r.p99_ms:>10}{r.max_ms:>10}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeatable. Defaults to all.",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--routers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--interface-rows", type=int, default=64)
+    parser.add_argument("--route-rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="Benchmark a running server instead.")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--quiet", action="store_true", help="Silence app logging.")
+    args = parser.parse_args(argv)
+    args.scenario = args.scenario or list(SCENARIOS)
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    runner = run_remote if args.url else run_in_process
+    results = asyncio.run(runner(args))
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(
+                {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "options": {
+                        "concurrency": args.concurrency,
+                        "duration": args.duration,
+                        "routers": args.routers,
+                        "latency": args.latency,
+                    },
+                    "results": [asdict(result) for result in results],
+                },
+                f,
+                indent=2,
+            )
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,80 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
-from app.core import Settings
+from app.core import get_settings, logging_config
+from app.core.admission import AdmissionRejected, admission, rejected_response
+from app.core.log_retention import log_retention
 from app.core.logging_config import setup_logging
-from app.core.middleware import ProcessTimeMiddleware
-from app.route.v1 import routeros_router  # noqa
-
-logger = setup_logging()  # Initialize logging
+from app.core.middleware import (
+    AdmissionMiddleware,
+    ProcessTimeMiddleware,
+    SlowRequestMiddleware,
+)
+from app.core.profiling import slow_requests
+from app.lib.routeros.application.collector import SystemResourceCollector
+from app.lib.routeros.application.config_snapshots import ConfigSnapshotService
+from app.lib.routeros.application.health import DEFAULT_RULES, health_engine
+from app.lib.routeros.application.scheduler import poll_scheduler
+from app.lib.routeros.application.traffic import (
+    InterfaceTrafficCollector,
+    PublishedTrafficFeed,
+    traffic_engine,
+)
+from app.lib.routeros.application.use_cases import FleetSystemResourceUseCase
+from app.lib.routeros.domain.entities import (
+    HealthRule,
+    Interface,
+    SystemResource,
+    SystemResourceSample,
+)
+from app.lib.routeros.infrastructure.cache import (
+    ACTIVE_ALERTS,
+    ALERT_TRANSITIONS,
+    FLEET,
+    PUBLISHED_TRANSITIONS,
+    snapshot_cache,
+    snapshot_key,
+)
+from app.lib.routeros.infrastructure.mikrotik import connection_pool
+from app.lib.routeros.infrastructure.mikrotik.breaker import circuit_breakers
+from app.lib.routeros.infrastructure.mikrotik.config_repository import (
+    config_source_factory,
+)
+from app.lib.routeros.infrastructure.mikrotik.constant import MikrotikResourceUri
+from app.lib.routeros.infrastructure.mikrotik.interface_repository import (
+    MikroTikInterfaceRepository,
+)
+from app.lib.routeros.infrastructure.mikrotik.registry import router_registry
+from app.lib.routeros.infrastructure.mikrotik.system_resource_repository import (
+    MikroTikSystemResourceRepository,
+)
+from app.lib.routeros.infrastructure.shared import LeaderElection, shared_store
+from app.lib.routeros.infrastructure.sqlite import database, sqlite_path
+from app.lib.routeros.infrastructure.sqlite.config_snapshot_repository import (
+    config_snapshot_repository,
+)
+from app.lib.routeros.infrastructure.sqlite.router_repository import (
+    router_repository,
+)
+from app.lib.routeros.infrastructure.sqlite.system_resource_history_repository import (
+    history_repository,
+)
+from app.route.admin import router as admin_router
+from app.route.metrics import router as metrics_router
+from app.route.v1 import logs_router, routeros_router  # noqa
 
 load_dotenv()  # Load environment variables from .env file
 
-settings = Settings()
+settings = get_settings()
+
+logger = setup_logging(settings.log_sink)  # Initialize logging
 
 
 sentry_sdk.init(
@@ -21,10 +82,221 @@ sentry_sdk.init(
     send_default_pii=True,
 )
 
-routes = [routeros_router]
+routes = [routeros_router, logs_router]
+
+
+def publish_system_resource(router: str, data: SystemResource):
+    config = router_registry.get(router)
+    if config is not None:
+        snapshot_cache.put(
+            snapshot_key(config), MikrotikResourceUri.SYSTEM_RESOURCE, data
+        )
+
+
+def publish_interfaces(router: str, timestamp: float, interfaces: list[Interface]):
+    snapshot_cache.put(router, MikrotikResourceUri.INTERFACE, (timestamp, interfaces))
+
 
-app = FastAPI(title=settings.app_name, debug=settings.debug)
+def published_interfaces(router: str) -> tuple[float, list[Interface]] | None:
+    return snapshot_cache.peek(router, MikrotikResourceUri.INTERFACE).value
 
+
+def evaluate_health(samples: list[SystemResourceSample]):
+    health_engine.retain(set(router_registry.all()))
+    health_engine.evaluate_many(samples)
+    # Lets the other workers serve alerts and transitions when the cache is
+    # shared.
+    snapshot_cache.put(FLEET, ACTIVE_ALERTS, health_engine.active())
+    snapshot_cache.put(
+        FLEET, ALERT_TRANSITIONS, health_engine.transitions(PUBLISHED_TRANSITIONS)
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    profiling = settings.profiling
+    if profiling.slow_request_threshold is not None:
+        slow_requests.configure(
+            profiling.slow_request_threshold,
+            profiling.slow_request_capacity,
+            profiling.sample_interval,
+        )
+        slow_requests.start()
+    retention = settings.log_retention
+    # Started even when disabled, to split a log.db from before partitioning.
+    log_retention.configure(
+        settings.log_sink.db_path,
+        retention.archive_after_days if retention.enabled else None,
+        retention.delete_after_days if retention.enabled else None,
+        retention.interval,
+        retention.compress_level,
+    )
+    log_retention.start()
+    admission.configure(**settings.admission.model_dump())
+    connection_pool.configure(**settings.routeros_pool.model_dump())
+    connection_pool.start()
+    circuit_breakers.configure(**settings.breaker.model_dump())
+    router_registry.load(settings)
+    snapshot_cache.configure(**settings.cache.model_dump())
+    # Published interface counters stay fresh until the next traffic sample.
+    snapshot_cache.ttl.setdefault(
+        MikrotikResourceUri.INTERFACE, settings.traffic.interval
+    )
+    database.open(sqlite_path(settings.db_url))
+    await history_repository.setup()
+    await router_repository.setup()
+    await config_snapshot_repository.setup()
+    router_registry.sync(await router_repository.refresh())
+    traffic_engine.configure(settings.traffic.capacity)
+    health = settings.health
+    health_engine.configure(
+        DEFAULT_RULES
+        if health.rules is None
+        else [HealthRule(**rule.model_dump()) for rule in health.rules],
+        health.min_transition_interval,
+        health.history,
+    )
+    # The published alert set is current until the next collector cycle.
+    snapshot_cache.ttl.setdefault(ACTIVE_ALERTS, settings.collector.interval)
+    snapshot_cache.ttl.setdefault(ALERT_TRANSITIONS, settings.collector.interval)
+
+    polling = settings.collector
+    poll_scheduler.configure(
+        polling.interval,
+        polling.min_interval,
+        polling.max_interval,
+        polling.jitter,
+        polling.rate_limit,
+        settings.fleet.max_concurrency,
+    )
+
+    fleet_use_case = FleetSystemResourceUseCase(
+        repo_factory=MikroTikSystemResourceRepository,
+        max_concurrency=settings.fleet.max_concurrency,
+        deadline=settings.fleet.deadline,
+    )
+    shared = settings.shared_cache
+    if shared.enabled:
+        # Published snapshots are current until the collector's next poll.
+        snapshot_cache.ttl.setdefault(
+            MikrotikResourceUri.SYSTEM_RESOURCE, settings.collector.interval
+        )
+    collector = SystemResourceCollector(
+        fleet_use_case,
+        history_repository,
+        routers=router_registry.all,
+        interval=settings.collector.interval,
+        on_samples=evaluate_health if health.enabled else None,
+        router_info_repo=router_repository,
+        scheduler=poll_scheduler if polling.adaptive else None,
+        flush_interval=polling.flush_interval,
+        publish=publish_system_resource if shared.enabled else None,
+    )
+    traffic_collector = InterfaceTrafficCollector(
+        traffic_engine,
+        repo_factory=MikroTikInterfaceRepository,
+        routers=router_registry.all,
+        interval=settings.traffic.interval,
+        max_concurrency=settings.fleet.max_concurrency,
+        deadline=settings.fleet.deadline,
+        publish=publish_interfaces if shared.enabled else None,
+    )
+    snapshots = settings.config_snapshots
+    config_collector = ConfigSnapshotService(
+        config_snapshot_repository,
+        source_factory=config_source_factory(snapshots),
+        routers=router_registry.all,
+        interval=snapshots.interval,
+        max_concurrency=snapshots.max_concurrency,
+        deadline=snapshots.timeout * 2,
+    )
+    traffic_feed = PublishedTrafficFeed(
+        traffic_engine,
+        latest=published_interfaces,
+        routers=router_registry.all,
+        interval=settings.traffic.interval,
+    )
+
+    async def lead():
+        """Start the router pollers; only the elected worker runs them."""
+        if settings.routeros.host:
+            try:
+                await connection_pool.warm(settings.routeros)
+            except Exception as e:
+                logger.warning(
+                    "Could not warm connection pool for {}: {}",
+                    settings.routeros.host,
+                    e,
+                )
+        if shared.enabled:
+            snapshot_cache.attach(shared_store, publishing=True)
+        if settings.collector.enabled:
+            collector.start()
+        if settings.traffic.enabled:
+            await traffic_feed.stop()
+            traffic_collector.start()
+        if snapshots.enabled:
+            config_collector.start()
+
+    async def refresh_registry():
+        """Pick up routers registered through another worker."""
+        while True:
+            await asyncio.sleep(settings.registry.refresh_interval)
+            try:
+                router_registry.sync(await router_repository.refresh())
+            except Exception as e:
+                logger.warning("Refreshing the router registry failed: {}", e)
+
+    registry_refresh = asyncio.create_task(refresh_registry())
+    election = LeaderElection(f"{shared.path}.lock")
+    campaign: asyncio.Task[None] | None = None
+    if shared.enabled:
+        shared_store.configure(shared.path, shared.slots, shared.slot_size)
+        shared_store.open()
+        snapshot_cache.attach(shared_store)
+
+        async def campaign_for_leader():
+            while not election.try_acquire():
+                await asyncio.sleep(shared.publish_interval)
+            logger.info("Worker elected to poll routers for the shared cache")
+            await lead()
+
+        if settings.traffic.enabled:
+            traffic_feed.start()
+        campaign = asyncio.create_task(campaign_for_leader())
+    else:
+        await lead()
+    yield
+    for task in (campaign, registry_refresh):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    await traffic_feed.stop()
+    await traffic_collector.stop()
+    await config_collector.stop()
+    await collector.stop()
+    snapshot_cache.attach(None)
+    shared_store.close()
+    election.release()
+    await connection_pool.close()
+    database.close()
+    slow_requests.stop()
+    log_retention.stop()
+    if logging_config.sqlite_sink:
+        logging_config.sqlite_sink.close()
+
+
+app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
+
+# Innermost, so time spent queued counts towards slow requests and shows
+# up as a Server-Timing phase.
+app.add_middleware(AdmissionMiddleware, controller=admission)
+if settings.profiling.slow_request_threshold is not None:
+    # Added before ProcessTimeMiddleware so it runs inside it.
+    app.add_middleware(SlowRequestMiddleware, recorder=slow_requests)
 app.add_middleware(ProcessTimeMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +314,16 @@ for route in routes:
     app.include_router(route, prefix="/api")
 
 
+@app.exception_handler(AdmissionRejected)
+async def shed_router_operation(request: Request, exc: AdmissionRejected):
+    """A router's admission queue was full or too slow for the request."""
+    return rejected_response(exc)
+
+
+app.include_router(metrics_router)
+app.include_router(admin_router)
+
+
 @app.get("/")
 async def read_root():
     return {"message": f"Welcome to the {settings.app_name}!"}
@@ -0,0 +1,41 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.route import admin
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(admin.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [
+        ("post", "/admin/profile?seconds=0.01"),
+        ("get", "/admin/slow-requests"),
+        ("get", "/admin/slow-requests/1/stacks"),
+        ("delete", "/admin/slow-requests"),
+    ],
+)
+def test_profiling_endpoints_are_off_by_default(
+    client: TestClient, method: str, path: str
+):
+    assert getattr(client, method)(path).status_code == 404
+
+
+def test_profiling_endpoints_when_enabled(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(admin.settings.profiling, "enabled", True)
+    assert client.get("/admin/slow-requests").json()["data"] == []
+    response = client.post("/admin/profile?seconds=0.01&interval=0.0001")
+    assert response.status_code == 422
+    assert client.post("/admin/profile?seconds=0.01&interval=0.001").status_code == 200
+
+
+def test_admission_stats_stay_available(client: TestClient):
+    assert client.get("/admin/admission").status_code == 200
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionRejected, Limiter
+
+
+def test_enters_up_to_the_limit_then_rejects_without_a_queue():
+    async def run():
+        limiter = Limiter("test", limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.retry_after >= 1.0
+        assert (limiter.admitted, limiter.rejected) == (2, 1)
+        limiter.release()
+        await limiter.acquire()
+        assert limiter.active["priority"] == 2
+
+    asyncio.run(run())
+
+
+def test_bulk_lane_leaves_the_reserved_slots_to_priority():
+    async def run():
+        limiter = Limiter("test", limit=4, reserved=0.5)
+        assert limiter.reserved == 2
+        await limiter.acquire("bulk")
+        await limiter.acquire("bulk")
+        with pytest.raises(AdmissionRejected):
+            await limiter.acquire("bulk")
+        await limiter.acquire("priority")
+        await limiter.acquire("priority")
+        assert limiter.active == {"priority": 2, "bulk": 2}
+
+    asyncio.run(run())
+
+
+def test_released_slot_wakes_priority_waiters_before_bulk():
+    async def run():
+        limiter = Limiter("test", limit=1, queue_size=4, queue_timeout=5.0)
+        await limiter.acquire()
+        order: list[str] = []
+
+        async def wait(lane):
+            await limiter.acquire(lane)
+            order.append(lane)
+
+        bulk = asyncio.create_task(wait("bulk"))
+        await asyncio.sleep(0)
+        priority = asyncio.create_task(wait("priority"))
+        await asyncio.sleep(0)
+        assert limiter.queued == 2
+
+        limiter.release()
+        await priority
+        assert order == ["priority"]
+        assert not bulk.done()
+
+        limiter.release("priority")
+        await bulk
+        assert order == ["priority", "bulk"]
+        assert limiter.queued == 0
+
+    asyncio.run(run())
+
+
+def test_new_holders_do_not_overtake_queued_ones():
+    async def run():
+        limiter = Limiter("test", limit=1, queue_size=4, queue_timeout=5.0)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        # The slot is handed to the waiter before it even runs, so whoever
+        # asks next has to queue behind it.
+        assert limiter.active["priority"] == 1
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(), 0.01)
+        await waiter
+        assert limiter.active["priority"] == 1
+        assert limiter.queued == 0
+
+    asyncio.run(run())
+
+
+def test_full_queue_and_expired_wait_are_rejected():
+    async def run():
+        limiter = Limiter("test", limit=1, queue_size=1, queue_timeout=0.05)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected, match="queue_full"):
+            await limiter.acquire()
+        with pytest.raises(AdmissionRejected, match="deadline"):
+            await waiter
+        assert limiter.queued == 0
+        assert limiter.rejected == 2
+
+    asyncio.run(run())
+
+
+def test_slow_holders_reject_queued_work_up_front():
+    async def run():
+        limiter = Limiter("test", limit=1, queue_size=4, queue_timeout=1.0)
+        await limiter.acquire()
+        # Holders have been taking 2s each, longer than anyone may queue.
+        limiter.release(held=2.0)
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected, match="deadline") as rejected:
+            await limiter.acquire()
+        assert rejected.value.retry_after == pytest.approx(2.0)
+        assert limiter.queued == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        limiter = Limiter("test", limit=1, queue_size=2, queue_timeout=5.0)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.queued == 0
+        limiter.release()
+        assert limiter.active["priority"] == 0
+
+    asyncio.run(run())
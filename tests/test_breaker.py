@@ -0,0 +1,175 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import admission
+from app.lib.routeros.infrastructure.mikrotik import MikroTikConnectionManager
+from app.lib.routeros.infrastructure.mikrotik import breaker as breaker_module
+from app.lib.routeros.infrastructure.mikrotik.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+)
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsCircuitOpenError,
+)
+from app.lib.routeros.infrastructure.mikrotik.pool import RouterConnectionPool
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+from bench.fake_routeros import FakeRouterOsOptions, FakeRouterOsServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(breaker_module, "time", clock)
+    return clock
+
+
+def _fail(breaker: CircuitBreaker, times: int = 1):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(clock: FakeClock):
+    breaker = CircuitBreaker("r", failure_threshold=3, reset_timeout=10.0)
+    _fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    _fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(RouterOsCircuitOpenError) as error:
+        breaker.before_call()
+    assert error.value.retry_after == pytest.approx(10.0)
+
+
+def test_half_open_lets_one_trial_through_and_success_closes(clock: FakeClock):
+    breaker = CircuitBreaker("r", failure_threshold=1, reset_timeout=10.0)
+    _fail(breaker)
+    clock.now += 10.0
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(RouterOsCircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_for_twice_as_long_up_to_the_maximum(clock: FakeClock):
+    breaker = CircuitBreaker(
+        "r", failure_threshold=1, reset_timeout=10.0, max_reset_timeout=30.0
+    )
+    _fail(breaker)
+    for expected in (20.0, 30.0, 30.0):
+        clock.now += breaker.retry_after
+        _fail(breaker)
+        assert breaker.state == OPEN
+        assert breaker.retry_after == pytest.approx(expected)
+
+    clock.now += breaker.retry_after
+    breaker.before_call()
+    breaker.record_success()
+    _fail(breaker)
+    assert breaker.retry_after == pytest.approx(10.0)
+
+
+def test_released_trial_lets_the_next_call_try(clock: FakeClock):
+    breaker = CircuitBreaker("r", failure_threshold=1, reset_timeout=10.0)
+    _fail(breaker)
+    clock.now += 10.0
+    breaker.before_call()
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+
+def test_timeout_follows_observed_latency_once_enough_is_known():
+    breaker = CircuitBreaker(
+        "r", min_timeout=0.5, timeout_multiplier=4.0, min_samples=20
+    )
+    for _ in range(19):
+        breaker.record_latency(0.2)
+    assert breaker.timeout(5.0) == 5.0
+
+    breaker.record_latency(0.2)
+    assert breaker.timeout(5.0) == pytest.approx(0.8)
+    assert breaker.timeout(0.6) == 0.6
+
+    for _ in range(200):
+        breaker.record_latency(0.01)
+    assert breaker.timeout(5.0) == 0.5
+
+
+class CountingBreaker(CircuitBreaker):
+    def __init__(self):
+        super().__init__("r", min_samples=1, hedge=True)
+        self.calls: list[str] = []
+
+    def before_call(self):
+        self.calls.append("call")
+        super().before_call()
+
+    def record_success(self):
+        self.calls.append("success")
+        super().record_success()
+
+    def record_failure(self):
+        self.calls.append("failure")
+        super().record_failure()
+
+    def release(self):
+        self.calls.append("release")
+        super().release()
+
+
+def test_hedged_fetch_records_one_outcome_and_takes_one_slot(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    slots = []
+    router_slot = admission.router_slot
+
+    def counting_slot(key: str, stream: bool = False):
+        slots.append(key)
+        return router_slot(key, stream)
+
+    monkeypatch.setattr(admission, "router_slot", counting_slot)
+
+    async def run():
+        server = FakeRouterOsServer(options=FakeRouterOsOptions(latency=0.05))
+        await server.start()
+        pool = RouterConnectionPool(min_size=2)
+        config = MikrotikConnectionConfig(
+            host="127.0.0.1", username="admin", password="", port=server.port, timeout=1
+        )
+        await pool.warm(config)
+        breaker = CountingBreaker()
+        # Anything slower than 1ms is hedged.
+        breaker.record_latency(0.001)
+        try:
+            async with MikroTikConnectionManager(config, pool, breaker) as manager:
+                rows = await manager.fetch("/system/resource")
+            assert rows
+            assert pool.stats()[f"127.0.0.1:{server.port}"] == {"idle": 2, "in_use": 0}
+        finally:
+            await pool.close()
+            await server.stop()
+        return breaker.calls
+
+    assert asyncio.run(run()) == ["call", "success"]
+    assert len(slots) == 1
@@ -0,0 +1,108 @@
+import asyncio
+
+from app.lib.routeros.application.broadcaster import (
+    LiveUpdate,
+    Subscription,
+    SystemResourceBroadcaster,
+)
+
+
+class Repository:
+    """Streams numbered samples until told to fail."""
+
+    opened = 0
+
+    def __init__(self, samples: asyncio.Queue):
+        self.samples = samples
+        Repository.opened += 1
+
+    async def watch_system_resource(self, interval: float):
+        while True:
+            sample = await self.samples.get()
+            if isinstance(sample, Exception):
+                raise sample
+            yield sample
+
+
+def _broadcaster(samples: asyncio.Queue, **options) -> SystemResourceBroadcaster:
+    Repository.opened = 0
+    return SystemResourceBroadcaster(lambda config: Repository(samples), **options)
+
+
+def test_subscription_drops_the_oldest_update_when_full():
+    async def run():
+        subscription = Subscription(maxsize=2)
+        for i in range(4):
+            subscription.push(LiveUpdate(router="r1", data=i))
+        assert subscription.dropped == 2
+        assert [(await subscription.get()).data for _ in range(2)] == [2, 3]
+
+    asyncio.run(run())
+
+
+def test_subscribers_of_a_router_share_one_upstream():
+    async def run():
+        samples: asyncio.Queue = asyncio.Queue()
+        broadcaster = _broadcaster(samples)
+        async with broadcaster.subscribe("r1", None) as first:
+            async with broadcaster.subscribe("r1", None) as second:
+                assert broadcaster.stats() == {"r1": 2}
+                samples.put_nowait("sample")
+                assert (await first.get()).data == "sample"
+                assert (await second.get()).data == "sample"
+            assert broadcaster.stats() == {"r1": 1}
+        assert broadcaster.stats() == {}
+        assert Repository.opened == 1
+
+    asyncio.run(run())
+
+
+def test_late_subscriber_starts_with_the_last_update():
+    async def run():
+        samples: asyncio.Queue = asyncio.Queue()
+        broadcaster = _broadcaster(samples)
+        async with broadcaster.subscribe("r1", None) as first:
+            samples.put_nowait("sample")
+            await first.get()
+            async with broadcaster.subscribe("r1", None) as late:
+                assert (await late.get()).data == "sample"
+
+    asyncio.run(run())
+
+
+def test_last_subscriber_leaving_cancels_the_upstream():
+    async def run():
+        samples: asyncio.Queue = asyncio.Queue()
+        broadcaster = _broadcaster(samples)
+        async with broadcaster.subscribe("r1", None):
+            await asyncio.sleep(0)
+            (upstream,) = [
+                task
+                for task in asyncio.all_tasks()
+                if task is not asyncio.current_task()
+            ]
+        await asyncio.sleep(0)
+        assert upstream.cancelled()
+
+    asyncio.run(run())
+
+
+def test_upstream_failure_is_pushed_then_retried(monkeypatch):
+    async def run():
+        sleep = asyncio.sleep
+
+        async def no_backoff(delay):
+            await sleep(0)
+
+        monkeypatch.setattr(asyncio, "sleep", no_backoff)
+        samples: asyncio.Queue = asyncio.Queue()
+        broadcaster = _broadcaster(samples)
+        async with broadcaster.subscribe("r1", None) as subscription:
+            samples.put_nowait(ConnectionError("router down"))
+            failed = await subscription.get()
+            assert (failed.data, failed.error_message) == (None, "router down")
+            samples.put_nowait("recovered")
+            assert (await subscription.get()).data == "recovered"
+        assert Repository.opened == 1
+
+    asyncio.run(run())
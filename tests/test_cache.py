@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.lib.routeros.infrastructure import cache as cache_module
+from app.lib.routeros.infrastructure.cache import SnapshotCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+class Router:
+    """Counts fetches and answers them with an increasing value."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("router down")
+        return self.calls
+
+
+def test_hit_within_ttl_then_miss_after_stale_window(clock: FakeClock):
+    async def run():
+        cache = SnapshotCache(default_ttl=1.0, stale_ttl=5.0)
+        router = Router()
+        first = await cache.get_or_fetch("r1", "/system/resource", router.fetch)
+        assert (first.value, first.status) == (1, "MISS")
+
+        clock.now += 0.5
+        hit = await cache.get_or_fetch("r1", "/system/resource", router.fetch)
+        assert (hit.value, hit.status, hit.age) == (1, "HIT", 0.5)
+
+        clock.now += 10.0
+        miss = await cache.get_or_fetch("r1", "/system/resource", router.fetch)
+        assert (miss.value, miss.status) == (2, "MISS")
+        assert router.calls == 2
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        cache = SnapshotCache()
+        router = Router(delay=0.01)
+        lookups = await asyncio.gather(
+            *(cache.get_or_fetch("r1", "/interface", router.fetch) for _ in range(20))
+        )
+        assert router.calls == 1
+        assert {lookup.value for lookup in lookups} == {1}
+
+    asyncio.run(run())
+
+
+def test_stale_entry_is_served_while_one_fetch_revalidates(clock: FakeClock):
+    async def run():
+        cache = SnapshotCache(default_ttl=1.0, stale_ttl=5.0)
+        router = Router()
+        await cache.get_or_fetch("r1", "/system/resource", router.fetch)
+        clock.now += 2.0
+
+        stale = await asyncio.gather(
+            *(
+                cache.get_or_fetch("r1", "/system/resource", router.fetch)
+                for _ in range(5)
+            )
+        )
+        assert {(lookup.value, lookup.status) for lookup in stale} == {(1, "STALE")}
+        await asyncio.sleep(0)
+        assert router.calls == 2
+        fresh = await cache.get_or_fetch("r1", "/system/resource", router.fetch)
+        assert (fresh.value, fresh.status) == (2, "HIT")
+
+    asyncio.run(run())
+
+
+def test_failed_fetch_is_raised_and_not_cached():
+    async def run():
+        cache = SnapshotCache()
+        router = Router(fail=True)
+        with pytest.raises(ConnectionError):
+            await cache.get_or_fetch("r1", "/interface", router.fetch)
+        router.fail = False
+        lookup = await cache.get_or_fetch("r1", "/interface", router.fetch)
+        assert (lookup.value, lookup.status) == (2, "MISS")
+
+    asyncio.run(run())
+
+
+def test_ttl_per_path_and_invalidation(clock: FakeClock):
+    cache = SnapshotCache(default_ttl=1.0, stale_ttl=0.0, ttl={"/interface": 10.0})
+    cache.put("r1", "/interface", "ifaces")
+    cache.put("r1", "/system/resource", "resource")
+    cache.put("r2", "/interface", "other")
+    clock.now += 5.0
+    assert cache.peek("r1", "/interface").status == "HIT"
+    assert cache.peek("r1", "/system/resource").status == "MISS"
+
+    cache.invalidate("r1")
+    assert cache.peek("r1", "/interface").status == "MISS"
+    assert cache.peek("r2", "/interface").value == "other"
+
+
+def test_disabled_cache_always_fetches():
+    async def run():
+        cache = SnapshotCache(enabled=False)
+        router = Router()
+        for expected in (1, 2):
+            lookup = await cache.get_or_fetch("r1", "/interface", router.fetch)
+            assert (lookup.value, lookup.status) == (expected, "MISS")
+
+    asyncio.run(run())
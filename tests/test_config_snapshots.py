@@ -0,0 +1,62 @@
+from app.lib.routeros.application.config_snapshots import content_hash, manifest_hash
+from app.lib.routeros.infrastructure.mikrotik.config_repository import (
+    render_rows,
+    split_export,
+)
+
+EXPORT = """\
+# 2026-10-17 03:04:05 by RouterOS 7.16
+# software id = ABCD-1234
+#
+/interface bridge
+add name=bridge1
+/ip address
+add address=10.0.0.1/24 \\
+    interface=bridge1
+# a comment in the middle
+/interface bridge
+add name=bridge2
+/system identity
+set name=edge
+"""
+
+
+def test_split_export_groups_lines_by_menu():
+    assert split_export(EXPORT.splitlines()) == {
+        "/interface bridge": "add name=bridge1\nadd name=bridge2",
+        "/ip address": "add address=10.0.0.1/24 interface=bridge1",
+        "/system identity": "set name=edge",
+    }
+
+
+def test_split_export_ignores_the_date_and_version_comments():
+    other_day = EXPORT.replace("2026-10-17 03:04:05", "2026-10-18 11:00:00").replace(
+        "7.16", "7.17"
+    )
+    assert split_export(other_day.splitlines()) == split_export(EXPORT.splitlines())
+
+
+def test_split_export_keeps_commands_before_the_first_menu_and_a_dangling_line():
+    assert split_export(["global x 1", "/ip dns", "set servers=1.1.1.1 \\"]) == {
+        "/": "global x 1",
+        "/ip dns": "set servers=1.1.1.1 ",
+    }
+
+
+def test_render_rows_sorts_keys_and_drops_ignored_fields():
+    rows = [
+        {"name": "ether1", ".id": "*1", "rx-byte": "10", "mtu": "1500"},
+        {"mtu": "1500", "name": "ether2", ".id": "*2", "rx-byte": "99"},
+    ]
+    assert render_rows(rows, ignore=(".id", "rx-byte")) == (
+        "mtu=1500 name=ether1\nmtu=1500 name=ether2"
+    )
+
+
+def test_manifest_hash_does_not_depend_on_section_order():
+    sections = {"/ip address": content_hash("a"), "/system identity": content_hash("b")}
+    reordered = dict(reversed(sections.items()))
+    assert manifest_hash(sections) == manifest_hash(reordered)
+    assert manifest_hash(sections) != manifest_hash(
+        {**sections, "/ip address": content_hash("c")}
+    )
@@ -0,0 +1,89 @@
+import pytest
+from pydantic import BaseModel, Field
+
+from app.lib.routeros.infrastructure.mikrotik.decoder import (
+    RecordDecoder,
+    field,
+    parse_bool,
+    parse_int,
+    parse_percent,
+    parse_size,
+)
+
+
+class Port(BaseModel):
+    name: str
+    mtu: int
+    running: bool
+    memory: int
+    load: int = 0
+    tags: list[str] = Field(default_factory=list)
+
+
+DECODER = RecordDecoder(
+    Port,
+    [
+        field("name"),
+        field("mtu", parse_int, source="actual-mtu", default="1500"),
+        field("running", parse_bool),
+        field("memory", parse_size, source="free-memory"),
+    ],
+)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("1024", 1024),
+        ("128MiB", 128 * 1024**2),
+        ("1.5GiB", int(1.5 * 1024**3)),
+        ("512kB", 512_000),
+        ("12XB", 0),
+        ("", 0),
+    ],
+)
+def test_parse_size(value: str, expected: int):
+    assert parse_size(value) == expected
+
+
+def test_scalar_parsers_fall_back_instead_of_raising():
+    assert (parse_int("42"), parse_int("-3"), parse_int(""), parse_int("n/a")) == (
+        42,
+        -3,
+        0,
+        0,
+    )
+    assert (parse_percent("15%"), parse_percent("15")) == (15, 15)
+    assert (parse_bool("true"), parse_bool("yes"), parse_bool("false")) == (
+        True,
+        True,
+        False,
+    )
+
+
+def test_decodes_the_same_model_as_validation():
+    row = {
+        "name": "ether1",
+        "actual-mtu": "9000",
+        "running": "true",
+        "free-memory": "64MiB",
+    }
+    port = DECODER.decode(row)
+    assert port == Port.model_validate(
+        {"name": "ether1", "mtu": 9000, "running": True, "memory": 64 * 1024**2}
+    )
+    assert list(port.model_dump()) == list(Port.model_fields)
+
+
+def test_missing_keys_use_the_field_default_and_model_defaults():
+    port, other = DECODER.decode_many([{"name": "ether1"}, {"name": "ether2"}])
+    assert (port.mtu, port.running, port.memory, port.load) == (1500, False, 0, 0)
+    port.tags.append("wan")
+    assert other.tags == []
+
+
+def test_unknown_or_unmapped_fields_are_rejected():
+    with pytest.raises(ValueError, match="no fields"):
+        RecordDecoder(Port, [field("name"), field("speed")])
+    with pytest.raises(ValueError, match="not mapped"):
+        RecordDecoder(Port, [field("name")])
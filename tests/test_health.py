@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.lib.routeros.application.health import HealthRuleEngine
+from app.lib.routeros.domain.entities import HealthRule, SystemResourceSample
+from app.lib.routeros.infrastructure.cache import (
+    ACTIVE_ALERTS,
+    ALERT_TRANSITIONS,
+    FLEET,
+    snapshot_cache,
+)
+from app.lib.routeros.infrastructure.shared import SharedSnapshotStore
+
+CPU_HIGH = HealthRule(name="cpu-high", metric="cpu_load", threshold=90, clear=80)
+
+
+def _sample(
+    second: float, cpu_load: int = 0, bad_blocks: int = 0, router: str = "r1"
+) -> SystemResourceSample:
+    return SystemResourceSample(
+        router=router,
+        timestamp=datetime.fromtimestamp(second, tz=timezone.utc),
+        cpu_load=cpu_load,
+        free_memory=0,
+        total_memory=0,
+        free_hdd_space=0,
+        total_hdd_space=0,
+        write_sector_total=0,
+        write_sector_since_reboot=0,
+        bad_blocks=bad_blocks,
+        uptime_seconds=0,
+    )
+
+
+def _states(engine: HealthRuleEngine, samples) -> list[str]:
+    return [change.state for change in engine.evaluate_many(samples)]
+
+
+def test_alert_fires_once_and_resolves_below_the_clear_level():
+    engine = HealthRuleEngine([CPU_HIGH], min_transition_interval=0)
+    assert _states(engine, [_sample(0, 95), _sample(1, 99)]) == ["firing"]
+    (alert,) = engine.active("r1")
+    assert (alert.value, alert.since.timestamp()) == (99, 0)
+
+    # Inside the hysteresis band the alert keeps firing.
+    assert _states(engine, [_sample(2, 85), _sample(3, 81)]) == []
+    assert _states(engine, [_sample(4, 80)]) == ["resolved"]
+    assert engine.active() == []
+    assert [t.state for t in engine.transitions()] == ["resolved", "firing"]
+
+
+def test_condition_must_hold_for_the_configured_time():
+    rule = CPU_HIGH.model_copy(update={"for_seconds": 60})
+    engine = HealthRuleEngine([rule], min_transition_interval=0)
+    assert _states(engine, [_sample(0, 95), _sample(30, 50), _sample(40, 95)]) == []
+    assert _states(engine, [_sample(90, 95)]) == []
+    assert _states(engine, [_sample(100, 95)]) == ["firing"]
+
+
+def test_transitions_are_rate_limited_per_rule():
+    engine = HealthRuleEngine([CPU_HIGH], min_transition_interval=60)
+    assert _states(engine, [_sample(0, 95), _sample(10, 50)]) == ["firing"]
+    # The resolve waits for the first agreeing sample after the interval.
+    assert _states(engine, [_sample(30, 95), _sample(70, 50)]) == ["resolved"]
+    assert _states(engine, [_sample(80, 95)]) == []
+    assert _states(engine, [_sample(130, 95)]) == ["firing"]
+
+
+def test_rate_rule_ignores_counter_resets():
+    rule = HealthRule(
+        name="bad-blocks", metric="bad_blocks", kind="rate", threshold=0, per=3600
+    )
+    engine = HealthRuleEngine([rule], min_transition_interval=0)
+    assert _states(engine, [_sample(0, bad_blocks=5)]) == []
+    assert _states(engine, [_sample(10, bad_blocks=0)]) == []
+    (firing,) = engine.evaluate(_sample(20, bad_blocks=1))
+    assert firing.value == pytest.approx(360.0)
+
+
+def test_routers_are_tracked_separately_and_forgotten():
+    engine = HealthRuleEngine([CPU_HIGH], min_transition_interval=0)
+    engine.evaluate_many([_sample(0, 95), _sample(0, 95, router="r2")])
+    assert {alert.router for alert in engine.active()} == {"r1", "r2"}
+    engine.retain({"r2"})
+    assert [alert.router for alert in engine.active()] == ["r2"]
+
+
+def test_unknown_metrics_are_rejected():
+    with pytest.raises(ValueError):
+        HealthRuleEngine([HealthRule(name="x", metric="temperature", threshold=1)])
+
+
+def test_alerts_and_transitions_reach_other_workers(tmp_path: Path):
+    engine = HealthRuleEngine([CPU_HIGH], min_transition_interval=0)
+    engine.evaluate_many([_sample(0, 95), _sample(1, 50), _sample(2, 95)])
+
+    path = str(tmp_path / "snapshots.shm")
+    writer = SharedSnapshotStore(path, slots=8, slot_size=65536)
+    reader = SharedSnapshotStore(path, slots=8, slot_size=65536)
+    writer.open()
+    reader.open()
+    try:
+        snapshot_cache.attach(writer, publishing=True)
+        snapshot_cache.put(FLEET, ACTIVE_ALERTS, engine.active())
+        snapshot_cache.put(FLEET, ALERT_TRANSITIONS, engine.transitions())
+        snapshot_cache.invalidate(FLEET)
+
+        snapshot_cache.attach(reader)
+        assert snapshot_cache.peek(FLEET, ACTIVE_ALERTS).value == engine.active()
+        assert (
+            snapshot_cache.peek(FLEET, ALERT_TRANSITIONS).value == engine.transitions()
+        )
+    finally:
+        snapshot_cache.attach(None)
+        reader.close()
+        writer.close()
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.lib.routeros.application.history import (
+    HistoryQueryEngine,
+    lttb,
+    merge_buckets,
+)
+from app.lib.routeros.domain.entities import MetricPoint
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _points(values: list[float]) -> list[MetricPoint]:
+    return [
+        MetricPoint(
+            timestamp=START + timedelta(minutes=i),
+            min=value,
+            max=value,
+            avg=value,
+            last=value,
+            count=1,
+        )
+        for i, value in enumerate(values)
+    ]
+
+
+def test_lttb_keeps_the_ends_and_returns_measured_points():
+    points = _points([float(i % 7) for i in range(100)])
+    picked = lttb(points, 20)
+    assert len(picked) == 20
+    assert picked[0] is points[0]
+    assert picked[-1] is points[-1]
+    assert all(point in points for point in picked)
+    assert [p.timestamp for p in picked] == sorted(p.timestamp for p in picked)
+
+
+def test_lttb_keeps_a_spike():
+    values = [1.0] * 200
+    values[123] = 95.0
+    assert any(point.avg == 95.0 for point in lttb(_points(values), 10))
+
+
+def test_lttb_leaves_short_series_alone():
+    points = _points([1.0, 2.0, 3.0])
+    assert lttb(points, 10) == points
+    assert lttb(points, 2) == [points[0], points[-1]]
+
+
+def test_merge_buckets_combines_statistics_exactly():
+    points = [
+        MetricPoint(timestamp=START, min=1, max=5, avg=3, last=4, count=2),
+        MetricPoint(
+            timestamp=START + timedelta(hours=1), min=0, max=9, avg=6, last=7, count=6
+        ),
+        MetricPoint(
+            timestamp=START + timedelta(hours=2), min=2, max=3, avg=2.5, last=3, count=4
+        ),
+        MetricPoint(
+            timestamp=START + timedelta(hours=3), min=4, max=8, avg=5, last=8, count=4
+        ),
+    ]
+    first, second = merge_buckets(points, 2)
+    assert first.timestamp == START
+    assert (first.min, first.max, first.last, first.count) == (0, 9, 7, 8)
+    assert first.avg == pytest.approx((3 * 2 + 6 * 6) / 8)
+    assert second.timestamp == START + timedelta(hours=2)
+    assert (second.min, second.max, second.last, second.count) == (2, 8, 8, 8)
+    assert second.avg == pytest.approx((2.5 * 4 + 5 * 4) / 8)
+
+
+def test_merge_buckets_preserves_the_total_count():
+    points = _points([float(i) for i in range(101)])
+    merged = merge_buckets(points, 7)
+    assert len(merged) == 7
+    assert sum(point.count for point in merged) == 101
+    assert merged[-1].last == 100.0
+    assert merge_buckets(points, 200) == points
+
+
+class Samples:
+    """Records the bounds the engine queries raw samples with."""
+
+    def __init__(self):
+        self.bounds: list[tuple[datetime, datetime]] = []
+
+    async def count_samples(self, router, start, end, limit):
+        self.bounds.append((start, end))
+        return 0
+
+    async def get_samples(self, router, start, end, limit):
+        return []
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        (datetime(2026, 1, 1), None),
+        (datetime(2026, 1, 1), datetime(2026, 1, 2)),
+        (datetime(2026, 1, 1), datetime(2026, 1, 2, tzinfo=timezone.utc)),
+        (None, datetime(2026, 1, 2)),
+    ],
+)
+def test_naive_bounds_are_read_as_utc(start: datetime | None, end: datetime | None):
+    repo = Samples()
+    engine = HistoryQueryEngine(repo)
+    asyncio.run(engine.series("r1", "cpu_load", start, end))
+    ((queried_start, queried_end),) = repo.bounds
+    assert queried_start.tzinfo is queried_end.tzinfo is timezone.utc
+    if start is not None:
+        assert queried_start == start.replace(tzinfo=timezone.utc)
+    if end is not None:
+        assert queried_end == end.replace(tzinfo=timezone.utc)
+
+
+def test_start_after_end_is_rejected():
+    engine = HistoryQueryEngine(Samples())
+    with pytest.raises(ValueError):
+        asyncio.run(
+            engine.series("r1", "cpu_load", datetime(2026, 1, 2), datetime(2026, 1, 1))
+        )
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.core.log_query import LogQuery, decode_cursor, encode_cursor
+from app.core.sqlite_log_sink import open_partition, partition_dir, partition_path
+
+RECORDS = {
+    # day partition -> (timestamp, level, message)
+    "2026-03-02": [
+        ("2026-03-02 08:00:00.000000", "INFO", "poll r1 ok"),
+        ("2026-03-02 09:30:00.000000", "ERROR", "poll r2 timed out"),
+        ("2026-03-02 09:30:00.000000", "INFO", "poll r3 ok"),
+    ],
+    "2026-03-03": [
+        ("2026-03-03 00:00:00.000000", "INFO", "poll r1 ok"),
+        ("2026-03-03 12:00:00.000000", "WARNING", "poll r2 slow"),
+    ],
+}
+# Written before partitioning, in the legacy log.db itself.
+LEGACY = [
+    ("2026-03-01 23:59:59.999999", "INFO", "poll r1 ok"),
+    ("2026-03-02 07:00:00.000000", "ERROR", "poll r2 refused"),
+]
+
+
+def _write(path: Path, rows: list[tuple[str, str, str]]):
+    conn = open_partition(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO rx_logs (timestamp, level, message, extra) VALUES (?, ?, ?, ?)",
+            [(*row, json.dumps({"router": row[2].split()[1]})) for row in rows],
+        )
+    conn.close()
+
+
+@pytest.fixture
+def query(tmp_path: Path) -> LogQuery:
+    db_path = str(tmp_path / "log.db")
+    partition_dir(db_path).mkdir()
+    for day, rows in RECORDS.items():
+        _write(partition_path(db_path, day), rows)
+    _write(Path(db_path), LEGACY)
+    return LogQuery(db_path)
+
+
+def _all_pages(query: LogQuery, limit: int, **filters) -> list[list[tuple]]:
+    async def run():
+        pages, cursor = [], None
+        while True:
+            page = await query.search(cursor=cursor, limit=limit, **filters)
+            pages.append([(item.timestamp, item.message) for item in page.items])
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+
+    return asyncio.run(run())
+
+
+def test_cursor_round_trips():
+    assert decode_cursor(encode_cursor("2026-03-02 09:30:00.000000", 42)) == (
+        "2026-03-02 09:30:00.000000",
+        42,
+    )
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+def test_pages_walk_every_partition_newest_first_without_repeats(
+    query: LogQuery, limit: int
+):
+    pages = _all_pages(query, limit)
+    records = [record for page in pages for record in page]
+    expected = sorted(
+        [row[:3:2] for rows in RECORDS.values() for row in rows]
+        + [row[:3:2] for row in LEGACY],
+        key=lambda row: row[0],
+        reverse=True,
+    )
+    assert sorted(records, reverse=True) == sorted(expected, reverse=True)
+    assert [timestamp for timestamp, _ in records] == [t for t, _ in expected]
+    assert all(len(page) <= limit for page in pages)
+    assert len(pages) == max(1, -(-len(expected) // limit))
+
+
+def test_equal_timestamps_are_split_across_pages_by_id(query: LogQuery):
+    pages = _all_pages(query, 2, start=datetime(2026, 3, 2, 9))
+    assert pages == [
+        [
+            ("2026-03-03 12:00:00.000000", "poll r2 slow"),
+            ("2026-03-03 00:00:00.000000", "poll r1 ok"),
+        ],
+        [
+            ("2026-03-02 09:30:00.000000", "poll r3 ok"),
+            ("2026-03-02 09:30:00.000000", "poll r2 timed out"),
+        ],
+    ]
+
+
+def test_filters_and_text_search_apply_in_every_partition(query: LogQuery):
+    errors = _all_pages(query, 1, levels=["error"])
+    assert [record for page in errors for record in page] == [
+        ("2026-03-02 09:30:00.000000", "poll r2 timed out"),
+        ("2026-03-02 07:00:00.000000", "poll r2 refused"),
+    ]
+    r2 = _all_pages(query, 10, extra={"router": "r2"}, text="poll")
+    assert len(r2[0]) == 3
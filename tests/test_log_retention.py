@@ -0,0 +1,109 @@
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from app.core import log_retention
+from app.core.log_retention import LogRetention, archive_partition, split_legacy
+from app.core.sqlite_log_sink import (
+    list_partitions,
+    open_partition,
+    partition_dir,
+    partition_path,
+)
+
+
+def _write(path: Path, timestamps: list[str]):
+    conn = open_partition(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO rx_logs (timestamp, level, message) VALUES (?, 'INFO', ?)",
+            [(timestamp, f"at {timestamp}") for timestamp in timestamps],
+        )
+    conn.close()
+
+
+def _messages(db_path: str) -> dict[str, list[str]]:
+    result = {}
+    for partition in list_partitions(db_path):
+        assert not partition.archived
+        conn = sqlite3.connect(partition.path)
+        result[str(partition.day)] = [
+            row[0] for row in conn.execute("SELECT message FROM rx_logs ORDER BY id")
+        ]
+        conn.close()
+    return result
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> str:
+    db_path = str(tmp_path / "log.db")
+    partition_dir(db_path).mkdir()
+    # The sink already wrote part of 03-02 before the legacy file was split.
+    _write(partition_path(db_path, "2026-03-02"), ["2026-03-02 12:00:00"])
+    _write(Path(db_path), ["2026-03-01 10:00:00", "2026-03-02 08:00:00"])
+    return db_path
+
+
+EXPECTED = {
+    "2026-03-01": ["at 2026-03-01 10:00:00"],
+    "2026-03-02": ["at 2026-03-02 12:00:00", "at 2026-03-02 08:00:00"],
+}
+
+
+def test_split_moves_legacy_records_into_day_partitions(db_path: str):
+    assert split_legacy(db_path) == 2
+    assert not Path(db_path).exists()
+    assert _messages(db_path) == EXPECTED
+    assert split_legacy(db_path) == 0
+
+
+def test_split_merges_into_an_archived_day(db_path: str):
+    archive_partition(partition_path(db_path, "2026-03-02"))
+    assert split_legacy(db_path) == 2
+    assert _messages(db_path) == EXPECTED
+
+
+def test_merge_interrupted_before_removing_staging_is_not_repeated(
+    db_path: str, monkeypatch: pytest.MonkeyPatch
+):
+    remove = log_retention._remove_database
+
+    def crash_on_staging(path: Path):
+        if path.name.endswith(log_retention.SPLIT_SUFFIX):
+            raise OSError("crashed")
+        remove(path)
+
+    monkeypatch.setattr(log_retention, "_remove_database", crash_on_staging)
+    with pytest.raises(OSError):
+        split_legacy(db_path)
+    monkeypatch.setattr(log_retention, "_remove_database", remove)
+
+    # 03-01 was moved in place before the crash; only 03-02 is left.
+    assert split_legacy(db_path) == 1
+    assert _messages(db_path) == EXPECTED
+
+
+def test_copy_interrupted_by_stop_starts_over(db_path: str):
+    stopped = log_retention.threading.Event()
+    stopped.set()
+    assert split_legacy(db_path, stopped) is None
+    assert Path(db_path).exists()
+    assert split_legacy(db_path) == 2
+    assert _messages(db_path) == EXPECTED
+
+
+def test_apply_archives_then_deletes_old_partitions(tmp_path: Path):
+    db_path = str(tmp_path / "log.db")
+    partition_dir(db_path).mkdir()
+    for day in ("2026-01-01", "2026-03-01", "2026-03-09", "2026-03-10"):
+        _write(partition_path(db_path, day), [f"{day} 10:00:00"])
+
+    retention = LogRetention(db_path, archive_after_days=7, delete_after_days=30)
+    assert retention.apply(date(2026, 3, 10)) == (1, 1)
+    assert sorted((str(p.day), p.archived) for p in list_partitions(db_path)) == [
+        ("2026-03-01", True),
+        ("2026-03-09", False),
+        ("2026-03-10", False),
+    ]
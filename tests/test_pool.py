@@ -0,0 +1,112 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from app.lib.routeros.infrastructure.mikrotik.exceptions import (
+    RouterOsPoolExhaustedError,
+)
+from app.lib.routeros.infrastructure.mikrotik.pool import RouterConnectionPool
+from app.lib.routeros.infrastructure.mikrotik.types import MikrotikConnectionConfig
+from bench.fake_routeros import FakeRouterOsServer
+
+
+def _with_router(
+    test: Callable[[RouterConnectionPool, MikrotikConnectionConfig], Awaitable[None]],
+    **pool_options,
+):
+    async def run():
+        server = FakeRouterOsServer()
+        await server.start()
+        pool = RouterConnectionPool(**pool_options)
+        config = MikrotikConnectionConfig(
+            host="127.0.0.1", username="admin", password="", port=server.port, timeout=1
+        )
+        try:
+            await test(pool, config)
+        finally:
+            await pool.close()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_released_session_is_reused():
+    async def test(pool, config):
+        first = await pool.acquire(config)
+        await pool.release(first)
+        second = await pool.acquire(config)
+        assert second is first
+        assert pool.stats() == {f"127.0.0.1:{config.port}": {"idle": 0, "in_use": 1}}
+        await pool.release(second)
+
+    _with_router(test)
+
+
+def test_opens_up_to_max_size_then_waits_for_a_release():
+    async def test(pool, config):
+        first = await pool.acquire(config)
+        second = await pool.acquire(config)
+        assert second is not first
+        waiter = asyncio.create_task(pool.acquire(config))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        await pool.release(first)
+        assert await waiter is first
+        await pool.release(first)
+        await pool.release(second)
+
+    _with_router(test, max_size=2)
+
+
+def test_exhausted_pool_times_out_with_its_own_error():
+    async def test(pool, config):
+        config.timeout = 0.05
+        leased = await pool.acquire(config)
+        with pytest.raises(RouterOsPoolExhaustedError):
+            await pool.acquire(config)
+        await pool.release(leased)
+
+    _with_router(test, max_size=1)
+
+
+def test_discarded_and_dead_sessions_are_replaced():
+    async def test(pool, config):
+        first = await pool.acquire(config)
+        await pool.release(first, discard=True)
+        assert first.closed
+        second = await pool.acquire(config)
+        assert second is not first
+
+        await second.client.close()
+        await pool.release(second)
+        third = await pool.acquire(config)
+        assert third is not second and not third.closed
+        await pool.release(third)
+
+    _with_router(test, max_size=1)
+
+
+def test_warm_opens_min_size_sessions():
+    async def test(pool, config):
+        await pool.warm(config)
+        assert pool.stats()[f"127.0.0.1:{config.port}"] == {"idle": 2, "in_use": 0}
+
+    _with_router(test, min_size=2, max_size=4)
+
+
+def test_closed_pool_refuses_new_leases():
+    async def test(pool, config):
+        leased = await pool.acquire(config)
+        await pool.close()
+        await pool.release(leased)
+        assert leased.closed
+        with pytest.raises(RuntimeError):
+            await pool.acquire(config)
+
+    _with_router(test)
+
+
+def test_rejects_inconsistent_sizes():
+    with pytest.raises(ValueError):
+        RouterConnectionPool(min_size=3, max_size=2)
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.lib.routeros.infrastructure.mikrotik.protocol import (
+    build_command,
+    encode_length,
+    encode_sentence,
+    parse_reply,
+    read_length,
+    read_sentence,
+)
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def _read_length(data: bytes) -> int:
+    return await read_length(_reader(data))
+
+
+async def _read_sentence(data: bytes) -> list[str]:
+    return await read_sentence(_reader(data))
+
+
+@pytest.mark.parametrize(
+    ("length", "size"),
+    [
+        (0, 1),
+        (0x7F, 1),
+        (0x80, 2),
+        (0x3FFF, 2),
+        (0x4000, 3),
+        (0x1FFFFF, 3),
+        (0x200000, 4),
+        (0xFFFFFFF, 4),
+        (0x10000000, 5),
+        (0xFFFFFFFF, 5),
+    ],
+)
+def test_length_round_trips_at_every_prefix_boundary(length: int, size: int):
+    encoded = encode_length(length)
+    assert len(encoded) == size
+    assert asyncio.run(_read_length(encoded)) == length
+
+
+def test_length_uses_the_documented_prefixes():
+    assert encode_length(0x80) == b"\x80\x80"
+    assert encode_length(0x4000) == b"\xc0\x40\x00"
+    assert encode_length(0x200000) == b"\xe0\x20\x00\x00"
+    assert encode_length(0x10000000) == b"\xf0\x10\x00\x00\x00"
+
+
+def test_invalid_length_prefix_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(_read_length(b"\xf8"))
+
+
+def test_sentence_round_trips_and_ends_with_an_empty_word():
+    words = ["/interface/print", "=.proplist=name,type", "?type=ether", "x" * 200]
+    encoded = encode_sentence(words)
+    assert encoded.endswith(b"\x00")
+
+    async def read_all() -> list[list[str]]:
+        reader = _reader(encoded + encode_sentence(["!done"]))
+        return [await read_sentence(reader), await read_sentence(reader)]
+
+    assert asyncio.run(read_all()) == [words, ["!done"]]
+
+
+def test_sentence_encodes_word_lengths_in_bytes():
+    (word,) = asyncio.run(_read_sentence(encode_sentence(["=name=ßüd"])))
+    assert word == "=name=ßüd"
+
+
+def test_parse_reply_splits_tag_and_attributes():
+    assert parse_reply(["!re", "=.id=*1", "=comment=a=b", ".tag=7"]) == (
+        "!re",
+        "7",
+        {".id": "*1", "comment": "a=b"},
+    )
+    assert parse_reply(["!done", "ret=abc"]) == ("!done", None, {"ret": "abc"})
+    assert parse_reply([]) == ("", None, {})
+
+
+def test_build_command_orders_attributes_proplist_queries_and_tag():
+    assert build_command(
+        "/ip/route/print",
+        {"count-only": ""},
+        queries=["dst-address=0.0.0.0/0", "?#|"],
+        proplist=[".id", "gateway"],
+        tag="3",
+    ) == [
+        "/ip/route/print",
+        "=count-only=",
+        "=.proplist=.id,gateway",
+        "?dst-address=0.0.0.0/0",
+        "?#|",
+        ".tag=3",
+    ]
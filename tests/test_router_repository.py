@@ -0,0 +1,105 @@
+import asyncio
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.core.settings import RouterOSConfig, Settings
+from app.lib.routeros.domain.entities import RouterInfo
+from app.lib.routeros.infrastructure.sqlite import SQLiteDatabase
+from app.lib.routeros.infrastructure.sqlite.router_repository import (
+    SQLiteRouterRepository,
+)
+from app.route.v1 import routeros_router
+from app.route.v1.routeros import NewRouter
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Iterator[SQLiteDatabase]:
+    database = SQLiteDatabase()
+    database.open(str(tmp_path / "routers.db"))
+    yield database
+    database.close()
+
+
+def _router(name: str, host: str = "10.0.0.1") -> RouterOSConfig:
+    return RouterOSConfig(name=name, host=host, username="admin", password="secret")
+
+
+def _info(name: str, version: str) -> RouterInfo:
+    return RouterInfo(
+        name=name,
+        host="10.0.0.1",
+        board_name="RB4011iGS+",
+        platform="MikroTik",
+        version=version,
+        uptime="1d",
+        last_updated=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_routers_are_saved_replaced_and_deleted(database: SQLiteDatabase):
+    async def run():
+        repository = SQLiteRouterRepository(database)
+        await repository.setup()
+        await repository.save_router(_router("core"))
+        await repository.save_router(_router("edge"))
+        await repository.save_router(_router("core", host="10.0.0.2"))
+        routers = {router.name: router for router in await repository.refresh()}
+        assert routers["core"] == _router("core", host="10.0.0.2")
+        assert set(routers) == {"core", "edge"}
+
+        assert await repository.delete_router("edge")
+        assert not await repository.delete_router("edge")
+        assert [router.name for router in await repository.refresh()] == ["core"]
+
+    asyncio.run(run())
+
+
+def test_router_info_is_served_from_memory_and_survives_a_refresh(
+    database: SQLiteDatabase,
+):
+    async def run():
+        writer = SQLiteRouterRepository(database)
+        reader = SQLiteRouterRepository(database)
+        await writer.setup()
+        await writer.update_many([_info("core", "7.15"), _info("edge", "7.15")])
+        await writer.update_router_info(_info("core", "7.16"))
+        assert (await writer.get_router_info("core")).version == "7.16"
+
+        assert await reader.get_router_info("core") is None
+        await reader.refresh()
+        stored = await reader.get_router_info("core")
+        assert stored == _info("core", "7.16")
+        assert len(await reader.list_router_info()) == 2
+
+        await writer.delete_router("core")
+        assert await writer.get_router_info("core") is None
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("name", ["fleet", "routers", "alerts", "bad name", "a/b"])
+def test_settings_reject_unusable_router_names(name: str):
+    Settings(routers=[{"name": "edge-1.lab", "host": "10.0.0.1"}])
+    with pytest.raises(ValidationError):
+        Settings(routers=[{"name": name, "host": "10.0.0.1"}])
+    with pytest.raises(ValidationError):
+        Settings(routeros={"name": name, "host": "10.0.0.1"})
+
+
+@pytest.mark.parametrize("name", ["collector", "system-resource", "bad name"])
+def test_api_rejects_unusable_router_names(name: str):
+    with pytest.raises(ValidationError):
+        NewRouter(name=name, host="10.0.0.1")
+
+    app = FastAPI()
+    app.include_router(routeros_router)
+    response = TestClient(app).put(
+        f"/v1/routeros/routers/{name}", json={"host": "10.0.0.1"}
+    )
+    assert response.status_code == 422
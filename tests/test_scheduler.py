@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from app.lib.routeros.application.collector import SystemResourceCollector
+from app.lib.routeros.application.scheduler import PollScheduler
+from app.lib.routeros.application.use_cases import FleetSystemResourceResult
+from app.lib.routeros.infrastructure.mikrotik.schemas import SYSTEM_RESOURCE
+from bench.fake_routeros import system_resource_row
+
+RESOURCE = SYSTEM_RESOURCE.decode(system_resource_row())
+
+
+def _result(router: str, ok: bool = True) -> FleetSystemResourceResult:
+    return FleetSystemResourceResult(
+        router=router,
+        host="127.0.0.1",
+        status="ok" if ok else "error",
+        elapsed_ms=1.0,
+        data=RESOURCE if ok else None,
+    )
+
+
+def _routers(*names: str) -> dict:
+    return {name: object() for name in names}
+
+
+def test_new_routers_are_spread_over_the_interval():
+    scheduler = PollScheduler(interval=8.0)
+    scheduler._sync(_routers("a", "b", "c", "d"), now=100.0)
+    assert sorted(state.due for state in scheduler._states.values()) == [
+        101.0,
+        103.0,
+        105.0,
+        107.0,
+    ]
+    scheduler._sync(_routers("a", "b"), now=101.0)
+    assert set(scheduler._states) == {"a", "b"}
+
+
+@pytest.mark.parametrize(
+    ("pressure", "ok", "intervals"),
+    [
+        (0.9, True, [5.0, 2.5, 2.5]),
+        (0.1, True, [12.5, 15.625, 19.53125]),
+        (0.1, False, [20.0, 30.0, 30.0]),
+    ],
+)
+def test_interval_adapts_to_what_polls_return(
+    pressure: float, ok: bool, intervals: list[float]
+):
+    scheduler = PollScheduler(interval=10.0, pressure=lambda resource: pressure)
+    scheduler._sync(_routers("a"), now=0.0)
+    state = scheduler._states["a"]
+    seen = []
+    for _ in intervals:
+        scheduler._adapt(state, _result("a", ok))
+        seen.append(state.interval)
+    assert seen == intervals
+
+
+def test_pressure_swing_polls_sooner():
+    pressures = iter([0.1, 0.5])
+    scheduler = PollScheduler(interval=10.0, pressure=lambda r: next(pressures))
+    scheduler._sync(_routers("a"), now=0.0)
+    state = scheduler._states["a"]
+    scheduler._adapt(state, _result("a"))
+    scheduler._adapt(state, _result("a"))
+    assert state.interval == 6.25
+
+
+def test_run_bounds_concurrency_and_never_overlaps_a_router():
+    async def run():
+        scheduler = PollScheduler(interval=0.05, max_concurrency=2)
+        running: set[str] = set()
+        peak = 0
+        polled: list[str] = []
+
+        async def poll(name, config):
+            nonlocal peak
+            assert name not in running
+            running.add(name)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.02)
+            running.discard(name)
+            return _result(name)
+
+        task = asyncio.create_task(
+            scheduler.run(lambda: _routers(*"abcde"), poll, polled.append)
+        )
+        await asyncio.sleep(0.3)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert peak == 2
+        assert {result.router for result in polled} == set("abcde")
+        assert scheduler.stats().polls == len(polled)
+
+    asyncio.run(run())
+
+
+class History:
+    def __init__(self):
+        self.samples = []
+
+    async def add_samples(self, samples):
+        self.samples.extend(samples)
+
+
+def test_collector_stores_pending_samples_when_stopped():
+    async def run():
+        history = History()
+        scheduler = PollScheduler(interval=0.01)
+
+        class Fleet:
+            async def query(self, name, config):
+                return _result(name)
+
+        collector = SystemResourceCollector(
+            Fleet(),
+            history,
+            lambda: _routers("a", "b"),
+            scheduler=scheduler,
+            flush_interval=60.0,
+        )
+        collector.start()
+        while scheduler.polls < 2:
+            await asyncio.sleep(0.01)
+        await collector.stop()
+        assert history.samples
+        assert {sample.router for sample in history.samples} == {"a", "b"}
+        assert len(history.samples) == scheduler.polls
+
+    asyncio.run(run())
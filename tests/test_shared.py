@@ -0,0 +1,128 @@
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from app.lib.routeros.infrastructure import shared
+from app.lib.routeros.infrastructure.shared import SharedSnapshotStore
+
+
+@pytest.fixture
+def stores(tmp_path: Path) -> Iterator[tuple[SharedSnapshotStore, SharedSnapshotStore]]:
+    """A publishing store and a reader mapping the same file."""
+    path = str(tmp_path / "snapshots.shm")
+    writer = SharedSnapshotStore(path, slots=8, slot_size=256)
+    reader = SharedSnapshotStore(path, slots=8, slot_size=256)
+    writer.open()
+    reader.open()
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def _sequence_offset(store: SharedSnapshotStore, key: str) -> int:
+    offset = store._find(key.encode())
+    assert offset is not None
+    return offset
+
+
+def test_reader_sees_what_the_writer_published(stores):
+    writer, reader = stores
+    assert reader.read("r1 /system/resource") is None
+    assert reader.version("r1 /system/resource") == 0
+
+    assert writer.publish("r1 /system/resource", b'{"cpu":1}', stored_at=123.5)
+    snapshot = reader.read("r1 /system/resource")
+    assert snapshot is not None
+    assert (snapshot.payload, snapshot.stored_at) == (b'{"cpu":1}', 123.5)
+    assert snapshot.version == reader.version("r1 /system/resource") == 2
+
+
+def test_each_publish_advances_the_version_by_two(stores):
+    writer, reader = stores
+    for expected in (2, 4, 6):
+        writer.publish("r1 /interface", f"{expected}".encode())
+        assert reader.version("r1 /interface") == expected
+    assert reader.read("r1 /interface").payload == b"6"
+
+
+def test_keys_probe_past_occupied_slots(stores):
+    writer, reader = stores
+    keys = [f"r{i} /system/resource" for i in range(8)]
+    for key in keys:
+        assert writer.publish(key, key.encode())
+    assert not writer.publish("r9 /system/resource", b"x")
+    assert [reader.read(key).payload for key in keys] == [key.encode() for key in keys]
+
+
+def test_oversized_payload_keeps_the_previous_value(stores):
+    writer, reader = stores
+    writer.publish("r1 /interface", b"small")
+    assert not writer.publish("r1 /interface", b"x" * writer.max_payload)
+    assert reader.read("r1 /interface").payload == b"small"
+
+
+def test_read_during_a_write_is_retried_then_given_up(
+    stores, monkeypatch: pytest.MonkeyPatch
+):
+    writer, reader = stores
+    writer.publish("r1 /interface", b"old")
+    offset = _sequence_offset(writer, "r1 /interface")
+    # The writer is between its two sequence updates.
+    struct.pack_into("<Q", writer._map, offset, 3)
+    monkeypatch.setattr(shared, "_READ_RETRIES", 5)
+    assert reader.read("r1 /interface") is None
+
+
+def test_read_retries_when_the_slot_changes_while_copying(
+    stores, monkeypatch: pytest.MonkeyPatch
+):
+    writer, reader = stores
+    writer.publish("r1 /interface", b"old")
+    sequence = shared._SEQUENCE
+
+    class Racing:
+        """Lets the writer publish while the reader copies the payload."""
+
+        raced = False
+
+        def unpack_from(self, buffer, offset):
+            if not self.raced:
+                self.raced = True
+                writer.publish("r1 /interface", b"new")
+            return sequence.unpack_from(buffer, offset)
+
+        def pack_into(self, *args):
+            sequence.pack_into(*args)
+
+    monkeypatch.setattr(shared, "_SEQUENCE", Racing())
+    snapshot = reader.read("r1 /interface")
+    assert snapshot is not None
+    assert (snapshot.payload, snapshot.version) == (b"new", 4)
+
+
+def test_writer_reuses_a_sequence_left_odd_by_a_crashed_writer(stores):
+    writer, reader = stores
+    writer.publish("r1 /interface", b"old")
+    offset = _sequence_offset(writer, "r1 /interface")
+    struct.pack_into("<Q", writer._map, offset, 3)
+
+    writer.publish("r1 /interface", b"new")
+    assert reader.version("r1 /interface") == 4
+    assert reader.read("r1 /interface").payload == b"new"
+
+
+def test_reopening_with_another_layout_starts_empty(tmp_path: Path):
+    path = str(tmp_path / "snapshots.shm")
+    store = SharedSnapshotStore(path, slots=8, slot_size=256)
+    store.open()
+    store.publish("r1 /interface", b"old")
+    store.close()
+
+    resized = SharedSnapshotStore(path, slots=16, slot_size=256)
+    resized.open()
+    try:
+        assert resized.read("r1 /interface") is None
+    finally:
+        resized.close()
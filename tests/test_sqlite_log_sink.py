@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from loguru import logger
+
+from app.core.sqlite_log_sink import SQLiteLogSink, list_partitions
+
+
+class PausedSink(SQLiteLogSink):
+    """Sink whose writer thread only starts draining the queue on ``resume``."""
+
+    def __init__(self, *args, **kwargs):
+        self.resume = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _process_queue(self):
+        self.resume.wait()
+        super()._process_queue()
+
+
+@pytest.fixture
+def make_sink(tmp_path: Path) -> Iterator:
+    handlers: list[tuple[int, PausedSink]] = []
+
+    def make(**options) -> PausedSink:
+        sink = PausedSink(str(tmp_path / "log.db"), flush_interval=0.01, **options)
+        handlers.append((logger.add(sink, level="TRACE", format="{message}"), sink))
+        return sink
+
+    yield make
+    for handler_id, sink in handlers:
+        logger.remove(handler_id)
+        sink.resume.set()
+        sink.close()
+
+
+def _messages(sink: SQLiteLogSink) -> list[str]:
+    sink.resume.set()
+    sink.close()
+    messages = []
+    for partition in list_partitions(sink.db_path):
+        conn = sqlite3.connect(partition.path)
+        messages += [row[0] for row in conn.execute("SELECT message FROM rx_logs")]
+        conn.close()
+    return messages
+
+
+def _log_in_thread(level: str, message: str) -> threading.Thread:
+    thread = threading.Thread(target=logger.log, args=(level, message), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_records_are_written_in_batches(make_sink):
+    sink = make_sink(batch_size=2)
+    for i in range(5):
+        logger.info("record {}", i)
+    assert _messages(sink) == [f"record {i}" for i in range(5)]
+    assert sink.stats() == {"queued": 0, "dropped": 0, "written": 5}
+
+
+def test_drop_oldest_keeps_the_newest_records(make_sink):
+    sink = make_sink(max_queue_size=3, overflow="drop_oldest")
+    for i in range(5):
+        logger.info("record {}", i)
+    assert sink.dropped == 2
+    assert _messages(sink) == ["record 2", "record 3", "record 4"]
+
+
+def test_block_waits_for_room(make_sink):
+    sink = make_sink(max_queue_size=1, overflow="block")
+    logger.info("first")
+    blocked = _log_in_thread("INFO", "second")
+    blocked.join(0.1)
+    assert blocked.is_alive()
+
+    sink.resume.set()
+    blocked.join(5)
+    assert not blocked.is_alive()
+    assert _messages(sink) == ["first", "second"]
+    assert sink.dropped == 0
+
+
+def test_drop_debug_sheds_only_debug_records(make_sink):
+    sink = make_sink(max_queue_size=1, overflow="drop_debug")
+    logger.info("kept")
+    logger.debug("shed")
+    logger.trace("shed too")
+    assert sink.dropped == 2
+
+    blocked = _log_in_thread("WARNING", "waits")
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    sink.resume.set()
+    blocked.join(5)
+    assert _messages(sink) == ["kept", "waits"]
+
+
+def test_records_after_close_are_counted_as_dropped(make_sink):
+    sink = make_sink()
+    logger.info("written")
+    assert _messages(sink) == ["written"]
+    logger.info("too late")
+    assert sink.dropped == 1
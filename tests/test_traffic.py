@@ -0,0 +1,127 @@
+import pytest
+
+from app.lib.routeros.application.traffic import (
+    COUNTER_32,
+    TrafficRateEngine,
+    counter_delta,
+)
+from app.lib.routeros.domain.entities import Interface
+
+
+def _interface(name: str, rx_byte: int, tx_byte: int = 0, packets: int = 0):
+    return Interface(
+        id=f"*{name}",
+        name=name,
+        type="ether",
+        rx_byte=rx_byte,
+        tx_byte=tx_byte,
+        rx_packet=packets,
+        tx_packet=packets,
+    )
+
+
+def test_counter_delta_handles_wraps_and_resets():
+    assert counter_delta(100, 250) == 150
+    assert counter_delta(COUNTER_32 - 10, 5) == 15
+    assert counter_delta(5_000_000, 1_000) is None
+    assert counter_delta(COUNTER_32 * 4, 10) is None
+
+
+def test_rates_are_computed_between_samples():
+    engine = TrafficRateEngine(capacity=4)
+    engine.ingest("r1", 100.0, [_interface("ether1", 0, 0, 0)])
+    engine.ingest("r1", 110.0, [_interface("ether1", 1_000, 2_000, 50)])
+    (rate,) = engine.series("r1", "ether1")
+    assert (rate.rx_bps, rate.tx_bps, rate.rx_pps, rate.tx_pps) == (
+        800.0,
+        1600.0,
+        5.0,
+        5.0,
+    )
+    assert rate.timestamp.timestamp() == 110.0
+
+
+def test_rates_keep_double_precision():
+    engine = TrafficRateEngine(capacity=4)
+    engine.ingest("r1", 0.0, [_interface("ether1", 0)])
+    engine.ingest("r1", 1.0, [_interface("ether1", 123_456_789_123)])
+    (rate,) = engine.series("r1", "ether1")
+    assert rate.rx_bps == 987_654_312_984.0
+
+
+def test_reset_and_missing_interfaces_leave_gaps():
+    engine = TrafficRateEngine(capacity=8)
+    engine.ingest("r1", 0.0, [_interface("ether1", 0), _interface("ether2", 0)])
+    engine.ingest("r1", 1.0, [_interface("ether1", 5_000_000), _interface("ether2", 0)])
+    engine.ingest("r1", 2.0, [_interface("ether1", 10), _interface("ether2", 1)])
+    engine.ingest("r1", 3.0, [_interface("ether1", 20)])
+    assert [r.timestamp.timestamp() for r in engine.series("r1", "ether1")] == [
+        1.0,
+        3.0,
+    ]
+    assert [r.timestamp.timestamp() for r in engine.series("r1", "ether2")] == [
+        1.0,
+        2.0,
+    ]
+
+
+def test_duplicate_and_older_samples_are_ignored():
+    engine = TrafficRateEngine(capacity=4)
+    engine.ingest("r1", 10.0, [_interface("ether1", 0)])
+    engine.ingest("r1", 20.0, [_interface("ether1", 100)])
+    engine.ingest("r1", 20.0, [_interface("ether1", 900)])
+    engine.ingest("r1", 15.0, [_interface("ether1", 900)])
+    assert [r.rx_bps for r in engine.series("r1", "ether1")] == [80.0]
+
+
+def test_top_ranks_the_latest_rates_across_routers():
+    engine = TrafficRateEngine(capacity=4)
+    for router, scale in (("r1", 1), ("r2", 3)):
+        engine.ingest(router, 0.0, [_interface("a", 0), _interface("b", 0)])
+        engine.ingest(
+            router, 1.0, [_interface("a", 10 * scale), _interface("b", 20 * scale)]
+        )
+    top = engine.top(3)
+    assert [(r.router, r.interface) for r in top] == [
+        ("r2", "b"),
+        ("r2", "a"),
+        ("r1", "b"),
+    ]
+    assert [r.interface for r in engine.top(5, "rx_bps", router="r1")] == ["b", "a"]
+    assert engine.top(5, max_age=1.0) == []
+    with pytest.raises(ValueError):
+        engine.top(metric="errors")
+
+
+def test_slots_of_vanished_interfaces_are_reused():
+    engine = TrafficRateEngine(capacity=3)
+    engine.ingest("r1", 0.0, [_interface("old", 0), _interface("kept", 0)])
+    for second in range(1, 4):
+        engine.ingest("r1", float(second), [_interface("kept", second)])
+    assert engine.stats() == {"r1": 1}
+    assert engine.series("r1", "old") == []
+
+    engine.ingest("r1", 4.0, [_interface("kept", 4), _interface("new", 0)])
+    engine.ingest("r1", 5.0, [_interface("kept", 5), _interface("new", 10)])
+    traffic = engine._routers["r1"]
+    assert len(traffic.names) == 2
+    assert [r.rx_bps for r in engine.series("r1", "new")] == [80.0]
+
+
+def test_interface_present_within_the_ring_keeps_its_slot():
+    engine = TrafficRateEngine(capacity=3)
+    engine.ingest("r1", 0.0, [_interface("flappy", 0)])
+    engine.ingest("r1", 1.0, [])
+    engine.ingest("r1", 2.0, [_interface("flappy", 10)])
+    assert engine.stats() == {"r1": 1}
+    assert [r.rx_bps for r in engine.series("r1", "flappy")] == [40.0]
+
+
+def test_retain_and_configure_forget_routers():
+    engine = TrafficRateEngine(capacity=4)
+    engine.ingest("r1", 0.0, [_interface("a", 0)])
+    engine.ingest("r2", 0.0, [_interface("a", 0)])
+    engine.retain({"r2"})
+    assert engine.stats() == {"r2": 1}
+    engine.configure(8)
+    assert engine.stats() == {}